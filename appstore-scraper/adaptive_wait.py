@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应页面就绪检测 - 截图区域或内嵌数据脚本出现即结束等待，超时时间根据历史 p95 自动调整
+"""
+
+import math
+import threading
+import time
+import logging
+from collections import deque
+from typing import Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessDetector:
+    # 截图区域或含 mzstatic 的内嵌数据脚本出现即视为就绪；
+    # 页面加载完成 1.5 秒后仍没有这些内容（如下架或 404 页面）也不再等待
+    READY_SCRIPT = """
+        if (document.readyState === 'loading') {
+            return false;
+        }
+        if (document.querySelector('.we-screenshot-viewer img, .we-screenshot-viewer source, '
+                                   + '[class*="screenshot"] img, [class*="shelf"] picture source')) {
+            return true;
+        }
+        const scripts = document.querySelectorAll('script[type="fastboot/shoebox"], '
+                                                  + 'script[type="application/json"], script#serialized-server-data');
+        for (const script of scripts) {
+            if (script.textContent.indexOf('mzstatic.com') !== -1) {
+                return true;
+            }
+        }
+        const nav = performance.getEntriesByType('navigation')[0];
+        return !!(nav && nav.loadEventEnd > 0 && performance.now() - nav.loadEventEnd > 1500);
+    """
+
+    def __init__(self, initial_timeout: float = 20, min_timeout: float = 3, max_timeout: float = 20,
+                 headroom: float = 1.5, min_samples: int = 20, window: int = 500, poll_frequency: float = 0.1):
+        """
+        初始化就绪检测器
+
+        Args:
+            initial_timeout: 样本不足时使用的超时秒数
+            min_timeout: 学习到的超时下限
+            max_timeout: 学习到的超时上限
+            headroom: 在观测到的 p95 就绪时间上乘的余量系数
+            min_samples: 开始使用学习值前需要的样本数
+            window: 保留最近多少次就绪耗时
+            poll_frequency: 轮询间隔秒数
+        """
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.poll_frequency = poll_frequency
+
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._budget: Optional[float] = None
+        self._spent = 0.0
+        self._timeouts = 0
+
+    def start_run(self, budget: Optional[float] = None):
+        """
+        开始新一轮批量抓取
+
+        Args:
+            budget: 本轮所有应用累计等待秒数上限，用完后每个页面只等待 min_timeout；None 表示不限制
+        """
+        with self._lock:
+            self._budget = budget
+            self._spent = 0.0
+            self._timeouts = 0
+
+    def p95(self) -> Optional[float]:
+        """最近就绪耗时的 p95，样本不足返回 None"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)]
+
+    @property
+    def timeout(self) -> float:
+        """当前使用的超时秒数"""
+        p95 = self.p95()
+        timeout = self.initial_timeout if p95 is None else p95 * self.headroom
+        timeout = min(self.max_timeout, max(self.min_timeout, timeout))
+        with self._lock:
+            if self._budget is not None and self._spent >= self._budget:
+                timeout = self.min_timeout
+        return timeout
+
+    def wait(self, driver) -> Tuple[bool, float]:
+        """
+        等待页面就绪
+
+        Args:
+            driver: Chrome 浏览器驱动实例（已调用 get）
+
+        Returns:
+            (是否就绪, 等待秒数)；超时不抛出异常，调用方继续提取已加载的内容
+        """
+        timeout = self.timeout
+        start = time.perf_counter()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=self.poll_frequency).until(
+                lambda d: d.execute_script(self.READY_SCRIPT)
+            )
+            ready = True
+        except TimeoutException:
+            ready = False
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            self._spent += waited
+            if ready:
+                self._samples.append(waited)
+            else:
+                self._timeouts += 1
+        if not ready:
+            logger.warning(f"页面在 {timeout:.1f}s 内未就绪，继续提取已加载的内容")
+        return ready, waited
+
+    def get_stats(self) -> dict:
+        """
+        获取等待统计
+
+        Returns:
+            包含当前超时、p95、累计等待秒数和超时次数的字典
+        """
+        p95 = self.p95()
+        timeout = self.timeout
+        with self._lock:
+            return {
+                'timeout': round(timeout, 2),
+                'p95': round(p95, 3) if p95 is not None else None,
+                'samples': len(self._samples),
+                'spent_seconds': round(self._spent, 2),
+                'budget_seconds': self._budget,
+                'timeouts': self._timeouts,
+            }
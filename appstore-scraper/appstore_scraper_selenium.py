@@ -4,51 +4,118 @@
 App Store Scraper Skill - 简化版
 """
 
+import io
+import itertools
 import time
 import re
 import os
 import json
 import logging
-from typing import List, Dict, Optional
+import threading
+from typing import Iterable, List, Dict, Optional, Tuple, Union
 from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_pool import DriverPool
+from static_parser import fetch_page, parse_html
+from screenshot_classifier import ScreenshotClassifier
+from page_cache import PageCache
+from journal import ScrapeJournal
+from jsonl_output import JsonlWriter
+from html_report import HtmlReportRenderer, write_paginated_report
+from async_engine import AsyncScrapeEngine
+from adaptive_wait import ReadinessDetector
+from driver_binary import resolve_driver_path, record_launch, get_startup_report
+from retry_policy import RetryPolicy, CircuitBreaker, classify_error, NOT_FOUND
+from metrics import StageTimer, MetricsRegistry
+from asset_downloader import AssetDownloader
+from mzstatic_url import MzstaticUrl, asset_key, screenshot_record
+from storefront_batch import storefront_url, merge_storefront_results
+from change_diff import load_results, diff_results, write_delta_report
+from perceptual_hash import collapse_near_duplicates, DEFAULT_MAX_DISTANCE
+from result_store import ResultStore
+from url_ingest import canonicalize, is_non_app_page
+from memory_watchdog import MemoryWatchdog
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class AppStoreScraperSelenium:
-    def __init__(self, output_dir: str = "appstore_report"):
+    # 所有提取路径共享的截图 URL 分类器
+    _classifier = ScreenshotClassifier()
+    
+    def __init__(self, output_dir: str = "appstore_report", static_first: bool = True,
+                 min_static_screenshots: int = 3, cache: Optional[PageCache] = None,
+                 refresh: bool = False, metadata_only: bool = False, driver_path: Optional[str] = None,
+                 offline: Optional[bool] = None, retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, store: Optional[ResultStore] = None,
+                 watchdog: Optional[MemoryWatchdog] = None, clean_output: bool = True):
         """
         初始化 App Store 抓取器
         
         Args:
             output_dir: 输出目录，将生成 HTML 报告文件
+            static_first: 是否优先使用无浏览器的静态 HTML 解析
+            min_static_screenshots: 静态解析至少需要找到的截图数，不足时回退到 Selenium
+            cache: 页面结果缓存，为 None 时不使用缓存
+            refresh: 忽略已有缓存强制重新抓取（结果仍会写入缓存）
+            metadata_only: 浏览器只加载文档和脚本，屏蔽图片、视频、字体和统计请求（只需要 URL，不需要像素）
+            driver_path: 固定的 chromedriver 路径，为 None 时读取 CHROMEDRIVER_PATH 环境变量
+            offline: 离线模式，不使用 webdriver-manager 联网下载；为 None 时读取 APPSTORE_SCRAPER_OFFLINE 环境变量
+            retry_policy: 失败重试策略，默认最多尝试 3 次
+            circuit_breaker: 失败率过高时暂停抓取的熔断器，默认最近 50 次失败过半时暂停 30 秒
+            store: SQLite 结果存储，批量抓取的结果和运行信息同时写入数据库，为 None 时不使用
+            watchdog: 内存看门狗，批量抓取时回收内存过大的驱动、内存紧张时降低并发，并记录每个应用的驱动内存
+            clean_output: 输出目录已存在时是否清理旧的报告文件（多个进程共享输出目录时应为 False）
         """
         self.output_dir = output_dir
+        self.static_first = static_first
+        self.min_static_screenshots = min_static_screenshots
+        self.cache = cache
+        self.refresh = refresh
+        self.metadata_only = metadata_only
+        self.driver_path = driver_path
+        self.offline = offline
+        self.store = store
+        self.watchdog = watchdog
+        
+        # 批量抓取时使用的驱动池（单独调用 scrape_app 时为 None）
+        self._driver_pool: Optional[DriverPool] = None
+        self.driver_pool_stats: Dict = {}
+        
+        # 页面就绪检测（各线程共享，从观测到的就绪时间学习超时）
+        self.readiness = ReadinessDetector()
+        
+        # 重试与熔断（各线程共享）
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.retry_stats: Dict = {}
+        self._retry_lock = threading.Lock()
+        self._reset_retry_stats()
+        
+        # 各阶段耗时汇总（批量抓取和报告生成）
+        self.metrics = MetricsRegistry()
         
         # 创建输出目录
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             logger.info(f"创建输出目录: {output_dir}")
-        else:
+        elif clean_output:
             # 清理旧文件
             self._clean_old_files()
     
     def _clean_old_files(self):
-        """清理旧的报告文件"""
+        """清理旧的报告文件（保留最新的一份 JSON 数据和 JSONL 数据，供变更检测对比）"""
         import glob
         
         # 删除所有旧的进度文件
         progress_files = glob.glob(os.path.join(self.output_dir, "progress_*.html"))
         progress_files.extend(glob.glob(os.path.join(self.output_dir, "progress_*.json")))
         progress_files.extend(glob.glob(os.path.join(self.output_dir, "appstore_report_*.html")))
-        progress_files.extend(glob.glob(os.path.join(self.output_dir, "appstore_data_*.json")))
+        for pattern in ("appstore_data_*.json", "appstore_data_*.jsonl*"):
+            data_files = sorted(glob.glob(os.path.join(self.output_dir, pattern)), key=os.path.getmtime)
+            progress_files.extend(data_files[:-1])
         
         if progress_files:
             logger.info(f"清理 {len(progress_files)} 个旧文件")
@@ -68,6 +135,14 @@ class AppStoreScraperSelenium:
         Returns:
             应用 ID 字符串，未找到则返回 None
         """
+        # 常见格式（apps/itunes.apple.com、/id123、纯数字 ID）用一个预编译正则识别
+        key = canonicalize(url)
+        if key:
+            return key[1]
+        if is_non_app_page(url):
+            logger.warning(f"不是应用页面: {url}")
+            return None
+        
         # 支持多种 App Store URL 格式
         patterns = [
             r'[/]id(\d+)',  # /id431946152
@@ -92,6 +167,20 @@ class AppStoreScraperSelenium:
         logger.warning(f"无法从 URL 提取应用 ID: {url}")
         return None
     
+    def extract_storefront(self, url: str) -> str:
+        """
+        从 App Store URL 中提取商店地区代码
+
+        Args:
+            url: App Store 链接
+
+        Returns:
+            地区代码（如 us、cn），URL 中不含地区或无法识别时返回 us
+        """
+        # 与 URL 导入去重使用同一套规范化规则（apps.apple.com 和 itunes.apple.com 均可）
+        key = canonicalize(url)
+        return key[0] if key else 'us'
+    
     def _create_driver(self) -> webdriver.Chrome:
         """
         创建 Chrome 浏览器驱动
@@ -114,273 +203,472 @@ class AppStoreScraperSelenium:
         options.add_argument('--disable-web-security')
         options.add_argument('--disable-features=VizDisplayCompositor')
         
-        # 初始化浏览器
+        if self.metadata_only:
+            # 不解码图片，截图 URL 仍保留在 DOM 中
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_argument('--force-prefers-reduced-motion')
+            options.add_argument('--autoplay-policy=user-gesture-required')
+            # 第三方主机一律解析失败，只允许 Apple 自己的域名（IP 地址和 localhost 不受影响）
+            options.add_argument(f'--host-resolver-rules={self._host_resolver_rules()}')
+            options.add_experimental_option('prefs', {
+                'profile.managed_default_content_settings.images': 2,
+            })
+        
+        # 初始化浏览器（chromedriver 路径每个进程按参数只解析一次）
+        service = Service(resolve_driver_path(self.driver_path, self.offline))
+        start = time.perf_counter()
         driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
+            service=service,
             options=options
         )
+        record_launch(time.perf_counter() - start)
+        
+        if self.metadata_only:
+            self._apply_metadata_only(driver)
         
         return driver
     
-    def extract_app_name(self, driver: webdriver.Chrome) -> Optional[str]:
+    # 元数据模式下允许访问的第一方域名（含子域名），其他主机在 DNS 解析阶段即失败
+    _FIRST_PARTY_DOMAINS = ('apple.com', 'mzstatic.com', 'cdn-apple.com', 'localhost')
+    
+    # 元数据模式下第一方域名中仍屏蔽的请求：图片、视频、字体以及 Apple 自己的统计请求
+    _BLOCKED_URL_PATTERNS = [
+        '*.png', '*.jpg', '*.jpeg', '*.webp', '*.gif', '*.svg', '*.ico',
+        '*.mp4', '*.m3u8', '*.webm', '*.mov', '*.ts',
+        '*.woff', '*.woff2', '*.ttf', '*.otf',
+        '*xp.apple.com*', '*securemetrics.apple.com*', '*metrics.mzstatic.com*',
+    ]
+    
+    @classmethod
+    def _host_resolver_rules(cls) -> str:
+        """Chrome --host-resolver-rules：除第一方域名外的所有主机解析为不存在"""
+        excludes = []
+        for domain in cls._FIRST_PARTY_DOMAINS:
+            excludes.extend([f'EXCLUDE {domain}', f'EXCLUDE *.{domain}'])
+        return ', '.join(['MAP * ~NOTFOUND'] + excludes)
+    
+    def _apply_metadata_only(self, driver: webdriver.Chrome):
+        """通过 CDP 屏蔽不需要的请求并关闭动画（设置在驱动整个生命周期内有效）"""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self._BLOCKED_URL_PATTERNS})
+            driver.execute_cdp_cmd('Emulation.setEmulatedMedia', {
+                'features': [{'name': 'prefers-reduced-motion', 'value': 'reduce'}]
+            })
+            driver.execute_cdp_cmd('Animation.enable', {})
+            driver.execute_cdp_cmd('Animation.setPlaybackRate', {'playbackRate': 100})
+        except Exception as e:
+            logger.warning(f"设置请求屏蔽失败，按普通模式加载: {str(e)}")
+    
+    def _acquire_driver(self) -> webdriver.Chrome:
+        """从驱动池取出驱动，未启用驱动池时新建"""
+        if self._driver_pool:
+            return self._driver_pool.acquire()
+        return self._create_driver()
+    
+    def _release_driver(self, driver: webdriver.Chrome, broken: bool = False, rss_mb: Optional[float] = None):
+        """归还驱动到驱动池，未启用驱动池时直接关闭"""
+        if self._driver_pool:
+            self._driver_pool.release(driver, broken=broken, rss_mb=rss_mb)
+        else:
+            driver.quit()
+    
+    # 一次 execute_script 取回页面上所有候选数据，避免逐个元素往返 chromedriver
+    _HARVEST_SCRIPT = """
+        const mediaOf = (el) => {
+            if (el.tagName === 'IMG') {
+                return el.src;
+            } else if (el.tagName === 'VIDEO') {
+                return el.poster || el.src;
+            } else if (el.tagName === 'SOURCE') {
+                return el.srcset || el.src;
+            } else if (el.tagName === 'PICTURE') {
+                const img = el.querySelector('img');
+                return img ? img.src : null;
+            }
+            return null;
+        };
+        const media = Array.from(document.querySelectorAll('img, video, picture, source')).map(mediaOf).filter(Boolean);
+        const scripts = Array.from(document.scripts).map(s => s.innerHTML).filter(Boolean);
+        const meta = {};
+        document.querySelectorAll('meta[property], meta[name]').forEach(m => {
+            const key = m.getAttribute('property') || m.getAttribute('name');
+            if (!(key in meta)) {
+                meta[key] = m.getAttribute('content');
+            }
+        });
+        const iframeMedia = [];
+        const blockedIframes = [];
+        Array.from(document.querySelectorAll('iframe')).forEach((frame, index) => {
+            try {
+                const doc = frame.contentDocument;
+                if (!doc) {
+                    throw new Error('cross-origin');
+                }
+                doc.querySelectorAll('img').forEach(img => { if (img.src) iframeMedia.push(img.src); });
+            } catch (e) {
+                blockedIframes.push(index);
+            }
+        });
+        const h1 = document.querySelector('h1');
+        // 跨域资源未返回 Timing-Allow-Origin 时 transferSize 为 0，字节数是下限
+        const nav = performance.getEntriesByType('navigation')[0];
+        const resources = performance.getEntriesByType('resource');
+        let bytes = nav ? nav.transferSize : 0;
+        resources.forEach(r => { bytes += r.transferSize || 0; });
+        return {
+            media: media,
+            scripts: scripts,
+            meta: meta,
+            iframe_media: iframeMedia,
+            blocked_iframes: blockedIframes,
+            h1: h1 ? h1.innerText.trim() : null,
+            title: document.title,
+            load: {
+                bytes: bytes,
+                requests: resources.length + 1,
+                load_ms: nav ? Math.round((nav.loadEventEnd || nav.domContentLoadedEventEnd) - nav.startTime) : null
+            }
+        };
+    """
+    
+    def _harvest_page(self, driver: webdriver.Chrome, timer: Optional[StageTimer] = None) -> Dict:
+        """
+        一次性读取页面快照（媒体 URL、脚本内容、meta、iframe 图片、h1、title）
+        
+        Args:
+            driver: Chrome 浏览器驱动实例
+            timer: 阶段计时器，记录 harvest 和 iframes 两个阶段
+        
+        Returns:
+            页面快照字典，结构与 static_parser.parse_html 一致
+        """
+        timer = timer or StageTimer()
+        with timer.span('harvest'):
+            snapshot = driver.execute_script(self._HARVEST_SCRIPT)
+        
+        # 跨域 iframe 无法在页面脚本中访问，只对这些 iframe 切换上下文读取
+        iframe_start = time.perf_counter()
+        for index in snapshot.pop('blocked_iframes', []):
+            try:
+                driver.switch_to.frame(index)
+                snapshot['iframe_media'].extend(driver.execute_script(
+                    "return Array.from(document.querySelectorAll('img')).map(img => img.src).filter(Boolean);"
+                ))
+            except Exception as e:
+                logger.warning(f"处理 iframe 失败: {str(e)}")
+            finally:
+                driver.switch_to.default_content()
+        timer.add('iframes', time.perf_counter() - iframe_start)
+        
+        logger.info(f"页面快照: {len(snapshot['media'])} 个媒体元素, {len(snapshot['scripts'])} 个脚本, "
+                    f"{len(snapshot['iframe_media'])} 个 iframe 图片")
+        return snapshot
+    
+    def extract_app_name(self, driver: webdriver.Chrome, snapshot: Optional[Dict] = None) -> Optional[str]:
         """
         从页面中提取应用名称
 
         Args:
             driver: Chrome 浏览器驱动实例
+            snapshot: 已读取的页面快照，为 None 时重新读取
 
         Returns:
             应用名称，未找到则返回 None
         """
         try:
-            # 尝试多种方式查找应用名称
-            app_name = None
-            
-            # 方式 1: 查找 h1 标签
-            try:
-                app_name_element = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, 'h1'))
-                )
-                app_name = app_name_element.text.strip()
-            except:
-                pass
-            
-            # 方式 2: 查找 og:title meta 标签
-            if not app_name:
-                try:
-                    app_name = driver.find_element(By.XPATH, "//meta[@property='og:title']").get_attribute('content')
-                except:
-                    pass
-            
-            # 方式 3: 查找 title 标签
-            if not app_name:
-                try:
-                    app_name = driver.title
-                    # 清理标题，移除 " - App Store" 后缀
-                    if ' - App Store' in app_name:
-                        app_name = app_name.split(' - App Store')[0]
-                except:
-                    pass
-            
-            return app_name
-            
+            return self._name_from_snapshot(snapshot or self._harvest_page(driver))
         except Exception as e:
             logger.error(f"提取应用名称失败: {str(e)}")
             return None
     
-    def extract_screenshots(self, driver: webdriver.Chrome) -> List[Dict]:
+    def extract_screenshots(self, driver: webdriver.Chrome, snapshot: Optional[Dict] = None) -> List[Dict]:
         """
         从页面中提取应用截图 URL
 
         Args:
             driver: Chrome 浏览器驱动实例
+            snapshot: 已读取的页面快照，为 None 时重新读取
 
         Returns:
             截图 URL 列表
         """
-        screenshots = []
-        seen_urls = set()
-        
         try:
-            # 等待页面加载完成
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, 'body'))
-            )
-            
-            # 执行 JavaScript 来查找截图
-            logger.info("执行 JavaScript 来查找截图")
-            try:
-                # 查找所有可能的媒体元素
-                media_elements = driver.execute_script("""
-                    return Array.from(document.querySelectorAll('img, video, picture, source')).map(el => {
-                        if (el.tagName === 'IMG') {
-                            return el.src;
-                        } else if (el.tagName === 'VIDEO') {
-                            return el.poster || el.src;
-                        } else if (el.tagName === 'SOURCE') {
-                            return el.srcset || el.src;
-                        } else if (el.tagName === 'PICTURE') {
-                            const img = el.querySelector('img');
-                            return img ? img.src : null;
-                        }
-                        return null;
-                    }).filter(Boolean);
-                """)
-                
-                logger.info(f"通过 JavaScript 找到 {len(media_elements)} 个媒体元素")
-                logger.info(f"前10个媒体元素: {media_elements[:10]}")
-                
-                # 过滤截图
-                for url in media_elements:
-                    if url and 'mzstatic.com' in url:
-                        # 从srcset中提取第一个URL
-                        if ' ' in url and ('w,' in url or 'x,' in url):
-                            # 这是一个srcset，提取第一个URL
-                            first_url = url.split(',')[0].split(' ')[0].strip()
-                            if any(ext in first_url.lower() for ext in ['.png', '.jpg', '.jpeg', '.webp']):
-                                url = first_url
-                        
-                        if any(ext in url.lower() for ext in ['.png', '.jpg', '.jpeg', '.webp']):
-                            # 过滤掉不需要的图片
-                            if ('AppIcon' not in url and 'Placeholder' not in url and '1x1.gif' not in url and
-                                '64x64' not in url and '128x128' not in url and '32x32' not in url and
-                                'video-control' not in url and 'supports-' not in url):
-                                # 只保留看起来像截图的URL
-                                if any(keyword in url.lower() for keyword in ['source', 'screenshot', 'purple', 'app']):
-                                    if url not in seen_urls:
-                                        seen_urls.add(url)
-                                        screenshots.append({
-                                            'jpeg': url,
-                                            'webp': url.replace('.png', '.webp') if '.png' in url else url,
-                                            'base_url': url
-                                        })
-                                        logger.info(f"从 JavaScript 中添加截图: {url}")
-            except Exception as e:
-                logger.warning(f"JavaScript 执行失败: {str(e)}")
-            
-            # 查找 iframe 中的图片
-            logger.info("查找 iframe 中的图片")
-            try:
-                iframes = driver.find_elements(By.TAG_NAME, 'iframe')
-                logger.info(f"找到 {len(iframes)} 个 iframe")
-                
-                for iframe in iframes:
-                    try:
-                        driver.switch_to.frame(iframe)
-                        iframe_imgs = driver.find_elements(By.TAG_NAME, 'img')
-                        logger.info(f"在 iframe 中找到 {len(iframe_imgs)} 个图片元素")
-                        
-                        for img in iframe_imgs:
-                            try:
-                                img_url = img.get_attribute('src')
-                                if img_url and 'mzstatic.com' in img_url:
-                                    if img_url not in seen_urls:
-                                        seen_urls.add(img_url)
-                                        screenshots.append({
-                                            'jpeg': img_url,
-                                            'webp': img_url.replace('.png', '.webp') if '.png' in img_url else img_url,
-                                            'base_url': img_url
-                                        })
-                                        logger.info(f"从 iframe 中添加截图: {img_url}")
-                            except:
-                                pass
-                        
-                        driver.switch_to.default_content()
-                    except Exception as e:
-                        logger.warning(f"处理 iframe 失败: {str(e)}")
-                        driver.switch_to.default_content()
-                        continue
-            except:
-                pass
-            
-            # 查找所有图片元素
-            img_elements = driver.find_elements(By.TAG_NAME, 'img')
-            logger.info(f"找到 {len(img_elements)} 个图片元素")
-            
-            # 收集所有图片URL
-            all_img_urls = []
-            for img in img_elements:
-                try:
-                    img_url = img.get_attribute('src')
-                    if img_url:
-                        all_img_urls.append(img_url)
-                except:
-                    pass
-            
-            # 打印前15个图片URL用于调试
-            logger.info(f"前15个图片URL: {all_img_urls[:15]}")
-            
-            # 查找脚本标签中的图片URL
-            logger.info("尝试从脚本标签中提取截图")
-            script_elements = driver.find_elements(By.TAG_NAME, 'script')
-            
-            for script in script_elements:
-                try:
-                    script_content = script.get_attribute('innerHTML')
-                    if script_content:
-                        # 查找 mzstatic.com 的图片URL
-                        import re
-                        screenshot_urls = re.findall(r'https://[\w.-]+mzstatic\.com/[\w/-]+\.(?:png|jpg|jpeg|webp)', script_content)
-                        for url in screenshot_urls:
-                            # 过滤掉不需要的图片
-                            if ('AppIcon' not in url and 'Placeholder' not in url and '1x1.gif' not in url and
-                                '64x64' not in url and '128x128' not in url and '32x32' not in url and
-                                'video-control' not in url and 'supports-' not in url):
-                                # 只保留看起来像截图的URL
-                                if any(keyword in url.lower() for keyword in ['source', 'screenshot', 'purple', 'app']):
-                                    if url not in seen_urls:
-                                        seen_urls.add(url)
-                                        screenshots.append({
-                                            'jpeg': url,
-                                            'webp': url.replace('.png', '.webp') if '.png' in url else url,
-                                            'base_url': url
-                                        })
-                                        logger.info(f"从脚本中添加截图: {url}")
-                except:
-                    pass
-            
-            # 限制最多 8 张截图
+            screenshots = self._screenshots_from_snapshot(snapshot or self._harvest_page(driver))
             logger.info(f"最终提取到 {len(screenshots)} 张截图")
-            return screenshots[:8]
-            
+            return screenshots
         except Exception as e:
             logger.error(f"提取截图失败: {str(e)}")
             import traceback
             logger.error(f"详细错误: {traceback.format_exc()}")
             return []
     
-    def extract_app_icon(self, driver: webdriver.Chrome) -> Optional[Dict]:
+    def extract_app_icon(self, driver: webdriver.Chrome, snapshot: Optional[Dict] = None) -> Optional[Dict]:
         """
         提取应用图标
 
         Args:
             driver: Chrome 浏览器驱动实例
+            snapshot: 已读取的页面快照，为 None 时重新读取
 
         Returns:
             包含图标 URL 的字典，返回 None 则未找到
         """
         try:
-            # 查找 og:image meta 标签
-            try:
-                icon_url = driver.find_element(By.XPATH, "//meta[@property='og:image']").get_attribute('content')
-                if icon_url:
-                    return {
-                        'url': icon_url,
-                        'high_res': icon_url
-                    }
-            except:
-                pass
-            
-            # 查找所有图片，寻找可能的图标
-            img_elements = driver.find_elements(By.TAG_NAME, 'img')
-            for img in img_elements:
-                try:
-                    img_url = img.get_attribute('src')
-                    if img_url and 'mzstatic.com' in img_url and 'AppIcon' in img_url:
-                        return {
-                            'url': img_url,
-                            'high_res': img_url
-                        }
-                except:
-                    pass
-            
-            return None
-            
+            return self._icon_from_snapshot(snapshot or self._harvest_page(driver))
         except Exception as e:
             logger.error(f"提取应用图标失败: {str(e)}")
             return None
     
-    def scrape_app(self, url: str) -> Optional[Dict]:
+    def _screenshots_from_snapshot(self, snapshot: Dict) -> List[Dict]:
+        """
+        从页面快照中提取应用截图
+        
+        Args:
+            snapshot: 页面快照（见 static_parser.parse_html）
+        
+        Returns:
+            截图记录列表（最多 8 张，同一截图的不同尺寸/格式变体只保留第一个）
+        """
+        classifier = self._classifier
+        seen_urls = set()
+        
+        # 页面媒体元素 -> iframe 图片（不做关键词过滤）-> 脚本中的 URL
+        urls = classifier.classify_batch(
+            (classifier.media_url(value) for value in snapshot.get('media', [])), seen_urls)
+        for url in snapshot.get('iframe_media', []):
+            if url and 'mzstatic.com' in url and url not in seen_urls:
+                seen_urls.add(url)
+                urls.append(url)
+        for script_content in snapshot.get('scripts', []):
+            urls.extend(classifier.classify_batch(classifier.find_in_script(script_content), seen_urls))
+        
+        screenshots = []
+        seen_assets = set()
+        for url in urls:
+            key = asset_key(url)
+            if key in seen_assets:
+                continue
+            seen_assets.add(key)
+            screenshots.append(screenshot_record(url))
+            if len(screenshots) == 8:
+                break
+        return screenshots
+    
+    def _icon_from_snapshot(self, snapshot: Dict) -> Optional[Dict]:
+        """从页面快照中提取应用图标"""
+        icon_url = snapshot.get('meta', {}).get('og:image')
+        if not icon_url:
+            icon_url = next((url for url in snapshot.get('media', [])
+                             if url and self._classifier.is_icon(url)), None)
+        if icon_url:
+            # og:image 是 1200x630 的分享卡片，改写为 1024x1024 的完整图标
+            parsed = MzstaticUrl.parse(icon_url)
+            return {
+                'url': icon_url,
+                'high_res': parsed.with_size(1024, 1024, crop='bb').url if parsed else icon_url
+            }
+        return None
+    
+    def _name_from_snapshot(self, snapshot: Dict) -> Optional[str]:
+        """从页面快照中提取应用名称（h1 > og:title > title）"""
+        app_name = snapshot.get('h1') or snapshot.get('meta', {}).get('og:title')
+        if not app_name and snapshot.get('title'):
+            app_name = snapshot['title']
+            # 清理标题，移除 " - App Store" 后缀
+            if ' - App Store' in app_name:
+                app_name = app_name.split(' - App Store')[0]
+        return app_name
+    
+    def scrape_app_static(self, url: str, html: Optional[str] = None) -> Optional[Dict]:
+        """
+        不启动浏览器，直接解析服务端渲染的 HTML 抓取应用信息
+        
+        Args:
+            url: App Store 链接
+            html: 已获取的页面 HTML（例如离线保存的文件），为 None 时发起一次 HTTP 请求
+        
+        Returns:
+            包含应用信息的字典；截图数量不足、应用不存在或请求失败时返回 None
+        """
+        try:
+            return self.scrape_static_page(url, html)[0]
+        except Exception as e:
+            logger.warning(f"静态解析失败: {url} - {str(e)}")
+            return None
+    
+    def scrape_static_page(self, url: str, html: Optional[str] = None,
+                           timer: Optional[StageTimer] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        静态解析并同时返回页面 HTML（供缓存使用）
+
+        Args:
+            url: App Store 链接
+            html: 已获取的页面 HTML，为 None 时发起一次 HTTP 请求
+            timer: 记录 static_fetch / static_parse / extract 耗时的计时器
+
+        Returns:
+            (应用信息, 页面 HTML)；截图不足时应用信息为 None，请求或解析失败时均为 None。
+            应用不存在（404）时抛出异常，不再回退到浏览器
+        """
+        app_id = self.extract_app_id(url)
+        if not app_id:
+            return None, None
+        
+        timer = timer or StageTimer()
+        try:
+            if html is None:
+                with timer.span('static_fetch'):
+                    html = fetch_page(url)
+            with timer.span('static_parse'):
+                snapshot = parse_html(html)
+        except Exception as e:
+            if classify_error(e) == NOT_FOUND:
+                raise
+            logger.warning(f"静态解析失败，回退到 Selenium: {url} - {str(e)}")
+            return None, None
+        
+        with timer.span('extract'):
+            screenshots = self._screenshots_from_snapshot(snapshot)
+        if len(screenshots) < self.min_static_screenshots:
+            logger.info(f"静态解析仅找到 {len(screenshots)} 张截图，回退到 Selenium: {url}")
+            return None, html
+        
+        app_name = self._name_from_snapshot(snapshot)
+        logger.info(f"静态解析成功抓取应用信息: {app_name}")
+        return {
+            'id': app_id,
+            'name': app_name or f"App {app_id}",
+            'url': url,
+            'storefront': self.extract_storefront(url),
+            'icon': self._icon_from_snapshot(snapshot),
+            'screenshots': screenshots,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'status': 'success',
+            'engine': 'static'
+        }, html
+    
+    def _reset_retry_stats(self):
+        """清零重试统计"""
+        with self._retry_lock:
+            self.retry_stats = {'retries': 0, 'recovered': 0, 'failed': 0, 'errors': {}}
+    
+    def _count_retry(self, key: str, category: Optional[str] = None):
+        """累加重试统计"""
+        with self._retry_lock:
+            self.retry_stats[key] += 1
+            if category:
+                self.retry_stats['errors'][category] = self.retry_stats['errors'].get(category, 0) + 1
+    
+    def error_record(self, url: str, error: Exception, category: str, retry_errors: List[str]) -> Dict:
+        """
+        构建失败结果
+
+        Args:
+            url: App Store 链接
+            error: 最后一次尝试的异常
+            category: 错误类别
+            retry_errors: 每次尝试的错误类别
+
+        Returns:
+            status 为 error 的结果字典
+        """
+        return {'id': self.extract_app_id(url) or 'unknown', 'name': 'Unknown', 'url': url,
+                'storefront': self.extract_storefront(url), 'status': 'error', 'error': str(error),
+                'error_type': category, 'attempts': len(retry_errors), 'retry_errors': retry_errors}
+    
+    def scrape_app(self, url: str, browser_only: bool = False) -> Optional[Dict]:
         """
-        抓取单个 App 应用信息
+        抓取单个 App 应用信息，超时、浏览器崩溃、限流等临时错误按重试策略退避后重试
 
         Args:
             url: App Store 链接
+            browser_only: 跳过缓存读取和静态解析，直接使用浏览器（异步引擎回退时使用）
+
+        Returns:
+            包含应用信息的字典（含 attempts 尝试次数和 timings 各阶段耗时），未成功抓取则返回 None
+        """
+        timer = StageTimer()
+        start = time.perf_counter()
+        result = self._scrape_with_retry(url, browser_only, timer)
+        if result is not None:
+            timer.add('total', time.perf_counter() - start)
+            result['timings'] = timer.timings
+        return result
+    
+    def _scrape_with_retry(self, url: str, browser_only: bool, timer: StageTimer) -> Optional[Dict]:
+        """按重试策略反复调用 _scrape_once，重试前的退避时间计入 backoff 阶段"""
+        retry_errors: List[str] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            self.circuit_breaker.before_call()
+            try:
+                result = self._scrape_once(url, browser_only, timer)
+            except Exception as e:
+                delay, failed = self.record_failure(url, e, attempt, retry_errors)
+                if failed:
+                    return failed
+                with timer.span('backoff'):
+                    time.sleep(delay)
+                continue
+            
+            if result is None or result.get('from_cache'):
+                return result
+            return self.record_success(result, attempt, retry_errors)
+    
+    def record_failure(self, url: str, error: Exception, attempt: int,
+                       retry_errors: List[str]) -> Tuple[Optional[float], Optional[Dict]]:
+        """
+        记录一次失败的尝试（重试统计和熔断），并按重试策略决定是否重试
+
+        Args:
+            url: App Store 链接
+            error: 本次尝试抛出的异常
+            attempt: 已尝试次数（从 1 开始）
+            retry_errors: 之前各次尝试的错误类别，本次的类别会追加到其中
+
+        Returns:
+            需要重试时为 (退避秒数, None)，否则为 (None, 失败结果)
+        """
+        category = classify_error(error)
+        retry_errors.append(category)
+        if category != NOT_FOUND:
+            # 应用下架不代表服务异常，不计入熔断失败率
+            self.circuit_breaker.record(False)
+        retry = self.retry_policy.should_retry(category, attempt)
+        self._count_retry('retries' if retry else 'failed', category)
+        if not retry:
+            logger.error(f"抓取错误 ({category}，共尝试 {attempt} 次): {url} - {str(error)}")
+            return None, self.error_record(url, error, category, retry_errors)
+        delay = self.retry_policy.delay(category, attempt)
+        logger.warning(f"抓取错误 ({category})，{delay:.1f}s 后第 {attempt + 1} 次尝试: {url} - {str(error)}")
+        return delay, None
+    
+    def record_success(self, result: Dict, attempt: int, retry_errors: List[str]) -> Dict:
+        """
+        记录一次成功的尝试（熔断和重试统计），并在结果中写入尝试次数
+
+        Args:
+            result: 抓取结果
+            attempt: 已尝试次数（从 1 开始）
+            retry_errors: 之前各次尝试的错误类别
 
         Returns:
-            包含应用信息的字典，未成功抓取则返回 None
+            写入 attempts（和 retry_errors）后的结果
         """
+        self.circuit_breaker.record(True)
+        result['attempts'] = attempt
+        if retry_errors:
+            result['retry_errors'] = retry_errors
+            self._count_retry('recovered')
+        return result
+    
+    def _scrape_once(self, url: str, browser_only: bool, timer: StageTimer) -> Optional[Dict]:
+        """抓取单个应用一次，出错时抛出异常由 scrape_app 分类重试"""
         driver = None
+        broken = False
+        rss_mb = None
         
         try:
             app_id = self.extract_app_id(url)
@@ -388,275 +676,404 @@ class AppStoreScraperSelenium:
                 logger.error(f"无法提取应用 ID: {url}")
                 return None
 
+            storefront = self.extract_storefront(url)
+            
+            # 缓存命中时完全跳过网络请求和浏览器
+            if self.cache and not self.refresh and not browser_only:
+                with timer.span('cache_lookup'):
+                    cached = self.cache.get(storefront, app_id)
+                if cached:
+                    logger.info(f"缓存命中 (ID: {app_id}, 地区: {storefront})")
+                    return dict(cached, url=url, from_cache=True)
+
             logger.info(f"开始抓取应用 (ID: {app_id}): {url}")
 
-            # 创建浏览器驱动
-            driver = self._create_driver()
-            
-            # 清除缓存和 cookies
-            driver.delete_all_cookies()
+            # 优先尝试静态 HTML 解析，截图不足时才启动浏览器
+            if self.static_first and not browser_only:
+                app_info, html = self.scrape_static_page(url, timer=timer)
+                if app_info:
+                    if self.cache:
+                        with timer.span('cache_write'):
+                            self.cache.put(storefront, app_id, app_info, html)
+                    return app_info
+
+            # 获取浏览器驱动（批量抓取时从驱动池复用）
+            with timer.span('driver_acquire'):
+                driver = self._acquire_driver()
             
-            # 发送请求获取页面
-            driver.get(url)
+            with timer.span('driver_get'):
+                # 清除缓存和 cookies
+                driver.delete_all_cookies()
+                
+                # 发送请求获取页面
+                driver.get(url)
             
-            # 等待页面加载
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, 'body'))
-            )
+            # 截图区域或内嵌数据出现即开始提取，超时时间按历史 p95 自适应
+            ready, waited = self.readiness.wait(driver)
+            timer.add('wait', waited)
 
-            # 提取信息
-            app_name = self.extract_app_name(driver)
-            screenshots = self.extract_screenshots(driver)
-            icon = self.extract_app_icon(driver)
+            # 提取信息（整页只读取一次）
+            snapshot = self._harvest_page(driver, timer)
+            page_load = snapshot.pop('load', None)
+            with timer.span('extract'):
+                app_name = self.extract_app_name(driver, snapshot)
+                screenshots = self.extract_screenshots(driver, snapshot)
+                icon = self.extract_app_icon(driver, snapshot)
+            
+            # 页面加载完成后驱动内存接近本页峰值，归还时复用该采样判断是否回收
+            if self.watchdog:
+                with timer.span('memory_sample'):
+                    rss_mb = self.watchdog.sample(driver)
 
             # 构建结果
             app_info = {
                 'id': app_id,
                 'name': app_name or f"App {app_id}",
                 'url': url,
+                'storefront': storefront,
                 'icon': icon,
                 'screenshots': screenshots,
                 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'status': 'success'
+                'status': 'success',
+                'engine': 'selenium',
+                'wait_seconds': round(waited, 3),
+                'page_ready': ready,
+                'page_load': page_load,
+                'metadata_only': self.metadata_only,
+                'driver_rss_mb': rss_mb
             }
+            
+            if self.cache:
+                with timer.span('cache_write'):
+                    html = driver.page_source if self.cache.store_html else None
+                    self.cache.put(storefront, app_id, app_info, html)
 
             logger.info(f"成功抓取应用信息: {app_name}")
             return app_info
 
-        except Exception as e:
-            logger.error(f"抓取错误: {url} - {str(e)}")
-            return {'id': 'unknown', 'name': 'Unknown', 'url': url, 'status': 'error', 'error': str(e)}
+        except Exception:
+            broken = True
+            raise
         finally:
             if driver:
-                driver.quit()
+                with timer.span('driver_release'):
+                    self._release_driver(driver, broken=broken, rss_mb=rss_mb)
     
-    def scrape_multiple_apps(self, urls: List[str], max_workers: int = 6) -> List[Dict]:
+    def scrape_multiple_apps(self, urls: Iterable[str], max_workers: int = 6,
+                             max_driver_uses: int = 50, journal_file: Optional[str] = None,
+                             resume: bool = False, stream_file: Optional[str] = None,
+                             engine: str = 'threads', max_in_flight: int = 200,
+                             wait_budget: Optional[float] = None,
+                             metrics_file: Optional[str] = None) -> List[Dict]:
         """
         批量抓取多个应用
 
         Args:
-            urls: App Store 链接列表
-            max_workers: 最大并发线程数
+            urls: App Store 链接列表，也可以是逐个产生链接的迭代器（如 UrlIngest），按需读取
+            max_workers: 最大并发线程数（同时也是驱动池大小）
+            max_driver_uses: 单个驱动最多复用的页面数，超过后重建
+            journal_file: 进度日志路径，每完成一个应用追加一行；为 None 时只保存在内存中
+            resume: 从进度日志恢复，跳过日志中已成功抓取的应用
+            stream_file: JSONL 流式输出路径，每完成一个应用写入一行（.gz 结尾时 gzip 压缩）
+            engine: 'threads' 使用线程池逐个调用 scrape_app；'async' 使用 asyncio 引擎并发请求静态页面，
+                    仅在需要时交给 max_workers 个浏览器线程
+            max_in_flight: 同时在途的应用数（async 引擎为页面请求数，线程池为已提交未完成的任务数），
+                           只在有空位时才从 urls 读取下一个链接
+            wait_budget: 本轮所有应用累计等待页面就绪的秒数上限，用完后每个页面只做最短等待
+            metrics_file: 结束时写出各阶段耗时分布的指标文件（.prom/.txt 为 Prometheus 文本格式，否则为 JSON）
 
         Returns:
-            应用信息列表
+            应用信息列表（使用进度日志时从日志构建，包含之前已完成的应用）
         """
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
         
         results = []
+        total = len(urls) if isinstance(urls, (list, tuple)) else None
         
-        logger.info(f"开始并发抓取 {len(urls)} 个应用，最大并发数: {max_workers}")
+        journal = ScrapeJournal(journal_file) if journal_file else None
+        if journal and resume:
+            done = journal.completed_keys()
+            logger.info(f"从进度日志恢复: 跳过已完成的 {len(done)} 个应用")
+            urls = (url for url in urls if (self.extract_storefront(url), self.extract_app_id(url)) not in done)
+            total = None
+        elif journal:
+            journal.reset()
+        
+        stream = JsonlWriter(stream_file) if stream_file else None
+        
+        logger.info(f"开始并发抓取 {total if total is not None else '（按需读取）'} 个应用，最大并发数: {max_workers}")
         
         def scrape_single_app(url):
-            """单线程抓取函数"""
-            return self.scrape_app(url)
+            """单线程抓取函数，记录单个应用耗时"""
+            start = time.perf_counter()
+            result = self.scrape_app(url)
+            if result:
+                result['elapsed'] = round(time.perf_counter() - start, 3)
+            return result
         
-        # 使用线程池并发处理
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_url = {executor.submit(scrape_single_app, url): url for url in urls}
-            
-            # 处理结果 - 不保存中间文件，只保留最终结果
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-                except Exception as e:
-                    logger.error(f"抓取失败 {url}: {str(e)}")
+        def handle_result(result):
+            """收集单个结果并写入进度日志和流式输出"""
+            if result:
+                results.append(result)
+                if result.get('timings'):
+                    self.metrics.observe_timings(result['timings'])
+                if journal:
+                    journal.append(result)
+                if stream:
+                    stream.write(result)
+                if self.store:
+                    self.store.add(result)
+        
+        self.readiness.start_run(wait_budget)
+        self._reset_retry_stats()
+        self.metrics.reset()
+        if self.store:
+            self.store.start_run({'mode': 'urls', 'engine': engine, 'max_workers': max_workers, 'urls': total})
+        
+        # 所有工作线程共享一个热驱动池
+        self._driver_pool = DriverPool(self._create_driver, max_size=max_workers, max_uses=max_driver_uses,
+                                       watchdog=self.watchdog)
+        
+        try:
+            if engine == 'async':
+                AsyncScrapeEngine(self, max_in_flight=max_in_flight,
+                                  browser_workers=max_workers).run(urls, on_result=handle_result)
+            else:
+                # 使用线程池并发处理，未完成的任务不超过 max_in_flight 个，输入按需读取
+                url_iter = iter(urls)
+                future_to_url = {}
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    while True:
+                        for url in itertools.islice(url_iter, max(0, max_in_flight - len(future_to_url))):
+                            future_to_url[executor.submit(scrape_single_app, url)] = url
+                        if not future_to_url:
+                            break
+                        
+                        # 处理结果
+                        finished, _ = wait(future_to_url, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            url = future_to_url.pop(future)
+                            try:
+                                handle_result(future.result())
+                            except Exception as e:
+                                logger.error(f"抓取失败 {url}: {str(e)}")
+        finally:
+            self._close_driver_pool()
+            if stream:
+                stream.close()
+            if self.store:
+                self.store.finish_run()
+            self._log_run_summary(results, metrics_file)
         
         # 等待所有任务完成（线程池会自动等待）
+        if journal:
+            return journal.load()
         return results
     
-    def _build_html_content(self, apps_data: List[Dict]) -> str:
+    def scrape_storefronts(self, app_ids: List[str], storefronts: List[str], max_workers: int = 6,
+                           max_driver_uses: int = 50, stream_file: Optional[str] = None,
+                           wait_budget: Optional[float] = None,
+                           metrics_file: Optional[str] = None) -> List[Dict]:
         """
-        构建 HTML 报告内容
+        多地区批量抓取：每个应用 ID 在所有地区各抓取一次，合并为一条记录
+
+        同一应用的各地区页面由同一个工作线程依次抓取，释放的驱动会立即被该线程再次取回（驱动池为 LIFO），
+        因此同一应用的页面共用一个热驱动；各地区相同的截图在合并记录中只保留一份。
 
         Args:
-            apps_data: 应用信息列表
+            app_ids: 应用 ID 列表（重复的 ID 只抓取一次）
+            storefronts: 地区代码列表，第一个为主地区（顶层名称和图标取自主地区）
+            max_workers: 最大并发线程数（同时也是驱动池大小）
+            max_driver_uses: 单个驱动最多复用的页面数，超过后重建
+            stream_file: JSONL 流式输出路径，每完成一个应用写入一行合并记录
+            wait_budget: 本轮所有页面累计等待页面就绪的秒数上限
+            metrics_file: 结束时写出各阶段耗时分布的指标文件
 
         Returns:
-            HTML 内容字符串
+            合并后的应用记录列表，每条记录的 locales 为 {地区: {status, name, url, screenshots: [asset_key]}}
         """
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>App Store 应用报告</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        h1 {{
-            color: #147EFB;
-            text-align: center;
-            margin-bottom: 30px;
-        }}
-        .summary {{
-            background-color: #fff;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 30px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            max-width: none;
-        }}
-        .app-card {{
-            background-color: #fff;
-            border-radius: 8px;
-            padding: 20px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            max-width: none;
-        }}
-        .app-card h2 {{
-            color: #147EFB;
-            margin-top: 0;
-        }}
-        .app-info {{
-            margin-bottom: 15px;
-        }}
-        .app-info span {{
-            font-weight: bold;
-        }}
-        .screenshots {{
-            margin-top: 15px;
-        }}
-        .screenshot-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(250px, 1fr));
-            gap: 15px;
-            margin-top: 10px;
-        }}
-        .screenshot-item {{
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            overflow: hidden;
-            background-color: #f9f9f9;
-        }}
-        .screenshot-item img {{
-            width: 100%;
-            height: auto;
-            display: block;
-            transition: transform 0.3s ease;
-        }}
-        .screenshot-item img:hover {{
-            transform: scale(1.05);
-        }}
-        .error {{
-            background-color: #ffebee;
-            border-left: 4px solid #f44336;
-            padding: 10px;
-            margin: 10px 0;
-        }}
-        .success {{
-            background-color: #e8f5e8;
-            border-left: 4px solid #4caf50;
-            padding: 10px;
-            margin: 10px 0;
-        }}
-        @media (max-width: 768px) {{
-            body {{
-                padding: 10px;
-            }}
-            .screenshot-grid {{
-                grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
-                gap: 10px;
-            }}
-            .app-card, .summary {{
-                padding: 15px;
-            }}
-        }}
-        @media (max-width: 480px) {{
-            .screenshot-grid {{
-                grid-template-columns: repeat(auto-fill, minmax(120px, 1fr));
-                gap: 8px;
-            }}
-            .app-card, .summary {{
-                padding: 10px;
-            }}
-            h1 {{
-                font-size: 1.5em;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <h1>App Store 应用报告</h1>
-    <div class="summary">
-        <h2>报告摘要</h2>
-        <p>生成时间: {time.strftime('%Y-%m-%d %H:%M:%S')}</p>
-        <p>总应用数: {len(apps_data)}</p>
-        <p>成功: {sum(1 for app in apps_data if app.get('status') == 'success')}</p>
-        <p>失败: {sum(1 for app in apps_data if app.get('status') != 'success')}</p>
-    </div>
-"""
-
-        for app in apps_data:
-            if app.get('status') == 'success':
-                screenshots_html = ""
-                if app.get('screenshots'):
-                    screenshots_html = """
-        <div class="screenshots">
-            <h3>应用截图</h3>
-            <div class="screenshot-grid">
-                    """
-                    for screenshot in app.get('screenshots', []):
-                        screenshots_html += f"""
-                <div class="screenshot-item">
-                    <img src="{screenshot.get('jpeg')}" alt="应用截图">
-                </div>
-                        """
-                    screenshots_html += """
-            </div>
-        </div>
-                    """
-            
-                html_content += f"""
-    <div class="app-card">
-        <h2>{app.get('name', 'Unknown')}</h2>
-        <div class="app-info">
-            <p><span>应用 ID:</span> {app.get('id', 'Unknown')}</p>
-            <p><span>应用链接:</span> <a href="{app.get('url', '#')}" target="_blank">{app.get('url', '#')}</a></p>
-            <p><span>状态:</span> <span class="success">成功</span></p>
-            <p><span>截图数量:</span> {len(app.get('screenshots', []))}</p>
-        </div>
-        {screenshots_html}
-    </div>
-                """
-            else:
-                html_content += f"""
-    <div class="app-card">
-        <h2>{app.get('name', 'Unknown')}</h2>
-        <div class="app-info">
-            <p><span>应用 ID:</span> {app.get('id', 'Unknown')}</p>
-            <p><span>应用链接:</span> <a href="{app.get('url', '#')}" target="_blank">{app.get('url', '#')}</a></p>
-            <p><span>状态:</span> <span class="error">失败</span></p>
-            <p><span>错误信息:</span> {app.get('error', 'Unknown error')}</p>
-        </div>
-    </div>
-                """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         
-        html_content += """
-</body>
-</html>
-        """
+        app_ids = list(dict.fromkeys(str(app_id) for app_id in app_ids))
+        storefronts = list(dict.fromkeys(storefront.lower() for storefront in storefronts))
+        results = []
+        page_results = []
+        lock = threading.Lock()
+        stream = JsonlWriter(stream_file) if stream_file else None
+        
+        logger.info(f"开始多地区抓取 {len(app_ids)} 个应用 × {len(storefronts)} 个地区，最大并发数: {max_workers}")
+        
+        def scrape_locales(app_id):
+            """在当前线程中依次抓取一个应用的所有地区"""
+            per_locale = {}
+            for storefront in storefronts:
+                result = self.scrape_app(storefront_url(app_id, storefront))
+                per_locale[storefront] = result
+                if result:
+                    with lock:
+                        page_results.append(result)
+                    if result.get('timings'):
+                        self.metrics.observe_timings(result['timings'])
+            return merge_storefront_results(app_id, per_locale, primary=storefronts[0])
+        
+        self.readiness.start_run(wait_budget)
+        self._reset_retry_stats()
+        self.metrics.reset()
+        if self.store:
+            self.store.start_run({'mode': 'storefronts', 'storefronts': storefronts, 'max_workers': max_workers,
+                                  'apps': len(app_ids)})
+        self._driver_pool = DriverPool(self._create_driver, max_size=max_workers, max_uses=max_driver_uses,
+                                       watchdog=self.watchdog)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_id = {executor.submit(scrape_locales, app_id): app_id for app_id in app_ids}
+                for future in as_completed(future_to_id):
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        logger.error(f"抓取失败 {future_to_id[future]}: {str(e)}")
+                        continue
+                    results.append(record)
+                    if stream:
+                        stream.write(record)
+                    if self.store:
+                        self.store.add(record)
+        finally:
+            self._close_driver_pool()
+            if stream:
+                stream.close()
+            if self.store:
+                self.store.finish_run()
+            self._log_run_summary(page_results, metrics_file)
         
-        return html_content
+        total_shots = sum(len(r.get('screenshots', [])) for r in results)
+        locale_shots = sum(len(locale.get('screenshots', [])) for r in results for locale in r['locales'].values())
+        logger.info(f"多地区抓取完成: {len(results)} 个应用，{len(page_results)} 个页面，"
+                    f"截图 {locale_shots} 张（去重后 {total_shots} 张）")
+        return results
+    
+    def _close_driver_pool(self):
+        """记录驱动池统计并关闭所有驱动"""
+        self.driver_pool_stats = self._driver_pool.get_stats()
+        self._driver_pool.close()
+        self._driver_pool = None
+    
+    def _log_run_summary(self, results: List[Dict], metrics_file: Optional[str] = None):
+        """输出本轮批量抓取的驱动池、等待、重试、耗时和缓存统计"""
+        logger.info(f"驱动池统计: {self.driver_pool_stats}")
+        logger.info(f"页面等待统计: {self.readiness.get_stats()}")
+        logger.info(f"浏览器启动统计: {get_startup_report()}")
+        logger.info(f"重试统计: {self.retry_stats}，熔断: {self.circuit_breaker.get_stats()}")
+        if results:
+            logger.info(f"各阶段耗时（秒）:\n{self.metrics.format_summary()}")
+        if metrics_file:
+            self.write_metrics(metrics_file)
+        loads = [r['page_load'] for r in results if r.get('page_load')]
+        if loads:
+            total_bytes = sum(load['bytes'] for load in loads)
+            avg_ms = sum(load['load_ms'] or 0 for load in loads) / len(loads)
+            logger.info(f"浏览器页面: {len(loads)} 个，共下载 {total_bytes / 1024 / 1024:.1f} MB，"
+                        f"平均加载 {avg_ms:.0f} ms（元数据模式: {self.metadata_only}）")
+        if self.cache:
+            logger.info(f"缓存统计: {self.cache.get_stats()}")
+        if self.watchdog:
+            logger.info(f"内存看门狗: {self.watchdog.get_stats()}")
+            heaviest = sorted((r for r in results if r.get('driver_rss_mb')),
+                              key=lambda r: r['driver_rss_mb'], reverse=True)[:5]
+            for r in heaviest:
+                logger.info(f"  驱动内存 {r['driver_rss_mb']:.0f} MB: {r.get('name')} ({r.get('url')})")
+    
+    def download_assets(self, apps_data: List[Dict], asset_dir: Optional[str] = None,
+                        max_workers: int = 16, width: Optional[int] = None) -> Dict:
+        """
+        下载成功记录中的图标和截图到本地（按内容哈希去重，已下载的资源发送条件请求）
+
+        Args:
+            apps_data: 应用信息列表，下载后写入 icon['file'] 和 screenshot['file']
+            asset_dir: 资源目录，为 None 时使用输出目录下的 assets/
+            max_workers: 并发下载线程数
+            width: 截图下载宽度（按宽高比改写 mzstatic URL，例如 1290 用于存档），为 None 时下载记录中的 jpeg 变体
+
+        Returns:
+            下载统计（URL 数、下载数、未修改数、重复内容数、字节数、耗时）
+        """
+        downloader = AssetDownloader(asset_dir or os.path.join(self.output_dir, 'assets'), max_workers=max_workers)
+        with self.metrics.span('assets'):
+            stats = downloader.download_apps(apps_data, width=width)
+        if self.store:
+            # 数据库中的记录同步加入本地文件路径
+            self.store.update(apps_data)
+        return stats
+    
+    def collapse_near_duplicates(self, apps_data: List[Dict], asset_dir: Optional[str] = None,
+                                 max_distance: int = DEFAULT_MAX_DISTANCE, max_workers: int = 8) -> Dict:
+        """
+        按感知哈希合并已下载截图中的近似重复（需要先调用 download_assets，需要 Pillow）
+
+        Args:
+            apps_data: 应用信息列表，同一应用内的近似重复移到 near_duplicates，保留的截图写入 phash / cluster / shared_with
+            asset_dir: 资源目录，为 None 时使用输出目录下的 assets/
+            max_distance: 视为重复的最大汉明距离（64 位 dHash）
+            max_workers: 并发计算哈希的线程数
+
+        Returns:
+            统计（图片数、新计算数、缓存命中数、合并数、相似组数、跨应用相似组数）
+        """
+        with self.metrics.span('phash'):
+            stats = collapse_near_duplicates(apps_data, asset_dir or os.path.join(self.output_dir, 'assets'),
+                                             max_distance=max_distance, max_workers=max_workers)
+        if self.store:
+            self.store.update(apps_data)
+        return stats
+    
+    def write_metrics(self, path: str) -> str:
+        """
+        写出各阶段耗时分布（包含之后生成报告的耗时）及本轮运行统计
+
+        Args:
+            path: 输出路径，.prom/.txt 为 Prometheus 文本格式，否则为 JSON
+
+        Returns:
+            输出文件路径
+        """
+        return self.metrics.write(path, extra={
+            'driver_pool': self.driver_pool_stats,
+            'readiness': self.readiness.get_stats(),
+            'startup': get_startup_report(),
+            'retry': self.retry_stats,
+            'circuit_breaker': self.circuit_breaker.get_stats(),
+            'cache': self.cache.get_stats() if self.cache else None,
+            'memory': self.watchdog.get_stats() if self.watchdog else None,
+        })
     
-    def generate_html_report(self, apps_data: List[Dict], output_file: Optional[str] = None) -> str:
+    def _summary_extra(self) -> str:
+        """报告摘要中附加的运行统计"""
+        if not self.cache:
+            return ""
+        cache_stats = self.cache.get_stats()
+        return f"<p>缓存命中: {cache_stats['hits']}，未命中: {cache_stats['misses']}</p>"
+    
+    def _build_html_content(self, apps_data: Iterable[Dict]) -> str:
         """
-        生成 HTML 报告
+        构建 HTML 报告内容
 
         Args:
             apps_data: 应用信息列表
+
+        Returns:
+            HTML 内容字符串
+        """
+        buffer = io.StringIO()
+        HtmlReportRenderer(buffer, self._summary_extra()).render(apps_data)
+        return buffer.getvalue()
+    
+    def generate_html_report(self, apps_data: Iterable[Dict], output_file: Optional[str] = None) -> str:
+        """
+        生成 HTML 报告（逐个应用写入文件，不在内存中拼接整个页面）
+
+        Args:
+            apps_data: 应用信息列表，也可以是逐条产生结果的迭代器（如 iter_jsonl）
             output_file: 输出文件路径，如果为 None 则使用默认路径
 
         Returns:
@@ -666,16 +1083,35 @@ class AppStoreScraperSelenium:
             timestamp = time.strftime('%Y%m%d_%H%M%S')
             output_file = os.path.join(self.output_dir, f'appstore_report_{timestamp}.html')
 
-        # 生成 HTML 内容
-        html_content = self._build_html_content(apps_data)
-        
-        # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with self.metrics.span('report_html'), open(output_file, 'w', encoding='utf-8') as f:
+            HtmlReportRenderer(f, self._summary_extra()).render(apps_data)
         
         logger.info(f"HTML 报告已生成: {output_file}")
         return output_file
     
+    def generate_paginated_report(self, apps_data: Iterable[Dict], page_size: int = 100,
+                                  report_dir: Optional[str] = None) -> str:
+        """
+        生成分页 HTML 报告，适用于数百个以上应用的大批量结果
+
+        Args:
+            apps_data: 应用信息列表，也可以是逐条产生结果的迭代器
+            page_size: 每页应用数
+            report_dir: 输出目录，如果为 None 则在输出目录下新建 appstore_report_<时间戳>/
+
+        Returns:
+            索引页 index.html 的路径
+        """
+        if not report_dir:
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            report_dir = os.path.join(self.output_dir, f'appstore_report_{timestamp}')
+
+        with self.metrics.span('report_paginated'):
+            index_path = write_paginated_report(apps_data, report_dir, page_size, self._summary_extra())
+        
+        logger.info(f"分页 HTML 报告已生成: {index_path}")
+        return index_path
+    
     def generate_json_report(self, apps_data: List[Dict], output_file: Optional[str] = None) -> str:
         """
         生成 JSON 报告
@@ -692,12 +1128,60 @@ class AppStoreScraperSelenium:
             output_file = os.path.join(self.output_dir, f'appstore_data_{timestamp}.json')
 
         # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with self.metrics.span('report_json'), open(output_file, 'w', encoding='utf-8') as f:
             json.dump(apps_data, f, ensure_ascii=False, indent=2)
         
         logger.info(f"JSON 报告已保存: {output_file}")
         return output_file
 
+    def generate_delta_report(self, apps_data: List[Dict], previous: Union[str, Dict[Tuple[str, str], Dict]],
+                              output_file: Optional[str] = None) -> Tuple[str, Dict]:
+        """
+        与上一次的抓取结果对比，生成只包含新增和变化应用的变更报告
+
+        Args:
+            apps_data: 本次的应用信息列表
+            previous: 上一次的 JSON 报告、JSONL 数据或进度日志路径，或抓取前已用 load_results 读取的结果
+            output_file: 输出文件路径，如果为 None 则使用默认路径
+
+        Returns:
+            (生成的文件路径, 变更结果 {'summary', 'changes'})
+        """
+        if not output_file:
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            output_file = os.path.join(self.output_dir, f'appstore_delta_{timestamp}.json')
+
+        with self.metrics.span('report_delta'):
+            previous_results = load_results(previous) if isinstance(previous, str) else previous
+            delta = diff_results(previous_results, apps_data)
+            write_delta_report(delta, output_file, previous_file=previous if isinstance(previous, str) else None)
+        
+        logger.info(f"变更报告已保存: {output_file}，{delta['summary']}")
+        return output_file, delta
+
+    def generate_jsonl_report(self, apps_data: List[Dict], output_file: Optional[str] = None,
+                              compress: bool = False) -> str:
+        """
+        生成 JSON Lines 报告（每个应用一行紧凑 JSON）
+
+        Args:
+            apps_data: 应用信息列表（也可以是逐条产生结果的迭代器）
+            output_file: 输出文件路径，如果为 None 则使用默认路径
+            compress: 是否 gzip 压缩
+
+        Returns:
+            生成的文件路径
+        """
+        if not output_file:
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            output_file = os.path.join(self.output_dir, f'appstore_data_{timestamp}.jsonl')
+
+        with self.metrics.span('report_jsonl'), JsonlWriter(output_file, compress=compress) as writer:
+            for app in apps_data:
+                writer.write(app)
+        
+        return writer.path
+
 if __name__ == "__main__":
     # 测试脚本
     test_urls = [
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图资源下载 - 并发下载截图和图标，复用 keep-alive 连接，按内容哈希存储去重，并使用条件请求避免重复下载
+
+目录结构:
+    assets/objects/ab/abcdef....jpg   按 sha256 存储的文件（相同内容只保存一份）
+    assets/index.json                 URL -> {sha256, path, etag, last_modified, size}
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from static_parser import DEFAULT_USER_AGENT
+from mzstatic_url import resize
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_TYPE_EXT = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+
+class AssetDownloader:
+    def __init__(self, asset_dir: str = "appstore_assets", max_workers: int = 16, timeout: float = 30,
+                 user_agent: str = DEFAULT_USER_AGENT):
+        """
+        初始化资源下载器
+
+        Args:
+            asset_dir: 资源存储目录
+            max_workers: 并发下载线程数（每个线程对每个主机保持一个 keep-alive 连接）
+            timeout: 单次请求超时秒数
+            user_agent: 请求使用的 User-Agent
+        """
+        self.asset_dir = asset_dir
+        self.objects_dir = os.path.join(asset_dir, 'objects')
+        self.index_path = os.path.join(asset_dir, 'index.json')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.user_agent = user_agent
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self._index: Dict[str, Dict] = self._load_index()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._stats = {}
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """读取 URL 索引，文件已被删除的条目丢弃"""
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"资源索引损坏，重新建立: {str(e)}")
+            return {}
+        return {url: entry for url, entry in index.items()
+                if os.path.exists(os.path.join(self.asset_dir, entry['path']))}
+
+    def _save_index(self):
+        """原子写入 URL 索引"""
+        tmp_path = f"{self.index_path}.tmp"
+        with self._lock:
+            data = dict(self._index)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _connection(self, scheme: str, host: str, fresh: bool = False) -> http.client.HTTPConnection:
+        """取得当前线程到该主机的 keep-alive 连接"""
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        key = (scheme, host)
+        if fresh and key in conns:
+            conns.pop(key).close()
+        if key not in conns:
+            cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            conns[key] = cls(host, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(conns[key])
+        return conns[key]
+
+    def _request(self, url: str, headers: Dict[str, str], max_redirects: int = 3) -> Tuple[int, Dict, bytes]:
+        """发送 GET 请求（连接被服务端关闭时重连一次，跟随重定向）"""
+        for _ in range(max_redirects + 1):
+            parts = urlsplit(url)
+            path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+            for attempt in range(2):
+                conn = self._connection(parts.scheme, parts.netloc, fresh=attempt > 0)
+                try:
+                    conn.request('GET', path, headers=headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                    break
+                except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                        ConnectionResetError, BrokenPipeError):
+                    if attempt:
+                        raise
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            if response.status in (301, 302, 303, 307, 308) and 'location' in response_headers:
+                url = urljoin(url, response_headers['location'])
+                continue
+            return response.status, response_headers, body
+        raise RuntimeError(f"重定向次数过多: {url}")
+
+    def _store(self, body: bytes, content_type: str, url: str) -> Tuple[str, str, bool]:
+        """按 sha256 保存文件，返回 (哈希, 相对路径, 是否为新文件)"""
+        digest = hashlib.sha256(body).hexdigest()
+        ext = _CONTENT_TYPE_EXT.get(content_type.split(';')[0].strip())
+        if not ext:
+            ext = os.path.splitext(urlsplit(url).path)[1] or '.bin'
+        rel_path = os.path.join('objects', digest[:2], digest + ext)
+        full_path = os.path.join(self.asset_dir, rel_path)
+        if os.path.exists(full_path):
+            return digest, rel_path, False
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f"{full_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, full_path)
+        return digest, rel_path, True
+
+    def download(self, url: str) -> Dict:
+        """
+        下载单个资源（已下载过时发送条件请求）
+
+        Args:
+            url: 图片链接
+
+        Returns:
+            {'url', 'status': downloaded/not_modified/error, 'path', 'sha256', 'bytes', 'seconds', 'new_file'}
+        """
+        start = time.perf_counter()
+        with self._lock:
+            cached = self._index.get(url)
+        headers = {'User-Agent': self.user_agent, 'Accept': 'image/*'}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            status, response_headers, body = self._request(url, headers)
+            if status == 304 and cached:
+                return {'url': url, 'status': 'not_modified', 'path': cached['path'], 'sha256': cached['sha256'],
+                        'bytes': 0, 'seconds': time.perf_counter() - start, 'new_file': False}
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}")
+
+            digest, rel_path, new_file = self._store(body, response_headers.get('content-type', ''), url)
+            entry = {'sha256': digest, 'path': rel_path, 'size': len(body),
+                     'etag': response_headers.get('etag'), 'last_modified': response_headers.get('last-modified')}
+            with self._lock:
+                self._index[url] = entry
+            return {'url': url, 'status': 'downloaded', 'path': rel_path, 'sha256': digest,
+                    'bytes': len(body), 'seconds': time.perf_counter() - start, 'new_file': new_file}
+        except Exception as e:
+            logger.warning(f"下载失败: {url} - {str(e)}")
+            return {'url': url, 'status': 'error', 'error': str(e), 'bytes': 0,
+                    'seconds': time.perf_counter() - start, 'new_file': False}
+
+    def download_urls(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """
+        并发下载多个资源（重复 URL 只下载一次）
+
+        Args:
+            urls: 图片链接
+
+        Returns:
+            {URL: download 的返回结果}
+        """
+        unique = list(dict.fromkeys(u for u in urls if u))
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = dict(zip(unique, executor.map(self.download, unique)))
+        finally:
+            self.close()
+            self._save_index()
+
+        elapsed = time.perf_counter() - start
+        downloaded = [r for r in results.values() if r['status'] == 'downloaded']
+        total_bytes = sum(r['bytes'] for r in results.values())
+        self._stats = {
+            'urls': len(unique),
+            'downloaded': len(downloaded),
+            'not_modified': sum(1 for r in results.values() if r['status'] == 'not_modified'),
+            'errors': sum(1 for r in results.values() if r['status'] == 'error'),
+            # 内容与已有文件相同（跨地区、跨应用的相同图片）只保存一份
+            'duplicates': sum(1 for r in downloaded if not r['new_file']),
+            'bytes': total_bytes,
+            'seconds': round(elapsed, 3),
+            'mb_per_second': round(total_bytes / 1024 / 1024 / elapsed, 2) if elapsed else None,
+            'slowest_seconds': round(max((r['seconds'] for r in results.values()), default=0.0), 3),
+        }
+        logger.info(f"资源下载完成: {self._stats}")
+        return results
+
+    def download_apps(self, apps_data: List[Dict], width: Optional[int] = None) -> Dict:
+        """
+        下载应用信息中的图标和截图，并在记录中写入本地路径（icon['file']、screenshot['file']，相对 asset_dir）
+
+        Args:
+            apps_data: 应用信息列表
+            width: 截图下载宽度（如 1290 用于存档），为 None 时下载记录中的 jpeg 变体
+
+        Returns:
+            下载统计
+        """
+        def shot_url(shot):
+            return resize(shot.get('jpeg'), width) if width and shot.get('jpeg') else shot.get('jpeg')
+
+        urls = []
+        for app in apps_data:
+            if app.get('status') != 'success':
+                continue
+            urls.append((app.get('icon') or {}).get('high_res'))
+            urls.extend(shot_url(shot) for shot in app.get('screenshots', []))
+
+        results = self.download_urls(urls)
+        for app in apps_data:
+            if app.get('status') != 'success':
+                continue
+            icon = results.get((app.get('icon') or {}).get('high_res'))
+            if icon and icon.get('path'):
+                app['icon']['file'] = icon['path']
+            for shot in app.get('screenshots', []):
+                result = results.get(shot_url(shot))
+                if result and result.get('path'):
+                    shot['file'] = result['path']
+        return self.get_stats()
+
+    def close(self):
+        """关闭所有 keep-alive 连接"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict:
+        """
+        获取最近一次批量下载的统计
+
+        Returns:
+            包含 URL 数、下载数、未修改数、重复内容数、字节数和耗时的字典
+        """
+        return dict(self._stats)
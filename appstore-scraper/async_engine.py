@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步抓取引擎 - 基于 asyncio 的静态 HTML 抓取，同时保持数百个页面请求在途
+
+每个页面先用异步 HTTP 请求获取服务端渲染的 HTML 并解析；截图不足时才交给线程池中的
+Selenium（复用驱动池）处理。返回结果与 AppStoreScraperSelenium.scrape_app 完全一致，重试、熔断和重试统计
+也与 scrape_app 共用同一套逻辑。缓存读写、HTML 解析和结果回调都会阻塞，放到线程池中执行，不占用事件循环。
+"""
+
+import asyncio
+import collections
+import gzip
+import itertools
+import ssl
+import time
+import logging
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from static_parser import DEFAULT_USER_AGENT
+from retry_policy import HttpStatusError
+from metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# 所有 HTTPS 请求共享（创建时要加载系统证书，开销较大）
+_SSL_CONTEXT = ssl.create_default_context()
+
+
+class AsyncRateLimiter:
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        令牌桶限速器
+
+        Args:
+            rate: 每秒允许的请求数
+            burst: 允许的突发请求数，默认与 rate 相同
+        """
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取得一个令牌，令牌不足时等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def async_fetch_page(url: str, timeout: float = 15, max_redirects: int = 5,
+                           user_agent: str = DEFAULT_USER_AGENT) -> str:
+    """
+    异步获取页面 HTML（HTTP/1.1，每次请求独立连接，支持 gzip、chunked 和重定向）
+
+    Args:
+        url: 页面链接
+        timeout: 单次请求超时秒数
+        max_redirects: 最多跟随的重定向次数
+        user_agent: 请求使用的 User-Agent
+
+    Returns:
+        页面 HTML 文本
+    """
+    for _ in range(max_redirects + 1):
+        parts = urlsplit(url)
+        https = parts.scheme == 'https'
+        port = parts.port or (443 if https else 80)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port, ssl=_SSL_CONTEXT if https else None),
+            timeout)
+        try:
+            writer.write((
+                f"GET {path} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                f"User-Agent: {user_agent}\r\n"
+                f"Accept: text/html,application/xhtml+xml\r\n"
+                f"Accept-Encoding: gzip\r\n"
+                f"Accept-Language: en-US,en;q=0.9\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode('latin-1'))
+            await writer.drain()
+            raw = await asyncio.wait_for(reader.read(), timeout)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                # 连接已被对端重置等，关闭时的错误不影响已读取的响应
+                pass
+
+        head, _, body = raw.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if status in (301, 302, 303, 307, 308) and headers.get('location'):
+            url = urljoin(url, headers['location'])
+            continue
+        if status >= 400:
+            raise HttpStatusError(status, url)
+
+        if 'chunked' in headers.get('transfer-encoding', ''):
+            body = _decode_chunked(body)
+        if headers.get('content-encoding') == 'gzip':
+            body = gzip.decompress(body)
+        elif headers.get('content-encoding') == 'deflate':
+            body = zlib.decompress(body)
+
+        charset = 'utf-8'
+        content_type = headers.get('content-type', '')
+        if 'charset=' in content_type:
+            charset = content_type.split('charset=')[-1].split(';')[0].strip()
+        return body.decode(charset, errors='replace')
+
+    raise RuntimeError(f"重定向次数过多: {url}")
+
+
+def _decode_chunked(body: bytes) -> bytes:
+    """解码 chunked 传输编码"""
+    chunks = []
+    pos = 0
+    while True:
+        line_end = body.index(b'\r\n', pos)
+        size = int(body[pos:line_end].split(b';')[0], 16)
+        if size == 0:
+            break
+        start = line_end + 2
+        chunks.append(body[start:start + size])
+        pos = start + size + 2
+    return b''.join(chunks)
+
+
+class AsyncScrapeEngine:
+    def __init__(self, scraper, max_in_flight: int = 200, per_host: int = 100, per_storefront: int = 50,
+                 rate_per_second: float = 50.0, browser_workers: int = 6, timeout: float = 15):
+        """
+        初始化异步抓取引擎
+
+        Args:
+            scraper: AppStoreScraperSelenium 实例（复用其解析、缓存和驱动池）
+            max_in_flight: 同时在途的页面请求总数
+            per_host: 单个主机的最大并发请求数
+            per_storefront: 单个商店地区的最大并发请求数
+            rate_per_second: 全局每秒请求数上限
+            browser_workers: Selenium 回退路径的线程数
+            timeout: 单次 HTTP 请求超时秒数
+        """
+        self.scraper = scraper
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.per_storefront = per_storefront
+        self.rate_per_second = rate_per_second
+        self.browser_workers = browser_workers
+        self.timeout = timeout
+
+        self.stats = {'static': 0, 'browser': 0, 'cached': 0, 'callback_errors': 0}
+
+    def _run_callback(self, on_result: Callable[[Dict], None], result: Dict):
+        """执行结果回调，出错时只记录日志，不影响其他应用的抓取"""
+        try:
+            on_result(result)
+        except Exception as e:
+            self.stats['callback_errors'] += 1
+            logger.error(f"结果回调失败 (ID: {result.get('id')}): {str(e)}")
+
+    async def _scrape_one(self, url: str, *limits) -> Optional[Dict]:
+        """抓取单个应用并记录耗时；浏览器回退的结果已由 scrape_app 记录 timings，这里只补充排队和异步请求阶段"""
+        timer = StageTimer()
+        start = time.perf_counter()
+        result = await self._scrape_uncached(url, *limits, timer)
+        if result:
+            elapsed = time.perf_counter() - start
+            timings = result.get('timings', {})
+            for stage, seconds in timer.timings.items():
+                timings[stage] = round(timings.get(stage, 0.0) + seconds, 4)
+            timings['total'] = round(elapsed, 4)
+            result['timings'] = timings
+            result['elapsed'] = round(elapsed, 3)
+        return result
+
+    async def _scrape_uncached(self, url: str, in_flight: asyncio.Semaphore, host_limits: Dict,
+                               storefront_limits: Dict, limiter: AsyncRateLimiter,
+                               browser_pool: ThreadPoolExecutor, timer: StageTimer) -> Optional[Dict]:
+        """抓取单个应用：缓存 -> 异步静态解析 -> Selenium 回退"""
+        scraper = self.scraper
+        app_id = scraper.extract_app_id(url)
+        if not app_id:
+            logger.error(f"无法提取应用 ID: {url}")
+            return None
+        storefront = scraper.extract_storefront(url)
+        loop = asyncio.get_running_loop()
+
+        if scraper.cache and not scraper.refresh:
+            with timer.span('cache_lookup'):
+                cached = await loop.run_in_executor(None, scraper.cache.get, storefront, app_id)
+            if cached:
+                self.stats['cached'] += 1
+                return dict(cached, url=url, from_cache=True)
+
+        if scraper.static_first:
+            host = urlsplit(url).netloc
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+            storefront_limit = storefront_limits.setdefault(storefront, asyncio.Semaphore(self.per_storefront))
+            result = await self._scrape_static(url, app_id, storefront, (in_flight, host_limit, storefront_limit),
+                                               limiter, timer)
+            if result:
+                return result
+
+        self.stats['browser'] += 1
+        return await loop.run_in_executor(browser_pool, partial(scraper.scrape_app, url, browser_only=True))
+
+    async def _scrape_static(self, url: str, app_id: str, storefront: str, limits: tuple,
+                             limiter: AsyncRateLimiter, timer: StageTimer) -> Optional[Dict]:
+        """
+        异步静态抓取：请求错误按重试策略记录（计入熔断和重试统计），可重试的错误退避后重新请求，
+        不再重试时返回失败结果；只有页面请求成功但截图不足时返回 None 回退到浏览器
+        """
+        scraper = self.scraper
+        loop = asyncio.get_running_loop()
+        retry_errors: List[str] = []
+        attempt = 0
+        while True:
+            attempt += 1
+            await scraper.circuit_breaker.before_call_async()
+            queued = time.perf_counter()
+            try:
+                async with limits[0], limits[1], limits[2]:
+                    await limiter.acquire()
+                    timer.add('queue', time.perf_counter() - queued)
+                    with timer.span('static_fetch'):
+                        html = await async_fetch_page(url, timeout=self.timeout)
+            except Exception as e:
+                delay, failed = scraper.record_failure(url, e, attempt, retry_errors)
+                if failed:
+                    return failed
+                with timer.span('backoff'):
+                    await asyncio.sleep(delay)
+                continue
+
+            app_info, _ = await loop.run_in_executor(None, partial(scraper.scrape_static_page, url, html, timer))
+            if not app_info:
+                return None
+            self.stats['static'] += 1
+            if scraper.cache:
+                with timer.span('cache_write'):
+                    await loop.run_in_executor(None, scraper.cache.put, storefront, app_id, app_info, html)
+            return scraper.record_success(app_info, attempt, retry_errors)
+
+    async def scrape_many(self, urls: Iterable[str], on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        并发抓取多个应用
+
+        Args:
+            urls: App Store 链接列表，也可以是按需读取的迭代器
+            on_result: 每完成一个应用时调用的回调（在单独的线程中按完成顺序依次执行，出错时记录日志并计入
+                       stats['callback_errors']，不中断抓取）
+
+        Returns:
+            应用信息列表（按完成顺序）
+        """
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        storefront_limits: Dict[str, asyncio.Semaphore] = {}
+        limiter = AsyncRateLimiter(self.rate_per_second)
+
+        results = []
+        url_iter = iter(urls)
+        tasks = set()
+        loop = asyncio.get_running_loop()
+        # 回调（写进度日志、数据库等）可能 fsync，单线程执行保证顺序；积压过多时等待，避免结果在内存中堆积
+        callbacks = collections.deque()
+        with ThreadPoolExecutor(max_workers=self.browser_workers) as browser_pool, \
+                ThreadPoolExecutor(max_workers=1) as callback_pool:
+            while True:
+                # 按需创建任务：同时存在的任务不超过 max_in_flight 个，输入不需要全部载入内存
+                for url in itertools.islice(url_iter, max(0, self.max_in_flight - len(tasks))):
+                    tasks.add(asyncio.ensure_future(self._scrape_one(url, in_flight, host_limits, storefront_limits,
+                                                                     limiter, browser_pool)))
+                if not tasks:
+                    break
+                finished, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error(f"抓取失败: {str(e)}")
+                        continue
+                    if result:
+                        results.append(result)
+                        if on_result:
+                            callbacks.append(loop.run_in_executor(callback_pool, self._run_callback, on_result, result))
+                while len(callbacks) > self.max_in_flight or (callbacks and callbacks[0].done()):
+                    await callbacks.popleft()
+            for callback in callbacks:
+                await callback
+
+        logger.info(f"异步引擎统计: {self.stats}")
+        return results
+
+    def run(self, urls: Iterable[str], on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """同步入口，在新的事件循环中执行 scrape_many"""
+        return asyncio.run(self.scrape_many(urls, on_result))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图 URL 分类器微基准测试
+
+使用 appstore_data_*.json 输出中的真实 mzstatic URL 作为语料，
+对比旧版逐项子串判断与预编译分类器的耗时。
+
+使用方法:
+    python benchmarks/bench_classifier.py [appstore_data_*.json ...]
+"""
+
+import glob
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from screenshot_classifier import ScreenshotClassifier
+
+
+def legacy_accepts(url: str) -> bool:
+    """旧版 extract_screenshots 中的内联过滤逻辑"""
+    if not any(ext in url.lower() for ext in ['.png', '.jpg', '.jpeg', '.webp']):
+        return False
+    if ('AppIcon' not in url and 'Placeholder' not in url and '1x1.gif' not in url and
+            '64x64' not in url and '128x128' not in url and '32x32' not in url and
+            'video-control' not in url and 'supports-' not in url):
+        return any(keyword in url.lower() for keyword in ['source', 'screenshot', 'purple', 'app'])
+    return False
+
+
+def load_corpus(paths):
+    """从 JSON 输出中收集截图与图标 URL，并补充常见的需过滤 URL"""
+    urls = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for app in json.load(f):
+                for shot in app.get('screenshots') or []:
+                    urls.extend(shot.get(key) for key in ('jpeg', 'webp', 'base_url'))
+                icon = app.get('icon') or {}
+                urls.extend(icon.get(key) for key in ('url', 'high_res'))
+    urls = [url for url in urls if url]
+    # 页面上常见的非截图图片
+    urls.extend(url.rsplit('/', 1)[0] + '/64x64bb.png' for url in urls[:20])
+    urls.extend([
+        'https://is1-ssl.mzstatic.com/image/thumb/Features/v4/supports-Family.png/64x64bb.png',
+        'https://apps.mzstatic.com/content/static-resources/1x1.gif',
+        'https://is1-ssl.mzstatic.com/image/thumb/video-control/play.png/32x32bb.png',
+    ])
+    return urls
+
+
+def main():
+    base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    paths = sys.argv[1:] or glob.glob(os.path.join(base_dir, 'appstore_report', 'appstore_data_*.json'))
+    if not paths:
+        print("未找到 appstore_data_*.json，请通过参数指定语料文件")
+        sys.exit(1)
+
+    corpus = load_corpus(paths)
+    classifier = ScreenshotClassifier()
+
+    mismatches = [url for url in corpus if legacy_accepts(url) != classifier.accepts(url)]
+    if mismatches:
+        print(f"结果不一致: {mismatches[:5]}")
+        sys.exit(1)
+
+    number = 200
+    legacy = timeit.timeit(lambda: [legacy_accepts(url) for url in corpus], number=number)
+    # 冷缓存：每轮使用新的分类器，只计预编译规则本身的开销
+    cold = timeit.timeit(lambda: ScreenshotClassifier().classify_batch(corpus), number=number)
+    # 热缓存：长时间批量抓取中同一 URL 反复出现时的开销
+    single = timeit.timeit(lambda: [classifier.accepts(url) for url in corpus], number=number)
+    batch = timeit.timeit(lambda: classifier.classify_batch(corpus), number=number)
+
+    total = len(corpus) * number
+    print(f"语料: {len(corpus)} 个 URL（来自 {len(paths)} 个文件），每种方式重复 {number} 次")
+    for label, seconds in (('旧版子串判断', legacy), ('classify_batch（冷缓存）', cold),
+                           ('accepts（热缓存）', single), ('classify_batch（热缓存）', batch)):
+        print(f"{label:<24} {seconds * 1e9 / total:8.1f} ns/URL   {legacy / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
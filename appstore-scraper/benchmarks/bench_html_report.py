@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 报告生成基准测试
+
+生成 N 个合成应用（默认 10000），对比旧版字符串拼接与流式渲染器的耗时和峰值内存。
+
+使用方法:
+    python benchmarks/bench_html_report.py [应用数量]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from html_report import HtmlReportRenderer, REPORT_HEADER, REPORT_FOOTER
+
+SHOT_URL = ('https://is1-ssl.mzstatic.com/image/thumb/PurpleSource221/v4/4c/af/92/'
+            '4caf9272-c354-071c-4741-a1464f970e1b/GIO_SCREENSHOTS_6_U002c5_{}.jpg/300x650bb.webp')
+
+
+def synthetic_apps(count: int):
+    """逐个产生合成应用，每 20 个中有 1 个失败"""
+    for i in range(count):
+        if i % 20 == 0:
+            yield {'id': 'unknown', 'name': 'Unknown', 'url': f'https://apps.apple.com/us/app/id{i}',
+                   'status': 'error', 'error': 'Message: timeout'}
+        else:
+            yield {'id': str(1000000 + i), 'name': f'App {i} & <Co>', 'url': f'https://apps.apple.com/us/app/id{i}',
+                   'status': 'success', 'screenshots': [{'jpeg': SHOT_URL.format(n)} for n in range(8)]}
+
+
+def legacy_build(apps_data):
+    """旧版 _build_html_content 的字符串拼接方式（头部每次重新格式化）"""
+    html_content = f"{REPORT_HEADER}"
+    for app in apps_data:
+        if app.get('status') == 'success':
+            screenshots_html = ""
+            if app.get('screenshots'):
+                screenshots_html = """
+        <div class="screenshots">
+            <h3>应用截图</h3>
+            <div class="screenshot-grid">
+                    """
+                for screenshot in app.get('screenshots', []):
+                    screenshots_html += f"""
+                <div class="screenshot-item">
+                    <img src="{screenshot.get('jpeg')}" alt="应用截图">
+                </div>
+                        """
+                screenshots_html += """
+            </div>
+        </div>
+                    """
+            html_content += f"""
+    <div class="app-card">
+        <h2>{app.get('name', 'Unknown')}</h2>
+        <div class="app-info">
+            <p><span>应用 ID:</span> {app.get('id', 'Unknown')}</p>
+            <p><span>应用链接:</span> <a href="{app.get('url', '#')}" target="_blank">{app.get('url', '#')}</a></p>
+            <p><span>状态:</span> <span class="success">成功</span></p>
+            <p><span>截图数量:</span> {len(app.get('screenshots', []))}</p>
+        </div>
+        {screenshots_html}
+    </div>
+                """
+        else:
+            html_content += f"""
+    <div class="app-card">
+        <h2>{app.get('name', 'Unknown')}</h2>
+        <div class="app-info">
+            <p><span>应用 ID:</span> {app.get('id', 'Unknown')}</p>
+            <p><span>应用链接:</span> <a href="{app.get('url', '#')}" target="_blank">{app.get('url', '#')}</a></p>
+            <p><span>状态:</span> <span class="error">失败</span></p>
+            <p><span>错误信息:</span> {app.get('error', 'Unknown error')}</p>
+        </div>
+    </div>
+                """
+    html_content += REPORT_FOOTER
+    return html_content
+
+
+def measure(label, func):
+    """测量耗时和 Python 堆峰值（分两次运行，避免 tracemalloc 影响计时）"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed:7.2f} s   峰值内存 {peak / 1024 / 1024:8.1f} MB")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"合成应用数: {count}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path = os.path.join(tmp_dir, 'legacy.html')
+        stream_path = os.path.join(tmp_dir, 'stream.html')
+
+        def run_legacy():
+            apps = list(synthetic_apps(count))
+            with open(legacy_path, 'w', encoding='utf-8') as f:
+                f.write(legacy_build(apps))
+
+        def run_stream():
+            with open(stream_path, 'w', encoding='utf-8') as f:
+                HtmlReportRenderer(f).render(synthetic_apps(count))
+
+        measure('旧版拼接（列表输入）', run_legacy)
+        measure('流式渲染（迭代器输入）', run_stream)
+        print(f"输出大小: 旧版 {os.path.getsize(legacy_path) / 1024 / 1024:.1f} MB，"
+              f"流式 {os.path.getsize(stream_path) / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线抓取基准测试
+
+在本地 HTTP 服务器上提供 fixtures/ 中保存的 App Store 页面和按需生成的合成页面（截图数、脚本数各不相同），
+依次运行 scrape_app、scrape_multiple_apps（threads / async 引擎）和各报告生成方法，统计吞吐量（应用/分钟）、
+延迟分位数和峰值 RSS，结果写入 JSON 基线文件，再次运行时与基线对比以发现性能回退。
+
+抓取走静态解析路径，不需要 Chrome；合成页面至少包含 min_static_screenshots 张截图，不会回退到浏览器。
+
+使用方法:
+    python benchmarks/bench_suite.py                       # 与 benchmarks/baseline.json 对比
+    python benchmarks/bench_suite.py --update-baseline     # 把本次结果保存为新基线
+    python benchmarks/bench_suite.py --apps 1000 --max-images 20 --max-scripts 30 --workers 8
+"""
+
+import argparse
+import gzip
+import http.server
+import json
+import logging
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from appstore_scraper_selenium import AppStoreScraperSelenium
+from async_engine import AsyncScrapeEngine
+from metrics import percentile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCH_DIR, '..', 'fixtures')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'last_run.json')
+
+# 吞吐量下降或延迟、耗时上升超过该比例时标记为回退（本地多次运行的波动约 10%）
+REGRESSION_THRESHOLD = 0.20
+
+SHOT_URL = ('https://is1-ssl.mzstatic.com/image/thumb/PurpleSource221/v4/{a}/{b}/{c}/'
+            'bench-{app_id}/SCREENSHOT_{n}.jpg/{size}bb.{ext}')
+ICON_URL = 'https://is1-ssl.mzstatic.com/image/thumb/Purple211/v4/00/00/00/bench-{app_id}/AppIcon.png/230x0w.png'
+
+
+def synthetic_page(app_id: int, images: int, scripts: int) -> str:
+    """
+    生成与真实页面结构一致的合成 App Store 页面
+
+    Args:
+        app_id: 应用 ID
+        images: 截图数量
+        scripts: 内联脚本数量（最后一个为包含截图链接的 shoebox 数据）
+
+    Returns:
+        页面 HTML
+    """
+    parts = [
+        '<!DOCTYPE html><html lang="en-us"><head><meta charset="utf-8">',
+        f'<title>Bench App {app_id} - App Store</title>',
+        f'<meta property="og:title" content="Bench App {app_id} on the App Store">',
+        f'<meta property="og:image" content="{ICON_URL.format(app_id=app_id)}">',
+        '</head><body><main><section class="product-hero">',
+        f'<h1 class="product-header__title">Bench App {app_id}</h1></section>',
+        '<div class="we-screenshot-viewer"><ul>',
+    ]
+    shots = []
+    for n in range(images):
+        key = dict(a=f'{n:02x}', b=f'{app_id % 256:02x}', c='bb', app_id=app_id, n=n)
+        webp = ', '.join(f"{SHOT_URL.format(size=size, ext='webp', **key)} {w}w"
+                         for size, w in (('300x650', 300), ('600x1300', 600)))
+        jpeg = SHOT_URL.format(size='300x650', ext='jpg', **key)
+        shots.append(jpeg)
+        parts.append(f'<li><picture><source srcset="{webp}" type="image/webp">'
+                     f'<img src="{jpeg}" alt="" width="300" height="650"></picture></li>')
+    parts.append('</ul></div>')
+    for n in range(max(0, scripts - 1)):
+        parts.append(f'<script type="text/javascript">window.__bench_{n} = {{"id": {app_id}, "n": {n}, '
+                     f'"pad": "{"x" * 512}"}};</script>')
+    shoebox = json.dumps({'d': [{'attributes': {'screenshots': [{'url': u} for u in shots]}}]}).replace('/', '\\/')
+    parts.append(f'<script type="fastboot/shoebox" id="shoebox-media-api-cache-apps">{shoebox}</script>')
+    parts.append('</main></body></html>')
+    return '\n'.join(parts)
+
+
+class PageServer:
+    def __init__(self, min_images: int = 3, max_images: int = 12, max_scripts: int = 10, seed: int = 0):
+        """
+        本地页面服务器：fixtures/app_<ID>.html 存在时返回保存的页面，否则返回合成页面
+
+        Args:
+            min_images: 合成页面的最少截图数
+            max_images: 合成页面的最多截图数
+            max_scripts: 合成页面的最多脚本数
+            seed: 随机种子，保证每次运行生成相同的页面
+        """
+        self.fixtures = {}
+        for name in os.listdir(FIXTURE_DIR):
+            match = re.match(r'app_(\d+)\.html$', name)
+            if match:
+                with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+                    self.fixtures[match.group(1)] = f.read()
+        self.min_images = min_images
+        self.max_images = max_images
+        self.max_scripts = max_scripts
+        self.seed = seed
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def page(self, app_id: str) -> bytes:
+        """按应用 ID 返回页面内容（合成页面生成一次后缓存）"""
+        if app_id in self.fixtures:
+            return self.fixtures[app_id]
+        with self._lock:
+            if app_id not in self._pages:
+                rng = random.Random(f'{self.seed}-{app_id}')
+                html = synthetic_page(int(app_id), rng.randint(self.min_images, self.max_images),
+                                      rng.randint(1, self.max_scripts))
+                self._pages[app_id] = html.encode('utf-8')
+            return self._pages[app_id]
+
+    def start(self) -> str:
+        """在后台线程启动服务器，返回基础 URL"""
+        owner = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                match = re.search(r'/id(\d+)', self.path)
+                if not match:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = owner.page(match.group(1))
+                gzipped = 'gzip' in self.headers.get('Accept-Encoding', '')
+                if gzipped:
+                    body = gzip.compress(body, compresslevel=1)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                if gzipped:
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        class Server(http.server.ThreadingHTTPServer):
+            # 默认监听队列只有 5，高并发时连接会等待 SYN 重传（约 1 秒），干扰延迟测量
+            request_queue_size = 1024
+            daemon_threads = True
+
+        self._server = Server(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def stop(self):
+        """关闭服务器"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def peak_rss_mb():
+    """当前进程的峰值 RSS（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_stats(latencies):
+    """延迟分位数（毫秒）"""
+    values = sorted(latencies)
+    if not values:
+        return {}
+    return {f'p{int(q * 100)}_ms': round(percentile(values, q) * 1000, 2) for q in (0.5, 0.95, 0.99)}
+
+
+def throughput_stats(count: int, seconds: float, latencies) -> dict:
+    """汇总一次抓取阶段的吞吐量和延迟"""
+    return dict({'apps': count, 'seconds': round(seconds, 3),
+                 'apps_per_min': round(count / seconds * 60, 1) if seconds else None},
+                **latency_stats(latencies), peak_rss_mb=peak_rss_mb())
+
+
+def bench_scrape_app(scraper, urls) -> dict:
+    """逐个调用 scrape_app"""
+    latencies = []
+    start = time.perf_counter()
+    for url in urls:
+        t0 = time.perf_counter()
+        result = scraper.scrape_app(url)
+        latencies.append(time.perf_counter() - t0)
+        if not result or result.get('status') != 'success':
+            raise RuntimeError(f"抓取失败: {url} - {result}")
+    return throughput_stats(len(urls), time.perf_counter() - start, latencies)
+
+
+def bench_scrape_multiple(scraper, urls, engine: str, workers: int, rate: float):
+    """调用 scrape_multiple_apps（threads）或直接运行异步引擎（async，放开限速），返回统计和结果"""
+    start = time.perf_counter()
+    if engine == 'async':
+        # scrape_multiple_apps 使用引擎默认的每秒 50 个请求限速，会掩盖引擎本身的吞吐量
+        results = AsyncScrapeEngine(scraper, browser_workers=workers, rate_per_second=rate).run(urls)
+    else:
+        results = scraper.scrape_multiple_apps(urls, max_workers=workers, engine=engine)
+    elapsed = time.perf_counter() - start
+    failures = [r for r in results if r.get('status') != 'success']
+    if failures:
+        raise RuntimeError(f"{engine} 引擎有 {len(failures)} 个应用抓取失败: {failures[0]}")
+    return throughput_stats(len(results), elapsed, [r['elapsed'] for r in results if 'elapsed' in r]), results
+
+
+def bench_reports(scraper, results, out_dir: str, count: int, repeat: int = 3) -> dict:
+    """各报告生成方法的耗时（秒，count 个应用，重复 repeat 次取最小值）"""
+    results = [dict(results[i % len(results)], id=str(i)) for i in range(count)]
+    timings = {'apps': count}
+    builders = {
+        'html': lambda: scraper.generate_html_report(results, os.path.join(out_dir, 'report.html')),
+        'paginated': lambda: scraper.generate_paginated_report(results, 100, os.path.join(out_dir, 'paged')),
+        'json': lambda: scraper.generate_json_report(results, os.path.join(out_dir, 'report.json')),
+        'jsonl': lambda: scraper.generate_jsonl_report(results, os.path.join(out_dir, 'report.jsonl')),
+    }
+    for name, build in builders.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = round(best, 4)
+    timings['peak_rss_mb'] = peak_rss_mb()
+    return timings
+
+
+def compare(current: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD):
+    """打印与基线的差异，返回回退项列表；测试参数与基线不同时不做对比"""
+    regressions = []
+    old_config, new_config = baseline.get('config') or {}, current.get('config') or {}
+    mismatched = sorted(key for key in set(old_config) | set(new_config) if old_config.get(key) != new_config.get(key))
+    if mismatched:
+        print(f"\n警告: 测试参数与基线不同，结果不可比较，跳过对比（使用 --update-baseline 以本次参数重新生成基线）:")
+        for key in mismatched:
+            print(f"  {key:<28} 基线 {old_config.get(key)!r} -> 本次 {new_config.get(key)!r}")
+        return regressions
+    print(f"\n与基线对比（{baseline.get('generated_at')}）:")
+    for section in ('scrape_app', 'threads', 'async', 'reports'):
+        old_section, new_section = baseline.get(section, {}), current.get(section, {})
+        for key, new in new_section.items():
+            old = old_section.get(key)
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or not old \
+                    or key in ('apps', 'peak_rss_mb'):
+                continue
+            change = (new - old) / old
+            # 吞吐量越高越好，其余指标（耗时、延迟）越低越好
+            worse = -change if key == 'apps_per_min' else change
+            flag = '  <-- 回退' if worse > threshold else ''
+            if flag:
+                regressions.append(f'{section}.{key}')
+            print(f"  {section + '.' + key:<28} {old:>12} -> {new:<12} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="App Store 抓取器离线基准测试")
+    parser.add_argument('--apps', type=int, default=300, help="批量抓取的应用数")
+    parser.add_argument('--single', type=int, default=50, help="逐个调用 scrape_app 的应用数")
+    parser.add_argument('--workers', type=int, default=6, help="scrape_multiple_apps 的并发数")
+    parser.add_argument('--async-rate', type=float, default=100000, help="异步引擎每秒请求数上限")
+    parser.add_argument('--report-apps', type=int, default=5000, help="报告生成使用的应用数（由抓取结果复制扩充）")
+    parser.add_argument('--min-images', type=int, default=3, help="合成页面最少截图数")
+    parser.add_argument('--max-images', type=int, default=12, help="合成页面最多截图数")
+    parser.add_argument('--max-scripts', type=int, default=10, help="合成页面最多脚本数")
+    parser.add_argument('--seed', type=int, default=0, help="合成页面随机种子")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="本次结果文件")
+    parser.add_argument('--update-baseline', action='store_true', help="把本次结果保存为基线")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="判定回退的变化比例")
+    args = parser.parse_args()
+    # 抓取器模块导入时已配置 INFO 日志，基准测试只保留警告和错误
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = PageServer(args.min_images, args.max_images, args.max_scripts, args.seed)
+    base_url = server.start()
+    fixture_ids = sorted(server.fixtures)
+    app_ids = fixture_ids + [str(2000000 + i) for i in range(max(0, args.apps - len(fixture_ids)))]
+    urls = [f'{base_url}/us/app/bench/id{app_id}' for app_id in app_ids]
+    print(f"本地服务器: {base_url}，应用数: {len(urls)}（其中 {len(fixture_ids)} 个来自 fixtures）")
+
+    results = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {key: value for key, value in vars(args).items()
+                   if key not in ('baseline', 'output', 'update_baseline', 'threshold')},
+    }
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            scraper = AppStoreScraperSelenium(output_dir=os.path.join(tmp_dir, 'report'))
+
+            results['scrape_app'] = bench_scrape_app(scraper, urls[:args.single])
+            print(f"scrape_app:            {results['scrape_app']}")
+
+            results['threads'], scraped = bench_scrape_multiple(scraper, urls, 'threads', args.workers, args.async_rate)
+            print(f"scrape_multiple_apps:  {results['threads']}")
+
+            results['async'], _ = bench_scrape_multiple(scraper, urls, 'async', args.workers, args.async_rate)
+            print(f"async engine:          {results['async']}")
+
+            results['reports'] = bench_reports(scraper, scraped, tmp_dir, args.report_apps)
+            print(f"reports (s):           {results['reports']}")
+    finally:
+        server.stop()
+
+    results['peak_rss_mb'] = peak_rss_mb()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {args.output}")
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.baseline}")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if regressions:
+        print(f"\n发现 {len(regressions)} 项性能回退（超过 {args.threshold:.0%}）: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n未发现性能回退")
+
+
+if __name__ == "__main__":
+    main()
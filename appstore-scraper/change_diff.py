@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+变更检测 - 按 (商店地区, 应用 ID) 对比本次与上一次的抓取结果，只输出截图增删、顺序变化和名称/图标变化
+
+截图和图标按 asset_key（原图路径）比较，同一截图换了尺寸或格式不算变化。每个应用先比较指纹
+（名称、图标和有序截图列表的哈希），指纹相同的应用直接跳过。
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from jsonl_output import iter_jsonl
+from mzstatic_url import asset_key
+
+
+def _key(record: Dict) -> Tuple[str, str]:
+    """记录的比较键 (商店地区, 应用 ID)"""
+    return record.get('storefront', 'us'), str(record.get('id'))
+
+
+def _icon_key(record: Dict) -> Optional[str]:
+    """图标的原图标识"""
+    icon = record.get('icon') or {}
+    url = icon.get('high_res') or icon.get('url')
+    return asset_key(url) if url else None
+
+
+def _screenshot_keys(record: Dict) -> List[str]:
+    """有序的截图原图标识列表"""
+    return [shot.get('asset_key') or asset_key(shot.get('base_url') or shot.get('jpeg', ''))
+            for shot in record.get('screenshots', [])]
+
+
+def fingerprint(record: Dict) -> str:
+    """
+    计算应用创意素材的指纹
+
+    Args:
+        record: 应用信息字典
+
+    Returns:
+        名称、图标和有序截图列表的 sha1 十六进制摘要
+    """
+    parts = [record.get('name') or '', _icon_key(record) or ''] + _screenshot_keys(record)
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def load_results(path: str) -> Dict[Tuple[str, str], Dict]:
+    """
+    读取上一次的抓取结果（JSON 报告、JSONL 数据或进度日志），只保留成功的记录
+
+    Args:
+        path: .json 文件，或 .jsonl / .jsonl.gz 文件
+
+    Returns:
+        {(商店地区, 应用 ID): 记录}，同一应用出现多次时保留最后一条
+    """
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            records: Iterable[Dict] = json.load(f)
+    else:
+        records = iter_jsonl(path)
+    return {_key(record): record for record in records if record.get('status') == 'success'}
+
+
+def diff_app(previous: Dict, current: Dict) -> Optional[Dict]:
+    """
+    对比同一应用的两次抓取结果
+
+    Args:
+        previous: 上一次的记录
+        current: 本次的记录
+
+    Returns:
+        变化描述字典，没有变化时返回 None
+    """
+    if fingerprint(previous) == fingerprint(current):
+        return None
+
+    change = {'id': current.get('id'), 'storefront': current.get('storefront', 'us'),
+              'name': current.get('name'), 'url': current.get('url'), 'change': 'changed'}
+    if previous.get('name') != current.get('name'):
+        change['name_change'] = {'from': previous.get('name'), 'to': current.get('name')}
+    if _icon_key(previous) != _icon_key(current):
+        change['icon_change'] = {'from': (previous.get('icon') or {}).get('high_res'),
+                                 'to': (current.get('icon') or {}).get('high_res')}
+
+    old_keys = _screenshot_keys(previous)
+    new_keys = _screenshot_keys(current)
+    if old_keys != new_keys:
+        old_set, new_set = set(old_keys), set(new_keys)
+        new_shots = dict(zip(new_keys, current.get('screenshots', [])))
+        old_shots = dict(zip(old_keys, previous.get('screenshots', [])))
+        # 只比较两次都存在的截图的相对顺序，增删本身不算重排
+        common_old = [key for key in old_keys if key in new_set]
+        common_new = [key for key in new_keys if key in old_set]
+        change['screenshots'] = {
+            'added': [new_shots[key].get('jpeg') for key in new_keys if key not in old_set],
+            'removed': [old_shots[key].get('jpeg') for key in old_keys if key not in new_set],
+            'reordered': common_old != common_new,
+            'count': {'from': len(old_keys), 'to': len(new_keys)},
+        }
+    return change
+
+
+def diff_results(previous: Dict[Tuple[str, str], Dict], apps_data: Iterable[Dict]) -> Dict:
+    """
+    对比本次结果与上一次结果
+
+    本次抓取失败的应用不计为移除（可能只是临时错误），单独计入 failed；上一次有、本次没有抓取的应用不出现在结果中。
+
+    Args:
+        previous: load_results 返回的上一次结果
+        apps_data: 本次的应用信息列表
+
+    Returns:
+        {'summary': 各类数量, 'changes': 新增和变化的应用列表}
+    """
+    summary = {'total': 0, 'unchanged': 0, 'changed': 0, 'new': 0, 'failed': 0}
+    changes = []
+    for record in apps_data:
+        summary['total'] += 1
+        if record.get('status') != 'success':
+            summary['failed'] += 1
+            continue
+        old = previous.get(_key(record))
+        if old is None:
+            summary['new'] += 1
+            changes.append({'id': record.get('id'), 'storefront': record.get('storefront', 'us'),
+                            'name': record.get('name'), 'url': record.get('url'), 'change': 'new',
+                            'screenshots': {'added': [shot.get('jpeg') for shot in record.get('screenshots', [])]}})
+            continue
+        change = diff_app(old, record)
+        if change is None:
+            summary['unchanged'] += 1
+        else:
+            summary['changed'] += 1
+            changes.append(change)
+    return {'summary': summary, 'changes': changes}
+
+
+def write_delta_report(delta: Dict, output_file: str, previous_file: Optional[str] = None) -> str:
+    """
+    写出变更报告（紧凑 JSON）
+
+    Args:
+        delta: diff_results 的返回值
+        output_file: 输出文件路径
+        previous_file: 对比的上一次结果文件，写入报告便于追溯
+
+    Returns:
+        生成的文件路径
+    """
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(dict(delta, previous=previous_file), f, ensure_ascii=False, indent=1)
+    return output_file
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+chromedriver 路径解析 - 同一进程内相同参数只解析一次，支持固定路径和离线模式，并记录启动耗时
+"""
+
+import glob
+import os
+import shutil
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 指定 chromedriver 路径时跳过 webdriver-manager
+DRIVER_PATH_ENV = 'CHROMEDRIVER_PATH'
+# 设为 1 时不访问网络，只使用本地已有的 chromedriver
+OFFLINE_ENV = 'APPSTORE_SCRAPER_OFFLINE'
+
+_lock = threading.Lock()
+# {(固定路径, 是否离线): 解析出的路径}
+_resolved: Dict[Tuple[Optional[str], bool], str] = {}
+_report: Dict = {'source': None, 'path': None, 'resolve_seconds': 0.0, 'launches': 0,
+                 'launch_seconds_total': 0.0, 'launch_seconds_max': 0.0}
+
+
+def _find_local_driver() -> Optional[str]:
+    """在 PATH 和 webdriver-manager 缓存目录中查找已有的 chromedriver"""
+    path = shutil.which('chromedriver')
+    if path:
+        return path
+    wdm_root = os.environ.get('WDM_LOCAL_PATH') or os.path.join(os.path.expanduser('~'), '.wdm')
+    candidates = [p for p in glob.glob(os.path.join(wdm_root, 'drivers', 'chromedriver', '**', 'chromedriver*'),
+                                       recursive=True)
+                  if os.path.isfile(p) and os.access(p, os.X_OK)]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def resolve_driver_path(driver_path: Optional[str] = None, offline: Optional[bool] = None) -> str:
+    """
+    解析 chromedriver 路径，同一进程内相同的 (固定路径, 离线模式) 只解析一次
+
+    优先级: driver_path 参数 > CHROMEDRIVER_PATH 环境变量 > 离线模式下的本地查找 > webdriver-manager
+
+    Args:
+        driver_path: 固定的 chromedriver 路径
+        offline: 离线模式，为 None 时读取 APPSTORE_SCRAPER_OFFLINE 环境变量
+
+    Returns:
+        chromedriver 可执行文件路径
+    """
+    if offline is None:
+        offline = os.environ.get(OFFLINE_ENV, '').lower() in ('1', 'true', 'yes')
+    pinned = driver_path or os.environ.get(DRIVER_PATH_ENV)
+    key = (pinned, bool(offline))
+    path = _resolved.get(key)
+    if path:
+        return path
+
+    with _lock:
+        if key in _resolved:
+            return _resolved[key]
+
+        start = time.perf_counter()
+        if pinned:
+            if not os.path.isfile(pinned):
+                raise FileNotFoundError(f"chromedriver 不存在: {pinned}")
+            path, source = pinned, 'pinned'
+        elif offline:
+            path, source = _find_local_driver(), 'local'
+            if not path:
+                raise RuntimeError(f"离线模式下未找到 chromedriver，请设置 {DRIVER_PATH_ENV}")
+        else:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path, source = ChromeDriverManager().install(), 'webdriver-manager'
+
+        _report.update(source=source, path=path, resolve_seconds=round(time.perf_counter() - start, 3))
+        logger.info(f"chromedriver 路径 ({source}): {path}，耗时 {_report['resolve_seconds']}s")
+        _resolved[key] = path
+        return path
+
+
+def record_launch(seconds: float):
+    """
+    记录一次浏览器启动耗时
+
+    Args:
+        seconds: 从启动 chromedriver 到浏览器可用的秒数
+    """
+    with _lock:
+        _report['launches'] += 1
+        _report['launch_seconds_total'] += seconds
+        _report['launch_seconds_max'] = max(_report['launch_seconds_max'], seconds)
+
+
+def get_startup_report() -> Dict:
+    """
+    获取本进程的启动耗时报告
+
+    Returns:
+        包含路径来源、解析耗时、浏览器启动次数和平均/最大启动耗时的字典
+    """
+    with _lock:
+        report = dict(_report)
+    launches = report['launches']
+    report['launch_seconds_avg'] = round(report['launch_seconds_total'] / launches, 3) if launches else 0.0
+    report['launch_seconds_total'] = round(report['launch_seconds_total'], 3)
+    report['launch_seconds_max'] = round(report['launch_seconds_max'], 3)
+    return report
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome 驱动池 - 在批量抓取中复用已启动的浏览器
+"""
+
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPool:
+    def __init__(self, factory: Callable, max_size: int = 6, max_uses: int = 50, watchdog=None):
+        """
+        初始化驱动池
+
+        Args:
+            factory: 创建新驱动的函数（通常为 AppStoreScraperSelenium._create_driver）
+            max_size: 同时存在的最大驱动数量
+            max_uses: 单个驱动最多处理的页面数，超过后回收重建
+            watchdog: 内存看门狗（MemoryWatchdog），归还时回收内存过大的驱动并按内存压力调整 limit
+        """
+        self._factory = factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.watchdog = watchdog
+        # 当前允许同时取出的驱动数，内存紧张时由看门狗降低
+        self.limit = max_size
+
+        # 空闲驱动（后进先出，优先复用最近使用过的热驱动）
+        self._idle = queue.LifoQueue()
+        # 限制已取出的驱动数（空闲驱动不超过 limit - 取出数，见 set_limit）
+        self._capacity = threading.Condition()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._uses: Dict[int, int] = {}
+        self._closed = False
+
+        # 每个被丢弃的驱动只计入一个原因：recycled（达到使用上限）、crashed（出错或重置失败）、
+        # memory_recycled（内存超过看门狗上限）、trimmed（降低并发上限时关闭的空闲驱动）
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'recycled': 0,
+            'crashed': 0,
+            'memory_recycled': 0,
+            'trimmed': 0,
+        }
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        取出一个驱动，空闲池为空时新建
+
+        Args:
+            timeout: 等待可用名额的最长秒数，None 表示一直等待
+
+        Returns:
+            Chrome 浏览器驱动实例
+        """
+        if self._closed:
+            raise RuntimeError("驱动池已关闭")
+
+        with self._capacity:
+            if not self._capacity.wait_for(lambda: self._active < self.limit, timeout=timeout):
+                raise TimeoutError(f"等待空闲驱动超时 ({timeout}s)")
+            self._active += 1
+
+        try:
+            driver = self._idle.get_nowait()
+            with self._lock:
+                self._stats['reused'] += 1
+            return driver
+        except queue.Empty:
+            pass
+
+        try:
+            driver = self._factory()
+        except Exception:
+            self._release_slot()
+            raise
+
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self._stats['created'] += 1
+        return driver
+
+    def release(self, driver, broken: bool = False, rss_mb: Optional[float] = None):
+        """
+        归还驱动，重置浏览器状态；崩溃、达到使用上限或内存超过看门狗上限的驱动直接回收
+
+        Args:
+            driver: 之前通过 acquire 取出的驱动
+            broken: 本次使用是否出错（出错的驱动不再复用）
+            rss_mb: 调用方刚采样的驱动内存（MB），为 None 时由看门狗重新采样
+        """
+        try:
+            with self._lock:
+                uses = self._uses.get(id(driver), 0) + 1
+                self._uses[id(driver)] = uses
+
+            if broken:
+                self._discard(driver, 'crashed')
+                return
+
+            if self._closed:
+                self._discard(driver)
+                return
+
+            if uses >= self.max_uses:
+                self._discard(driver, 'recycled')
+                return
+
+            if self.watchdog and self.watchdog.should_recycle(driver, rss_mb):
+                self._discard(driver, 'memory_recycled')
+                return
+
+            if not self._reset(driver):
+                self._discard(driver, 'crashed')
+                return
+
+            self._idle.put(driver)
+        finally:
+            self._release_slot()
+            if self.watchdog and not self._closed:
+                self.watchdog.adjust(self)
+
+    def _release_slot(self):
+        """归还一个取出名额"""
+        with self._capacity:
+            self._active -= 1
+            self._capacity.notify()
+
+    def set_limit(self, limit: int):
+        """
+        调整允许同时取出的驱动数；降低时关闭多余的空闲驱动以释放内存
+
+        Args:
+            limit: 新的上限（1 到 max_size 之间）
+        """
+        with self._capacity:
+            self.limit = max(1, min(limit, self.max_size))
+            spare = self._idle.qsize() - max(0, self.limit - self._active)
+            self._capacity.notify_all()
+        for _ in range(max(0, spare)):
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver, 'trimmed')
+
+    @contextmanager
+    def driver(self):
+        """
+        以上下文管理器方式使用驱动，异常时自动标记为损坏
+        """
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def _reset(self, driver) -> bool:
+        """清理 cookies、本地存储并回到空白页，返回是否成功"""
+        try:
+            driver.delete_all_cookies()
+            try:
+                driver.execute_script(
+                    "try { window.localStorage.clear(); } catch (e) {}"
+                    "try { window.sessionStorage.clear(); } catch (e) {}"
+                )
+            except Exception:
+                pass
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            logger.warning(f"重置驱动状态失败，将回收该驱动: {str(e)}")
+            return False
+
+    def _discard(self, driver, reason: Optional[str] = None):
+        """关闭并丢弃驱动，reason 为计入的统计项（驱动池关闭后归还的驱动不计入）"""
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            if reason:
+                self._stats[reason] += 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"关闭驱动失败: {str(e)}")
+
+    def close(self):
+        """关闭池中所有空闲驱动"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"关闭驱动失败: {str(e)}")
+            with self._lock:
+                self._uses.pop(id(driver), None)
+
+    def get_stats(self) -> Dict:
+        """
+        获取驱动复用统计
+
+        Returns:
+            包含 created / reused / recycled / crashed / memory_recycled / trimmed、当前并发上限以及复用率的字典
+            （recycled 只统计达到使用上限的驱动，各丢弃原因互不重叠）
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        checkouts = stats['created'] + stats['reused']
+        stats['reuse_rate'] = round(stats['reused'] / checkouts, 3) if checkouts else 0.0
+        stats['limit'] = self.limit
+        return stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
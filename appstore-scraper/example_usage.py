@@ -5,46 +5,157 @@ App Store Scraper Skill 使用示例
 
 使用方法:
 1. 运行此脚本: python example_usage.py
-2. 在运行时输入App Store URL，每行一个，输入"done"结束
+2. 在运行时输入App Store URL，每行一个，输入"done"结束（或使用 --input 从文件读取）
 3. 查看生成的报告文件
+
+可选参数:
+  --input FILE      从文件读取 URL 或应用 ID（可重复；.csv 按 CSV 读取，- 为标准输入），规范化去重后按需抓取
+  --bloom           --input 使用布隆过滤器去重（固定内存，适合千万行输入）
+  --cache-dir DIR   页面结果缓存目录（默认 appstore_cache）
+  --no-cache        不使用缓存
+  --refresh         忽略已有缓存，强制重新抓取
+  --journal FILE    进度日志路径（默认 appstore_report/scrape_journal.jsonl）
+  --resume          从进度日志恢复，跳过已成功抓取的应用
+  --stream          边抓取边写出 JSONL 数据（appstore_data_*.jsonl）
+  --gzip            JSONL 数据使用 gzip 压缩
+  --page-size N     生成分页 HTML 报告，每页 N 个应用（适合大批量）
+  --engine NAME     threads（默认）或 async
+  --diff FILE       与上一次的 JSON 报告 / JSONL 数据 / 进度日志对比，HTML 报告只包含新增和变化的应用
+  --db FILE         同时写入 SQLite 结果库，HTML 报告从数据库读取
+  --driver-memory-mb N  单个浏览器（含子进程）内存上限，超过后回收重建；内存紧张时自动降低并发
+  --storefronts LIST  多地区抓取（如 us,jp,cn），输入 URL 或应用 ID，每个应用合并为一条记录
 """
 
+import argparse
 import logging
+import os
+import time
 from appstore_scraper_selenium import AppStoreScraperSelenium
+from change_diff import load_results
+from journal import ScrapeJournal
+from page_cache import PageCache
+from retry_policy import RetryPolicy
+from result_store import ResultStore
+from url_ingest import UrlIngest
+from memory_watchdog import MemoryWatchdog
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
-    logger.info("=== App Store Scraper Skill 市场图抓取 ===")
+    parser = argparse.ArgumentParser(description="App Store 市场图抓取")
+    parser.add_argument('--input', action='append', default=None, metavar='FILE',
+                        help="URL 列表文件（可重复；.csv 按 CSV 读取，- 为标准输入）")
+    parser.add_argument('--bloom', action='store_true', help="--input 使用布隆过滤器去重")
+    parser.add_argument('--cache-dir', default='appstore_cache', help="页面结果缓存目录")
+    parser.add_argument('--no-cache', action='store_true', help="不使用缓存")
+    parser.add_argument('--refresh', action='store_true', help="忽略已有缓存，强制重新抓取")
+    parser.add_argument('--journal', default='appstore_report/scrape_journal.jsonl', help="进度日志路径")
+    parser.add_argument('--resume', action='store_true', help="从进度日志恢复，跳过已成功抓取的应用")
+    parser.add_argument('--stream', action='store_true', help="边抓取边写出 JSONL 数据")
+    parser.add_argument('--gzip', action='store_true', help="JSONL 数据使用 gzip 压缩")
+    parser.add_argument('--page-size', type=int, default=0, help="生成分页 HTML 报告，每页 N 个应用")
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads', help="抓取引擎")
+    parser.add_argument('--diff', default=None, metavar='FILE',
+                        help="与上一次的结果对比，生成变更报告，HTML 报告只包含新增和变化的应用")
+    parser.add_argument('--db', default=None, metavar='FILE',
+                        help="SQLite 结果库路径（如 appstore_report/appstore_results.db），保存每个应用的最新记录和抓取历史")
+    parser.add_argument('--storefronts', default=None,
+                        help="逗号分隔的地区代码（如 us,jp,cn），每个应用在这些地区各抓取一次并合并为一条记录")
+    parser.add_argument('--driver-memory-mb', type=float, default=None,
+                        help="单个浏览器（含子进程）RSS 上限 MB，启用内存看门狗")
+    parser.add_argument('--metadata-only', action='store_true', help="浏览器不加载图片、视频、字体和统计请求")
+    parser.add_argument('--driver-path', default=None, help="chromedriver 路径（默认读取 CHROMEDRIVER_PATH）")
+    parser.add_argument('--offline', action='store_true', help="离线模式，只使用本地已有的 chromedriver")
+    parser.add_argument('--max-attempts', type=int, default=3, help="单个应用最多尝试次数（含第一次）")
+    parser.add_argument('--download-assets', default=None, metavar='DIR',
+                        help="把截图和图标下载到该目录（按内容哈希去重）")
+    parser.add_argument('--dedupe-images', action='store_true',
+                        help="下载后按感知哈希合并近似重复的截图（需要 --download-assets 和 Pillow）")
+    parser.add_argument('--asset-width', type=int, default=None, help="下载截图的宽度（如 1290 用于存档）")
+    parser.add_argument('--metrics-file', default=None, help="各阶段耗时指标文件（.prom 为 Prometheus 文本格式，否则为 JSON）")
+    args = parser.parse_args()
     
-    # 动态获取用户输入的URL
-    app_urls = []
-    logger.info("请输入App Store URL，每行一个（输入'done'结束）：")
-    
-    while True:
-        url = input("URL: ").strip()
-        if url.lower() == 'done':
-            break
-        if url:
-            app_urls.append(url)
+    logger.info("=== App Store Scraper Skill 市场图抓取 ===")
     
-    if not app_urls:
-        logger.error("没有输入任何URL，程序退出")
-        exit(1)
+    if args.input:
+        # 从文件按需读取，规范化为 (地区, 应用 ID) 去重，不把整个文件载入内存；恢复时在读取阶段跳过已完成的应用
+        skip = ScrapeJournal(args.journal).completed_keys() if args.resume and not args.storefronts else None
+        app_urls = UrlIngest(args.input, dedupe='bloom' if args.bloom else 'set', skip=skip)
+    else:
+        # 动态获取用户输入的URL
+        app_urls = []
+        logger.info("请输入App Store URL，每行一个（输入'done'结束）：")
+        
+        while True:
+            url = input("URL: ").strip()
+            if url.lower() == 'done':
+                break
+            if url:
+                app_urls.append(url)
+        
+        if not app_urls:
+            logger.error("没有输入任何URL，程序退出")
+            exit(1)
+        
+        logger.info(f"准备抓取 {len(app_urls)} 个应用的市场图...")
     
-    logger.info(f"准备抓取 {len(app_urls)} 个应用的市场图...")
+    # 上一次的结果必须在创建抓取器（清理旧数据文件）和开始抓取（重写进度日志）之前读取
+    previous = load_results(args.diff) if args.diff else None
     
     # 创建抓取器实例
-    scraper = AppStoreScraperSelenium(output_dir="appstore_report")
+    cache = None if args.no_cache else PageCache(args.cache_dir)
+    store = ResultStore(args.db) if args.db else None
+    scraper = AppStoreScraperSelenium(output_dir="appstore_report", cache=cache, refresh=args.refresh,
+                                      metadata_only=args.metadata_only, driver_path=args.driver_path,
+                                      offline=args.offline or None,
+                                      retry_policy=RetryPolicy(max_attempts=args.max_attempts), store=store,
+                                      watchdog=MemoryWatchdog(args.driver_memory_mb) if args.driver_memory_mb else None)
     
     # 批量抓取应用
-    results = scraper.scrape_multiple_apps(app_urls)
+    stream_file = None
+    if args.stream:
+        stream_file = os.path.join("appstore_report", f"appstore_data_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+        if args.gzip:
+            stream_file += '.gz'
+        logger.info(f"JSONL 数据实时写入: {stream_file}")
+    
+    if args.storefronts:
+        # 多地区模式下可以直接输入应用 ID
+        app_ids = (scraper.extract_app_id(url) for url in app_urls)
+        results = scraper.scrape_storefronts([app_id for app_id in app_ids if app_id],
+                                             args.storefronts.split(','), stream_file=stream_file)
+    else:
+        results = scraper.scrape_multiple_apps(app_urls, journal_file=args.journal, resume=args.resume,
+                                               stream_file=stream_file, engine=args.engine)
+    
+    if args.download_assets:
+        asset_stats = scraper.download_assets(results, asset_dir=args.download_assets, width=args.asset_width)
+        logger.info(f"资源下载: {asset_stats['downloaded']} 个新下载，{asset_stats['not_modified']} 个未变化，"
+                    f"{asset_stats['duplicates']} 个重复内容，共 {asset_stats['bytes'] / 1024 / 1024:.1f} MB，"
+                    f"耗时 {asset_stats['seconds']:.1f}s")
+        if args.dedupe_images:
+            phash_stats = scraper.collapse_near_duplicates(results, asset_dir=args.download_assets)
+            logger.info(f"近似重复截图: 合并 {phash_stats['near_duplicates']} 张，"
+                        f"跨应用相同创意 {phash_stats['cross_app_clusters']} 组")
     
     # 生成报告
-    html_report = scraper.generate_html_report(results)
+    # 使用数据库时 HTML 报告逐条读取本轮写入的记录
+    report_apps = store.iter_apps(run_id=store.run_id) if store else results
+    if args.diff:
+        delta_report, delta = scraper.generate_delta_report(results, previous)
+        changed = {(change['storefront'], str(change['id'])) for change in delta['changes']}
+        report_apps = (app for app in report_apps if (app.get('storefront', 'us'), str(app.get('id'))) in changed)
+        logger.info(f"变更报告: {delta_report}")
+    if args.page_size:
+        html_report = scraper.generate_paginated_report(report_apps, page_size=args.page_size)
+    else:
+        html_report = scraper.generate_html_report(report_apps)
     json_report = scraper.generate_json_report(results)
+    if args.metrics_file:
+        # 抓取和报告生成完成后写出，包含报告生成阶段的耗时
+        scraper.write_metrics(args.metrics_file)
     
     logger.info(f"\n批量抓取完成！")
     logger.info(f"HTML 报告: {html_report}")
@@ -58,14 +169,23 @@ if __name__ == "__main__":
     logger.info(f"总测试数: {len(results)}")
     logger.info(f"成功: {success_count}")
     logger.info(f"失败: {failure_count}")
+    if cache:
+        cache_stats = cache.get_stats()
+        logger.info(f"缓存命中: {cache_stats['hits']}，未命中: {cache_stats['misses']}")
     
     for i, app in enumerate(results, 1):
         logger.info(f"\n[{i}] {app.get('name', 'Unknown')} (ID: {app.get('id', 'Unknown')})")
         logger.info(f"  状态: {app.get('status', 'Unknown')}")
         if app.get('status') == 'success':
             logger.info(f"  截图数量: {len(app.get('screenshots', []))}")
+            for storefront, locale in app.get('locales', {}).items():
+                logger.info(f"    {storefront}: {locale['status']}，截图 {len(locale.get('screenshots', []))} 张")
         else:
             logger.info(f"  错误: {app.get('error', 'Unknown error')}")
     
+    if store:
+        logger.info(f"结果库: {args.db}，共 {store.count()} 个应用（本轮运行 ID: {store.run_id}）")
+        store.close()
+    
     logger.info("\n=== 抓取完成 ===")
     logger.info("URL列表已清空，可重新运行程序输入新的URL")
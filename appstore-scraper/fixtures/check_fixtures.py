@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线检查静态解析 - 用 fixtures/ 中保存的页面调用 scrape_app_static，对比 expected.json 中的名称、图标和截图数
+
+使用方法:
+    python fixtures/check_fixtures.py
+
+不发起任何网络请求，不需要 Chrome；有不一致时打印差异并以状态码 1 退出。
+"""
+
+import json
+import os
+import sys
+import tempfile
+import logging
+
+FIXTURE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(FIXTURE_DIR))
+
+from appstore_scraper_selenium import AppStoreScraperSelenium
+
+
+def check_fixture(scraper: AppStoreScraperSelenium, name: str, expected: dict) -> list:
+    """
+    解析一个保存的页面并与期望值对比
+
+    Args:
+        scraper: 抓取器实例
+        name: fixtures/ 下的 HTML 文件名
+        expected: 期望值（url / id / storefront / name / icon_high_res / screenshots）
+
+    Returns:
+        差异描述列表，为空表示通过
+    """
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        result = scraper.scrape_app_static(expected['url'], html=f.read())
+    if not result:
+        return ["静态解析没有返回结果"]
+
+    actual = {
+        'id': result.get('id'),
+        'storefront': result.get('storefront'),
+        'name': result.get('name'),
+        'icon_high_res': (result.get('icon') or {}).get('high_res'),
+        'screenshots': len(result.get('screenshots', [])),
+    }
+    problems = [f"{key}: 期望 {expected[key]!r}，实际 {actual[key]!r}"
+                for key in actual if key in expected and actual[key] != expected[key]]
+    if result.get('engine') != 'static':
+        problems.append(f"engine: 期望 'static'，实际 {result.get('engine')!r}")
+    # 截图记录都应指向 mzstatic，且不含同一原图的重复变体
+    keys = [shot.get('asset_key') for shot in result.get('screenshots', [])]
+    if len(set(keys)) != len(keys):
+        problems.append(f"截图有重复的 asset_key: {keys}")
+    if any('mzstatic.com' not in (shot.get('jpeg') or '') for shot in result.get('screenshots', [])):
+        problems.append("截图 URL 不是 mzstatic 图片")
+    return problems
+
+
+def main() -> int:
+    # 抓取器模块导入时已配置 INFO 级别日志，这里只保留警告和错误
+    logging.getLogger().setLevel(logging.WARNING)
+    with open(os.path.join(FIXTURE_DIR, 'expected.json'), 'r', encoding='utf-8') as f:
+        expected_all = json.load(f)
+
+    scraper = AppStoreScraperSelenium(output_dir=tempfile.mkdtemp(prefix='fixture_check_'))
+    failed = 0
+    for name, expected in sorted(expected_all.items()):
+        problems = check_fixture(scraper, name, expected)
+        if problems:
+            failed += 1
+            print(f"FAIL {name}")
+            for problem in problems:
+                print(f"  {problem}")
+        else:
+            print(f"ok   {name}")
+    print(f"{len(expected_all) - failed}/{len(expected_all)} 个页面通过")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
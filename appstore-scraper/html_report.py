@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML 报告渲染 - 预编译模板，逐个应用写入文件对象，内存占用与批量大小无关
+"""
+
+import html
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, List, TextIO
+
+from mzstatic_url import MzstaticUrl
+
+# 页面头部（含 CSS）只构建一次；各段模板预先绑定为 str.format
+# 摘要要等所有应用写完才能统计，写在页面末尾，通过 flex order 显示在顶部
+REPORT_HEADER = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>App Store 应用报告</title>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+            display: flex;
+            flex-direction: column;
+        }
+        h1 {
+            color: #147EFB;
+            text-align: center;
+            margin-bottom: 30px;
+            order: -2;
+        }
+        .summary {
+            background-color: #fff;
+            border-radius: 8px;
+            padding: 20px;
+            margin-bottom: 30px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            max-width: none;
+            order: -1;
+        }
+        .app-card {
+            background-color: #fff;
+            border-radius: 8px;
+            padding: 20px;
+            margin-bottom: 20px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            max-width: none;
+        }
+        .app-card h2 {
+            color: #147EFB;
+            margin-top: 0;
+        }
+        .app-info {
+            margin-bottom: 15px;
+        }
+        .app-info span {
+            font-weight: bold;
+        }
+        .screenshots {
+            margin-top: 15px;
+        }
+        .screenshot-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(250px, 1fr));
+            gap: 15px;
+            margin-top: 10px;
+        }
+        .screenshot-item {
+            border: 1px solid #ddd;
+            border-radius: 4px;
+            overflow: hidden;
+            background-color: #f9f9f9;
+        }
+        .screenshot-item img {
+            width: 100%;
+            height: auto;
+            display: block;
+            transition: transform 0.3s ease;
+        }
+        .screenshot-item img:hover {
+            transform: scale(1.05);
+        }
+        .error {
+            background-color: #ffebee;
+            border-left: 4px solid #f44336;
+            padding: 10px;
+            margin: 10px 0;
+        }
+        .success {
+            background-color: #e8f5e8;
+            border-left: 4px solid #4caf50;
+            padding: 10px;
+            margin: 10px 0;
+        }
+        @media (max-width: 768px) {
+            body {
+                padding: 10px;
+            }
+            .screenshot-grid {
+                grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
+                gap: 10px;
+            }
+            .app-card, .summary {
+                padding: 15px;
+            }
+        }
+        @media (max-width: 480px) {
+            .screenshot-grid {
+                grid-template-columns: repeat(auto-fill, minmax(120px, 1fr));
+                gap: 8px;
+            }
+            .app-card, .summary {
+                padding: 10px;
+            }
+            h1 {
+                font-size: 1.5em;
+            }
+        }
+    </style>
+</head>
+<body>
+    <h1>App Store 应用报告</h1>
+"""
+
+REPORT_FOOTER = """
+</body>
+</html>
+"""
+
+SUMMARY_TEMPLATE = """
+    <div class="summary">
+        <h2>{title}</h2>
+        <p>生成时间: {generated_at}</p>
+        <p>总应用数: {total}</p>
+        <p>成功: {success}</p>
+        <p>失败: {failed}</p>
+        {extra}
+    </div>
+""".format
+
+SCREENSHOT_TEMPLATE = """
+                <div class="screenshot-item">
+                    <img src="{src}" alt="应用截图">
+                </div>""".format
+
+LAZY_SCREENSHOT_TEMPLATE = """
+                <div class="screenshot-item">
+                    <img src="{src}" alt="应用截图" loading="lazy" decoding="async">
+                </div>""".format
+
+SUCCESS_CARD_TEMPLATE = """
+    <div class="app-card" id="app-{seq}">
+        <h2>{name}</h2>
+        <div class="app-info">
+            <p><span>应用 ID:</span> {id}</p>
+            <p><span>应用链接:</span> <a href="{url}" target="_blank">{url}</a></p>
+            <p><span>状态:</span> <span class="success">成功</span></p>
+            <p><span>截图数量:</span> {count}</p>
+        </div>
+        {screenshots}
+    </div>
+""".format
+
+SCREENSHOTS_BLOCK_TEMPLATE = """
+        <div class="screenshots">
+            <h3>应用截图</h3>
+            <div class="screenshot-grid">{items}
+            </div>
+        </div>""".format
+
+ERROR_CARD_TEMPLATE = """
+    <div class="app-card" id="app-{seq}">
+        <h2>{name}</h2>
+        <div class="app-info">
+            <p><span>应用 ID:</span> {id}</p>
+            <p><span>应用链接:</span> <a href="{url}" target="_blank">{url}</a></p>
+            <p><span>状态:</span> <span class="error">失败</span></p>
+            <p><span>错误信息:</span> {error}</p>
+        </div>
+    </div>
+""".format
+
+
+# 分页报告的索引页：摘要、搜索框和分页链接，搜索数据由 search_index.js 提供
+INDEX_BODY_TEMPLATE = """
+    <div class="summary">
+        <h2>报告摘要</h2>
+        <p>生成时间: {generated_at}</p>
+        <p>总应用数: {total}</p>
+        <p>成功: {success}</p>
+        <p>失败: {failed}</p>
+        {extra}
+        <p><input id="search" type="search" placeholder="按应用名称或 ID 搜索" style="width: 100%; padding: 8px;"></p>
+        <ul id="results"></ul>
+    </div>
+    <div class="app-card">
+        <h2>分页</h2>
+        <p>{pages}</p>
+    </div>
+    <script src="search_index.js"></script>
+    <script>
+        const input = document.getElementById('search');
+        const list = document.getElementById('results');
+        input.addEventListener('input', () => {{
+            const query = input.value.trim().toLowerCase();
+            list.innerHTML = '';
+            if (!query) {{
+                return;
+            }}
+            const matches = window.APP_SEARCH_INDEX.filter(app =>
+                app.name.toLowerCase().includes(query) || String(app.id).includes(query)).slice(0, 200);
+            for (const app of matches) {{
+                const item = document.createElement('li');
+                const link = document.createElement('a');
+                link.href = app.page + '#app-' + app.seq;
+                link.textContent = app.name + ' (ID: ' + app.id + ')' + (app.status === 'success' ? '' : ' - 失败');
+                item.appendChild(link);
+                list.appendChild(item);
+            }}
+        }});
+    </script>
+""".format
+
+PAGE_NAV_TEMPLATE = '<p>{prev}<a href="index.html">返回索引</a>{next}</p>'.format
+
+# 分页报告的缩略图宽度（网格列宽 200px，按 1.5 倍像素密度取整）
+THUMB_WIDTH = 300
+
+_NEEDS_ESCAPE = re.compile(r'[&<>"\']')
+
+
+def _escape(value) -> str:
+    """转义 HTML 文本和属性值（不含特殊字符的值直接返回）"""
+    value = str(value)
+    if _NEEDS_ESCAPE.search(value) is None:
+        return value
+    return html.escape(value, quote=True)
+
+
+def thumbnail_urls(screenshots: List[Dict], width: int = THUMB_WIDTH) -> List[str]:
+    """
+    同一张截图的多个 mzstatic 尺寸/格式变体只保留一个，并改写为 width 宽的 webp 缩略图
+
+    Args:
+        screenshots: 截图列表
+        width: 缩略图宽度（原变体更窄时保持原尺寸）
+
+    Returns:
+        图片 URL 列表（保持首次出现的顺序）
+    """
+    thumbs: Dict[str, str] = {}
+    for shot in screenshots:
+        url = shot.get('jpeg', '')
+        parsed = MzstaticUrl.parse(url)
+        if not parsed:
+            thumbs.setdefault(url, url)
+            continue
+        if parsed.asset_key in thumbs:
+            continue
+        if parsed.width > width:
+            parsed = parsed.with_size(width)
+        thumbs[parsed.asset_key] = parsed.with_format('webp').url
+    return list(thumbs.values())
+
+
+class HtmlReportRenderer:
+    def __init__(self, out: TextIO, summary_extra: str = "", summary_title: str = "报告摘要",
+                 lazy_images: bool = False, first_seq: int = 1):
+        """
+        初始化报告渲染器
+
+        Args:
+            out: 可写的文本文件对象
+            summary_extra: 追加到摘要中的 HTML 片段（调用方负责转义）
+            summary_title: 摘要标题
+            lazy_images: 是否延迟加载截图，并且每张截图只加载一个缩略图变体
+            first_seq: 第一个应用卡片的序号（用作锚点 app-序号）
+        """
+        self.out = out
+        self.summary_extra = summary_extra
+        self.summary_title = summary_title
+        self.lazy_images = lazy_images
+        self.seq = first_seq - 1
+        self.total = 0
+        self.success = 0
+
+    def begin(self):
+        """写入页面头部"""
+        self.out.write(REPORT_HEADER)
+
+    def write_app(self, app: Dict):
+        """
+        写入单个应用卡片
+
+        Args:
+            app: 应用信息字典
+        """
+        self.total += 1
+        self.seq += 1
+        fields = {
+            'seq': self.seq,
+            'name': _escape(app.get('name', 'Unknown')),
+            'id': _escape(app.get('id', 'Unknown')),
+            'url': _escape(app.get('url', '#')),
+        }
+
+        if app.get('status') == 'success':
+            self.success += 1
+            screenshots = app.get('screenshots') or []
+            block = ""
+            if screenshots and self.lazy_images:
+                items = ''.join(LAZY_SCREENSHOT_TEMPLATE(src=_escape(url))
+                                for url in thumbnail_urls(screenshots))
+                block = SCREENSHOTS_BLOCK_TEMPLATE(items=items)
+            elif screenshots:
+                items = ''.join(SCREENSHOT_TEMPLATE(src=_escape(shot.get('jpeg', '')))
+                                for shot in screenshots)
+                block = SCREENSHOTS_BLOCK_TEMPLATE(items=items)
+            self.out.write(SUCCESS_CARD_TEMPLATE(**fields, count=len(screenshots), screenshots=block))
+        else:
+            self.out.write(ERROR_CARD_TEMPLATE(**fields, error=_escape(app.get('error', 'Unknown error'))))
+
+    def end(self):
+        """写入摘要和页面尾部"""
+        self.out.write(SUMMARY_TEMPLATE(
+            title=self.summary_title,
+            generated_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+            total=self.total,
+            success=self.success,
+            failed=self.total - self.success,
+            extra=self.summary_extra,
+        ))
+        self.out.write(REPORT_FOOTER)
+
+    def render(self, apps_data: Iterable[Dict]):
+        """
+        渲染完整报告
+
+        Args:
+            apps_data: 应用信息列表或逐条产生结果的迭代器
+        """
+        self.begin()
+        for app in apps_data:
+            self.write_app(app)
+        self.end()
+
+
+def write_paginated_report(apps_data: Iterable[Dict], report_dir: str, page_size: int = 100,
+                           summary_extra: str = "") -> str:
+    """
+    生成分页报告：index.html + page_0001.html... + search_index.js
+
+    每页最多 page_size 个应用，截图延迟加载并使用 THUMB_WIDTH 宽的 webp 缩略图；索引页通过 search_index.js
+    按名称或 ID 搜索应用，无需加载各分页。
+
+    Args:
+        apps_data: 应用信息列表或逐条产生结果的迭代器
+        report_dir: 输出目录
+        page_size: 每页应用数
+        summary_extra: 追加到索引页摘要中的 HTML 片段
+
+    Returns:
+        index.html 路径
+    """
+    os.makedirs(report_dir, exist_ok=True)
+
+    total = success = 0
+    page = 0
+    page_file = page_path = None
+    renderer = None
+    apps = iter(apps_data)
+    pending = next(apps, None)
+
+    def open_page(number):
+        """每页先写入临时文件，写完后再替换为正式文件，中途出错不会留下写了一半的页面"""
+        path = os.path.join(report_dir, f'page_{number:04d}.html')
+        return path, open(f'{path}.tmp', 'w', encoding='utf-8')
+
+    with open(os.path.join(report_dir, 'search_index.js'), 'w', encoding='utf-8') as index_js:
+        index_js.write('window.APP_SEARCH_INDEX = [\n')
+        try:
+            while pending is not None:
+                app, pending = pending, next(apps, None)
+
+                if renderer is None:
+                    page += 1
+                    page_path, page_file = open_page(page)
+                    renderer = HtmlReportRenderer(page_file, summary_title=f"第 {page} 页",
+                                                  lazy_images=True, first_seq=total + 1)
+                    renderer.begin()
+
+                renderer.write_app(app)
+                index_js.write(json.dumps({
+                    'seq': renderer.seq,
+                    'id': app.get('id', 'Unknown'),
+                    'name': app.get('name', 'Unknown'),
+                    'status': app.get('status'),
+                    'page': f'page_{page:04d}.html',
+                }, ensure_ascii=False) + ',\n')
+                total += 1
+                success += app.get('status') == 'success'
+
+                # 写满一页或已无更多应用时结束当前页
+                if renderer.total >= page_size or pending is None:
+                    prev_link = f'<a href="page_{page - 1:04d}.html">上一页</a> · ' if page > 1 else ''
+                    next_link = f' · <a href="page_{page + 1:04d}.html">下一页</a>' if pending is not None else ''
+                    renderer.summary_extra = PAGE_NAV_TEMPLATE(prev=prev_link, next=next_link)
+                    renderer.end()
+                    page_file.close()
+                    page_file = None
+                    os.replace(f'{page_path}.tmp', page_path)
+                    renderer = None
+        finally:
+            if page_file is not None:
+                page_file.close()
+                os.remove(f'{page_path}.tmp')
+        index_js.write('];\n')
+
+    page_links = ' · '.join(f'<a href="page_{n:04d}.html">{n}</a>' for n in range(1, page + 1))
+    index_path = os.path.join(report_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(REPORT_HEADER)
+        f.write(INDEX_BODY_TEMPLATE(
+            generated_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+            total=total,
+            success=success,
+            failed=total - success,
+            extra=summary_extra,
+            pages=page_links or '无',
+        ))
+        f.write(REPORT_FOOTER)
+    return index_path
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+抓取进度日志 - 每完成一个应用追加一行 JSON，崩溃后可从日志恢复
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Set, Tuple
+from jsonl_output import iter_jsonl
+
+
+class ScrapeJournal:
+    def __init__(self, path: str):
+        """
+        初始化进度日志
+
+        Args:
+            path: 日志文件路径（JSON Lines 格式，只追加不改写）
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def previous_path(self) -> str:
+        """上一轮日志的保存路径"""
+        return f"{self.path}.prev"
+
+    def reset(self):
+        """清空日志，开始新的一轮抓取（上一轮的日志保存为 <path>.prev，可用于变更检测）"""
+        with self._lock:
+            if os.path.exists(self.path) and os.path.getsize(self.path):
+                os.replace(self.path, self.previous_path)
+            open(self.path, 'w', encoding='utf-8').close()
+
+    def append(self, record: Dict):
+        """
+        追加一条抓取结果并立即落盘
+
+        Args:
+            record: scrape_app 返回的结果字典
+        """
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def iter_records(self):
+        """
+        逐行读取日志中的记录，跳过崩溃时写了一半的行
+
+        Yields:
+            结果字典
+        """
+        if os.path.exists(self.path):
+            yield from iter_jsonl(self.path)
+
+    def load(self) -> List[Dict]:
+        """
+        读取日志中的全部结果，同一 URL 只保留最后一条（恢复后重试成功的会覆盖之前的失败记录）
+
+        Returns:
+            应用信息列表
+        """
+        latest: Dict[str, Dict] = {}
+        for record in self.iter_records():
+            # 先删除再插入，使结果按最后完成的顺序排列
+            latest.pop(record.get('url'), None)
+            latest[record.get('url')] = record
+        return list(latest.values())
+
+    def completed_keys(self) -> Set[Tuple[str, str]]:
+        """
+        获取已成功抓取的应用
+
+        Returns:
+            (商店地区, 应用 ID) 集合；失败的应用不计入，恢复时会重新抓取
+        """
+        return {(record.get('storefront', 'us'), record.get('id'))
+                for record in self.iter_records()
+                if record.get('status') == 'success'}
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON Lines 流式输出 - 每个应用一行紧凑 JSON，可选 gzip 压缩，并可转换为原有的 JSON 数组格式
+"""
+
+import gzip
+import json
+import sys
+import threading
+import logging
+import zlib
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _open_text(path: str, mode: str):
+    """按扩展名打开普通或 gzip 文本文件"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class JsonlWriter:
+    def __init__(self, path: str, compress: Optional[bool] = None):
+        """
+        初始化流式写入器
+
+        Args:
+            path: 输出文件路径
+            compress: 是否 gzip 压缩，为 None 时根据扩展名 .gz 判断
+        """
+        if compress is None:
+            compress = path.endswith('.gz')
+        elif compress and not path.endswith('.gz'):
+            path += '.gz'
+        self.path = path
+        self.compress = compress
+        self.count = 0
+
+        self._lock = threading.Lock()
+        self._raw = open(path, 'wb')
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode='wb') if compress else None
+
+    def write(self, record: Dict):
+        """
+        写入一条记录并立即刷新，便于其他进程 tail 读取
+
+        Args:
+            record: 应用信息字典
+        """
+        data = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            if self._gzip:
+                self._gzip.write(data)
+                # 同步刷新使已写入的记录可以被解压读取
+                self._gzip.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                self._raw.write(data)
+            self._raw.flush()
+            self.count += 1
+
+    def close(self):
+        """关闭文件"""
+        with self._lock:
+            if self._gzip:
+                self._gzip.close()
+            self._raw.close()
+        logger.info(f"JSONL 数据已保存: {self.path} ({self.count} 条)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """
+    逐行读取 JSONL 文件（支持 .gz），跳过写了一半的行
+
+    Args:
+        path: JSONL 文件路径
+
+    Yields:
+        记录字典
+    """
+    try:
+        with _open_text(path, 'r') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"跳过损坏的行 {path}:{line_no}")
+    except EOFError:
+        # 仍在写入中的 gzip 文件没有结束标记
+        pass
+
+
+def jsonl_to_json(src: str, dst: str) -> str:
+    """
+    把 JSONL 转换为带缩进的 JSON 数组（与 generate_json_report 格式一致），逐条转换不整体加载
+
+    Args:
+        src: JSONL 文件路径（支持 .gz）
+        dst: 输出 JSON 文件路径
+
+    Returns:
+        输出文件路径
+    """
+    with open(dst, 'w', encoding='utf-8') as out:
+        out.write('[')
+        first = True
+        for record in iter_jsonl(src):
+            body = json.dumps(record, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            out.write(('\n  ' if first else ',\n  ') + body)
+            first = False
+        out.write(']' if first else '\n]')
+    logger.info(f"JSON 报告已保存: {dst}")
+    return dst
+
+
+if __name__ == "__main__":
+    # 用法: python jsonl_output.py <输入.jsonl[.gz]> <输出.json>
+    if len(sys.argv) != 3:
+        print("用法: python jsonl_output.py <输入.jsonl[.gz]> <输出.json>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    jsonl_to_json(sys.argv[1], sys.argv[2])
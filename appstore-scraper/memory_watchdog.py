@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存看门狗 - 采样每个驱动（chromedriver 及其 Chrome 子进程）的 RSS，超过上限的驱动归还时回收重建；
+系统（或容器 cgroup）内存紧张时降低驱动池的并发上限，缓解后逐步恢复
+
+安装了 psutil 时使用 psutil 读取进程树，否则直接读取 /proc（仅 Linux）。其他平台上采样返回 None，看门狗不起作用。
+注意多个 Chrome 进程共享的内存会被重复计入，RSS 合计偏高，上限应按此设置。
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:  # psutil 可选
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_MB = 1024 * 1024
+
+
+def _children_map() -> Dict[int, List[int]]:
+    """扫描 /proc，返回 {父进程: [子进程]}"""
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # 进程名可能包含空格和括号，从最后一个 ')' 之后解析
+        fields = stat[stat.rfind(b')') + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(name))
+    return children
+
+
+def _proc_rss(pid: int) -> int:
+    """从 /proc/<pid>/statm 读取 RSS 字节数，进程已退出时返回 0"""
+    try:
+        with open(f'/proc/{pid}/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """
+    进程及其所有子孙进程的 RSS 合计
+
+    Args:
+        pid: 根进程 ID
+
+    Returns:
+        字节数，不支持的平台返回 None
+    """
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    if not os.path.isdir('/proc'):
+        return None
+    children = _children_map()
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += _proc_rss(current)
+        stack.extend(children.get(current, ()))
+    return total
+
+
+def _read_int(path: str) -> Optional[int]:
+    """读取只包含一个整数的文件，不存在或为 max 时返回 None"""
+    try:
+        with open(path, 'r') as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def system_memory() -> Optional[Tuple[int, int]]:
+    """
+    可用内存和总内存；运行在设置了内存上限的 cgroup v2 容器中时以容器上限为准
+
+    Returns:
+        (可用字节数, 总字节数)，无法读取时返回 None
+    """
+    limit = _read_int('/sys/fs/cgroup/memory.max')
+    usage = _read_int('/sys/fs/cgroup/memory.current')
+    if limit and usage is not None:
+        # 不活跃的文件缓存可以被回收，不计入已用
+        inactive = 0
+        try:
+            with open('/sys/fs/cgroup/memory.stat', 'r') as f:
+                for line in f:
+                    if line.startswith('inactive_file '):
+                        inactive = int(line.split()[1])
+                        break
+        except OSError:
+            pass
+        return max(0, limit - usage + inactive), limit
+
+    if psutil is not None:
+        memory = psutil.virtual_memory()
+        return memory.available, memory.total
+    try:
+        info = {}
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                info[key] = int(value.split()[0]) * 1024
+        return info['MemAvailable'], info['MemTotal']
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def driver_pid(driver) -> Optional[int]:
+    """chromedriver 进程 ID（Chrome 及其渲染进程都是它的子孙进程）"""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return getattr(process, 'pid', None)
+
+
+class MemoryWatchdog:
+    def __init__(self, driver_limit_mb: float = 1024, high_water: float = 0.85, low_water: float = 0.70,
+                 min_workers: int = 1, adjust_interval: float = 5.0):
+        """
+        初始化内存看门狗
+
+        Args:
+            driver_limit_mb: 单个驱动（含子进程）RSS 上限，超过后归还时回收重建
+            high_water: 内存使用率超过该值时驱动池并发上限减 1
+            low_water: 内存使用率低于该值时并发上限加 1（不超过驱动池大小）
+            min_workers: 并发上限的下限
+            adjust_interval: 两次调整并发上限的最短间隔秒数（等待回收的内存生效）
+        """
+        self.driver_limit = driver_limit_mb * _MB
+        self.high_water = high_water
+        self.low_water = low_water
+        self.min_workers = min_workers
+        self.adjust_interval = adjust_interval
+
+        self._lock = threading.Lock()
+        self._last_adjust = 0.0
+        self._stats = {'samples': 0, 'recycled': 0, 'throttled': 0, 'restored': 0,
+                       'peak_driver_mb': 0.0, 'peak_used_ratio': 0.0, 'min_limit': None}
+
+    def sample(self, driver) -> Optional[float]:
+        """
+        采样驱动进程树的 RSS
+
+        Args:
+            driver: Chrome 浏览器驱动
+
+        Returns:
+            MB，无法采样时返回 None
+        """
+        pid = driver_pid(driver)
+        rss = process_tree_rss(pid) if pid else None
+        if rss is None:
+            return None
+        mb = round(rss / _MB, 1)
+        with self._lock:
+            self._stats['samples'] += 1
+            self._stats['peak_driver_mb'] = max(self._stats['peak_driver_mb'], mb)
+        return mb
+
+    def should_recycle(self, driver, rss_mb: Optional[float] = None) -> bool:
+        """
+        驱动归还时判断是否因内存过大需要回收
+
+        Args:
+            driver: Chrome 浏览器驱动
+            rss_mb: 刚采样的 RSS，为 None 时重新采样
+
+        Returns:
+            是否需要回收
+        """
+        if rss_mb is None:
+            rss_mb = self.sample(driver)
+        if rss_mb is None or rss_mb * _MB <= self.driver_limit:
+            return False
+        with self._lock:
+            self._stats['recycled'] += 1
+        logger.info(f"驱动内存 {rss_mb:.0f} MB 超过上限 {self.driver_limit / _MB:.0f} MB，回收重建")
+        return True
+
+    def adjust(self, pool):
+        """
+        按系统内存压力调整驱动池并发上限（每 adjust_interval 秒最多调整一次）
+
+        Args:
+            pool: DriverPool 实例（使用 limit / max_size / set_limit）
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_adjust < self.adjust_interval:
+                return
+            self._last_adjust = now
+        memory = system_memory()
+        if not memory:
+            return
+        available, total = memory
+        used = 1 - available / total
+        with self._lock:
+            self._stats['peak_used_ratio'] = round(max(self._stats['peak_used_ratio'], used), 3)
+
+        if used > self.high_water and pool.limit > self.min_workers:
+            pool.set_limit(pool.limit - 1)
+            with self._lock:
+                self._stats['throttled'] += 1
+                current_min = self._stats['min_limit']
+                self._stats['min_limit'] = pool.limit if current_min is None else min(current_min, pool.limit)
+            logger.warning(f"内存使用率 {used:.0%}，驱动并发上限降为 {pool.limit}")
+        elif used < self.low_water and pool.limit < pool.max_size:
+            pool.set_limit(pool.limit + 1)
+            with self._lock:
+                self._stats['restored'] += 1
+            logger.info(f"内存使用率 {used:.0%}，驱动并发上限恢复为 {pool.limit}")
+
+    def get_stats(self) -> Dict:
+        """
+        获取看门狗统计
+
+        Returns:
+            包含采样数、内存回收数、降并发/恢复次数、单驱动峰值 MB、峰值内存使用率和最低并发上限的字典
+        """
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分阶段计时与指标导出 - 记录每个应用各阶段耗时，汇总 p50/p95/p99 并导出 JSON 或 Prometheus 文本格式
+"""
+
+import json
+import math
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    最近秩法计算分位数
+
+    Args:
+        sorted_values: 已排序的非空数值列表
+        q: 分位（0~1）
+
+    Returns:
+        分位数值
+    """
+    index = max(0, math.ceil(len(sorted_values) * q) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class StageTimer:
+    def __init__(self):
+        """单个应用的阶段计时器，同名阶段多次出现（如重试）时累加"""
+        self._timings: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, stage: str):
+        """
+        记录代码块耗时
+
+        Args:
+            stage: 阶段名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, seconds: float):
+        """累加阶段耗时"""
+        self._timings[stage] = self._timings.get(stage, 0.0) + seconds
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """各阶段耗时（秒，保留 4 位小数）"""
+        return {stage: round(seconds, 4) for stage, seconds in self._timings.items()}
+
+
+class MetricsRegistry:
+    def __init__(self, prefix: str = 'appstore_scraper'):
+        """
+        初始化指标汇总（线程安全）
+
+        Args:
+            prefix: Prometheus 指标名前缀
+        """
+        self.prefix = prefix
+        self._samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """清空已记录的样本"""
+        with self._lock:
+            self._samples = {}
+
+    def observe(self, stage: str, seconds: float):
+        """
+        记录一个阶段耗时样本
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时秒数
+        """
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    def observe_timings(self, timings: Dict[str, float]):
+        """记录一个应用的全部阶段耗时"""
+        with self._lock:
+            for stage, seconds in timings.items():
+                self._samples.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def span(self, stage: str):
+        """
+        记录代码块耗时（用于报告生成等不属于单个应用的阶段）
+
+        Args:
+            stage: 阶段名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        汇总各阶段耗时分布
+
+        Returns:
+            {阶段: {'count', 'sum', 'p50', 'p95', 'p99', 'max'}}
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items() if values}
+        result = {}
+        for stage, values in samples.items():
+            stats = {'count': len(values), 'sum': round(sum(values), 4)}
+            for q in QUANTILES:
+                stats[f'p{int(q * 100)}'] = round(percentile(values, q), 4)
+            stats['max'] = round(values[-1], 4)
+            result[stage] = stats
+        return result
+
+    def format_summary(self) -> str:
+        """把汇总格式化为便于日志阅读的多行文本"""
+        lines = [f"{'stage':<18}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+        for stage, stats in sorted(self.summary().items(), key=lambda item: -item[1]['sum']):
+            lines.append(f"{stage:<18}{stats['count']:>8}{stats['p50']:>10.3f}{stats['p95']:>10.3f}"
+                         f"{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+        return '\n'.join(lines)
+
+    def to_prometheus(self) -> str:
+        """
+        导出为 Prometheus 文本格式（summary 类型）
+
+        Returns:
+            Prometheus exposition 文本
+        """
+        name = f'{self.prefix}_stage_seconds'
+        lines = [f'# HELP {name} Time spent in each scraper stage.', f'# TYPE {name} summary']
+        for stage, stats in sorted(self.summary().items()):
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum"]}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str, extra: Optional[Dict] = None) -> str:
+        """
+        写出指标文件，扩展名为 .prom 或 .txt 时使用 Prometheus 文本格式，否则为 JSON
+
+        Args:
+            path: 输出文件路径
+            extra: JSON 格式时一并写出的其他统计（如驱动池、重试统计）
+
+        Returns:
+            输出文件路径
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if path.endswith(('.prom', '.txt')):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(dict(extra or {}, stages=self.summary(), generated_at=time.strftime('%Y-%m-%d %H:%M:%S')),
+                          f, ensure_ascii=False, indent=2)
+        # 原子替换，避免采集端读到写了一半的文件
+        os.replace(tmp_path, path)
+        logger.info(f"指标文件已保存: {path}")
+        return path
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+mzstatic 图片 URL 模型 - 解析缩略图 URL 的原图路径、尺寸、裁剪方式和格式，按需改写为任意尺寸或格式
+
+mzstatic 缩略图 URL 的最后一段描述输出图片，前面是原图路径:
+    https://is1-ssl.mzstatic.com/image/thumb/.../GIO_SCREENSHOTS_6_U002c5_1.jpg/300x650bb-60.webp
+    |<------------------------ 原图路径 (base) ------------------------->| |宽x高|裁剪|质量|格式|
+
+同一原图的所有尺寸/格式变体共享 base，可作为去重键。服务器不会输出超过原图分辨率的图片。
+"""
+
+import re
+from typing import Optional
+
+_THUMB_RE = re.compile(r'^(https?://[^/]*mzstatic\.com/image/thumb/.+)/(\d+)x(\d+)([a-zA-Z]*)(?:-(\d+))?\.(\w+)$')
+
+FORMATS = ('jpg', 'png', 'webp', 'heic')
+
+
+class MzstaticUrl:
+    __slots__ = ('base', 'width', 'height', 'crop', 'quality', 'format')
+
+    def __init__(self, base: str, width: int, height: int, crop: str = 'bb', quality: Optional[int] = None,
+                 format: str = 'jpg'):
+        """
+        mzstatic 缩略图 URL
+
+        Args:
+            base: 原图路径（最后一段之前的部分）
+            width: 输出宽度（0 表示按高度等比缩放）
+            height: 输出高度（0 表示按宽度等比缩放）
+            crop: 裁剪代码（bb 完整缩放、w 按宽度、wa 填充为社交分享卡片等）
+            quality: JPEG 质量（URL 中的 -60 之类后缀），None 表示默认
+            format: 输出格式 jpg / png / webp / heic
+        """
+        self.base = base
+        self.width = width
+        self.height = height
+        self.crop = crop
+        self.quality = quality
+        self.format = format
+
+    @classmethod
+    def parse(cls, url: str) -> Optional['MzstaticUrl']:
+        """
+        解析 mzstatic 缩略图 URL
+
+        Args:
+            url: 图片链接
+
+        Returns:
+            MzstaticUrl 实例，不是 mzstatic 缩略图 URL 时返回 None
+        """
+        match = _THUMB_RE.match(url or '')
+        if not match:
+            return None
+        base, width, height, crop, quality, fmt = match.groups()
+        fmt = fmt.lower()
+        return cls(base, int(width), int(height), crop, int(quality) if quality else None,
+                   'jpg' if fmt == 'jpeg' else fmt)
+
+    @property
+    def asset_key(self) -> str:
+        """原图标识，同一截图的所有尺寸/格式变体相同"""
+        return self.base
+
+    @property
+    def pixels(self) -> int:
+        """输出像素数（宽或高为 0 时按已知的一边估算）"""
+        return self.width * self.height or max(self.width, self.height) ** 2
+
+    @property
+    def url(self) -> str:
+        """完整 URL"""
+        quality = f'-{self.quality}' if self.quality else ''
+        return f'{self.base}/{self.width}x{self.height}{self.crop}{quality}.{self.format}'
+
+    def with_size(self, width: int, height: Optional[int] = None, crop: Optional[str] = None) -> 'MzstaticUrl':
+        """
+        改写输出尺寸
+
+        Args:
+            width: 目标宽度
+            height: 目标高度，为 None 时按当前宽高比计算
+            crop: 裁剪代码，为 None 时保持不变
+
+        Returns:
+            新的 MzstaticUrl
+        """
+        if height is None:
+            height = round(width * self.height / self.width) if self.width and self.height else 0
+        return MzstaticUrl(self.base, width, height, self.crop if crop is None else crop, self.quality, self.format)
+
+    def with_format(self, fmt: str) -> 'MzstaticUrl':
+        """
+        改写输出格式
+
+        Args:
+            fmt: jpg / png / webp / heic
+
+        Returns:
+            新的 MzstaticUrl
+        """
+        fmt = 'jpg' if fmt.lower() == 'jpeg' else fmt.lower()
+        if fmt not in FORMATS:
+            raise ValueError(f"不支持的图片格式: {fmt}")
+        # 质量后缀只对 JPEG 有意义
+        return MzstaticUrl(self.base, self.width, self.height, self.crop,
+                           self.quality if fmt == 'jpg' else None, fmt)
+
+    def __str__(self) -> str:
+        return self.url
+
+    def __repr__(self) -> str:
+        return f'MzstaticUrl({self.url!r})'
+
+
+def asset_key(url: str) -> str:
+    """
+    图片的去重键：mzstatic 缩略图为原图路径，其他 URL 原样返回
+
+    Args:
+        url: 图片链接
+
+    Returns:
+        去重键
+    """
+    parsed = MzstaticUrl.parse(url)
+    return parsed.asset_key if parsed else url
+
+
+def resize(url: str, width: int, height: Optional[int] = None, fmt: Optional[str] = None) -> str:
+    """
+    把 mzstatic 缩略图 URL 改写为指定尺寸和格式（不需要重新抓取页面），其他 URL 原样返回
+
+    Args:
+        url: 图片链接
+        width: 目标宽度
+        height: 目标高度，为 None 时保持宽高比
+        fmt: 目标格式，为 None 时保持不变
+
+    Returns:
+        改写后的 URL
+    """
+    parsed = MzstaticUrl.parse(url)
+    if not parsed:
+        return url
+    parsed = parsed.with_size(width, height)
+    return (parsed.with_format(fmt) if fmt else parsed).url
+
+
+def screenshot_record(url: str) -> dict:
+    """
+    构建截图记录：jpeg / webp 为同一尺寸的两种格式，base_url 为页面上找到的原始 URL
+
+    Args:
+        url: 截图链接
+
+    Returns:
+        {'jpeg', 'webp', 'base_url', 'asset_key'}
+    """
+    parsed = MzstaticUrl.parse(url)
+    if not parsed:
+        return {'jpeg': url, 'webp': url, 'base_url': url, 'asset_key': url}
+    return {
+        'jpeg': parsed.with_format('jpg').url,
+        'webp': parsed.with_format('webp').url,
+        'base_url': url,
+        'asset_key': parsed.asset_key,
+    }
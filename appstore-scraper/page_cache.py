@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面结果缓存 - 按 (商店地区, 应用 ID) 在磁盘上缓存抓取结果，支持 TTL 和按大小的 LRU 淘汰
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    def __init__(self, cache_dir: str = "appstore_cache", ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 512 * 1024 * 1024, store_html: bool = False):
+        """
+        初始化页面缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl: 缓存有效期（秒）
+            max_bytes: 缓存目录最大字节数，超过后按最近最少使用淘汰
+            store_html: 是否同时缓存页面原始 HTML
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.store_html = store_html
+
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'writes': 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(os.path.getsize(os.path.join(cache_dir, name))
+                                for name in os.listdir(cache_dir)
+                                if not name.endswith('.tmp'))
+
+    def _path(self, storefront: str, app_id: str, ext: str) -> str:
+        """缓存文件路径"""
+        return os.path.join(self.cache_dir, f"{storefront}_{app_id}.{ext}")
+
+    def get(self, storefront: str, app_id: str) -> Optional[Dict]:
+        """
+        读取缓存的抓取结果
+
+        Args:
+            storefront: 商店地区代码，如 us
+            app_id: 应用 ID
+
+        Returns:
+            缓存的结果字典，未命中或已过期返回 None
+        """
+        path = self._path(storefront, app_id, 'json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        if time.time() - entry.get('cached_at', 0) > self.ttl:
+            with self._lock:
+                self._stats['misses'] += 1
+                self._stats['expired'] += 1
+            self.delete(storefront, app_id)
+            return None
+
+        # 更新修改时间，作为 LRU 的访问时间
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._stats['hits'] += 1
+        return entry.get('result')
+
+    def get_html(self, storefront: str, app_id: str) -> Optional[str]:
+        """读取缓存的页面原始 HTML，不存在返回 None"""
+        try:
+            with open(self._path(storefront, app_id, 'html'), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, storefront: str, app_id: str, result: Dict, html: Optional[str] = None):
+        """
+        写入抓取结果
+
+        Args:
+            storefront: 商店地区代码
+            app_id: 应用 ID
+            result: 抓取结果字典
+            html: 页面原始 HTML（仅在 store_html 为 True 时保存）
+        """
+        entry = {'cached_at': time.time(), 'result': result}
+        self._write(self._path(storefront, app_id, 'json'),
+                    json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        if html is not None and self.store_html:
+            self._write(self._path(storefront, app_id, 'html'), html.encode('utf-8'))
+        with self._lock:
+            self._stats['writes'] += 1
+        self._evict()
+
+    def _write(self, path: str, data: bytes):
+        """原子写入文件并更新目录总大小"""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - old_size
+
+    def delete(self, storefront: str, app_id: str):
+        """删除某个应用的缓存"""
+        for ext in ('json', 'html'):
+            self._remove(self._path(storefront, app_id, ext))
+
+    def _remove(self, path: str) -> bool:
+        """删除缓存文件并更新目录总大小"""
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                return False
+            self._total_bytes -= size
+        return True
+
+    def _evict(self):
+        """超过 max_bytes 时按修改时间从旧到新淘汰"""
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), name[:-len('.json')]))
+            except OSError:
+                continue
+        entries.sort()
+
+        # 淘汰到上限的 90%，避免每次写入都扫描目录
+        target = self.max_bytes * 0.9
+        for _, key in entries:
+            if self._total_bytes <= target:
+                break
+            removed = self._remove(os.path.join(self.cache_dir, f"{key}.json"))
+            self._remove(os.path.join(self.cache_dir, f"{key}.html"))
+            if removed:
+                with self._lock:
+                    self._stats['evicted'] += 1
+
+        logger.info(f"缓存淘汰完成，当前大小: {self._total_bytes / 1024 / 1024:.1f} MB")
+
+    def get_stats(self) -> Dict:
+        """
+        获取缓存统计
+
+        Returns:
+            包含 hits / misses / expired / evicted / writes / size_bytes 的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size_bytes'] = self._total_bytes
+        return stats
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+感知哈希去重 - 对已下载的截图计算 64 位 dHash，合并同一应用内的近似重复截图，标记跨应用的相同创意，
+并维护整个资源目录的哈希索引用于相似查询
+
+需要 Pillow 解码图片；安装了 NumPy 时哈希计算和汉明距离查询使用向量化实现，否则使用纯 Python 实现。
+哈希按文件内容的 sha256 缓存在 phash_index.json 中，已计算过的图片不再解码。
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 可选
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# 汉明距离不超过该值视为同一张图（64 位 dHash）
+DEFAULT_MAX_DISTANCE = 6
+
+
+def _image_module():
+    """延迟导入 Pillow，未安装时给出明确提示"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("感知哈希需要 Pillow: pip install Pillow") from None
+    return Image
+
+
+def dhash(path: str) -> int:
+    """
+    计算图片的 64 位差异哈希（dHash）：缩放为 9x8 灰度图，逐行比较相邻像素亮度
+
+    Args:
+        path: 图片文件路径
+
+    Returns:
+        64 位整数哈希
+    """
+    Image = _image_module()
+    with Image.open(path) as img:
+        # JPEG 按缩小比例解码，避免解码完整分辨率
+        img.draft('L', (64, 64))
+        pixels = img.convert('L').resize((9, 8), Image.BILINEAR).tobytes()
+    if np is not None:
+        grid = np.frombuffer(pixels, dtype=np.uint8).reshape(8, 9)
+        return int.from_bytes(np.packbits(grid[:, 1:] > grid[:, :-1]).tobytes(), 'big')
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col + 1] > pixels[row * 9 + col])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """两个哈希的汉明距离"""
+    return bin(a ^ b).count('1')
+
+
+class HashIndex:
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化哈希索引（键为图片内容的 sha256）
+
+        Args:
+            path: 索引文件路径，存在时读取；为 None 时只保存在内存中
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._keys: List[str] = []
+        self._hashes: List[int] = []
+        self._positions: Dict[str, int] = {}
+        # NumPy 可用时与 _hashes 同步的缓冲区，容量不足时翻倍扩容（前 len(self) 个元素有效）
+        self._array = np.empty(64, dtype=np.uint64) if np is not None else None
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for key, value in json.load(f).items():
+                        self.add(key, int(value, 16))
+            except (OSError, ValueError) as e:
+                logger.warning(f"哈希索引损坏，重新建立: {str(e)}")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def get(self, key: str) -> Optional[int]:
+        """读取已索引图片的哈希"""
+        position = self._positions.get(key)
+        return None if position is None else self._hashes[position]
+
+    def add(self, key: str, value: int):
+        """
+        加入或更新一张图片的哈希
+
+        Args:
+            key: 图片内容的 sha256
+            value: dHash
+        """
+        with self._lock:
+            position = self._positions.get(key)
+            if position is None:
+                position = len(self._keys)
+                self._positions[key] = position
+                self._keys.append(key)
+                self._hashes.append(value)
+            else:
+                self._hashes[position] = value
+            if self._array is not None:
+                if position >= len(self._array):
+                    grown = np.empty(len(self._array) * 2, dtype=np.uint64)
+                    grown[:position] = self._array[:position]
+                    self._array = grown
+                self._array[position] = value
+
+    def _distance_array(self, value: int):
+        """到索引中每个哈希的汉明距离（NumPy 数组）"""
+        with self._lock:
+            array = self._array[:len(self._keys)]
+        xor = array ^ np.uint64(value)
+        if hasattr(np, 'bitwise_count'):
+            return np.bitwise_count(xor)
+        return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+    def distances(self, value: int) -> List[int]:
+        """到索引中每个哈希的汉明距离（与插入顺序一致）"""
+        if np is None:
+            return [hamming(value, other) for other in self._hashes]
+        return self._distance_array(value).tolist()
+
+    def query(self, value: int, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Tuple[str, int]]:
+        """
+        查询相似图片
+
+        Args:
+            value: 待查询图片的 dHash
+            max_distance: 最大汉明距离
+
+        Returns:
+            [(sha256, 距离)]，按距离从小到大排列
+        """
+        if np is None:
+            matches = [(self._keys[i], d) for i, d in enumerate(self.distances(value)) if d <= max_distance]
+        else:
+            # 只把命中的少数位置转换为 Python 对象
+            distances = self._distance_array(value)
+            matches = [(self._keys[i], int(distances[i])) for i in np.flatnonzero(distances <= max_distance)]
+        return sorted(matches, key=lambda item: item[1])
+
+    def save(self):
+        """原子写入索引文件"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {key: f'{value:016x}' for key, value in zip(self._keys, self._hashes)}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+def _content_key(rel_path: str) -> str:
+    """资源文件按 sha256 命名，文件名即内容键"""
+    return os.path.splitext(os.path.basename(rel_path))[0]
+
+
+def collapse_near_duplicates(apps_data: List[Dict], asset_dir: str, max_distance: int = DEFAULT_MAX_DISTANCE,
+                             max_workers: int = 8, index: Optional[HashIndex] = None) -> Dict:
+    """
+    对已下载的截图（记录中有 file 字段）去除同一应用内的近似重复，并标记跨应用的相同创意
+
+    同一应用内与前面某张截图距离不超过 max_distance 的截图从 screenshots 移到 near_duplicates；
+    保留的截图写入 phash（十六进制）和 cluster（所属相似组代表图片的 sha256），
+    同一相似组出现在其他应用中时写入 shared_with（其他应用 ID 列表）。
+
+    Args:
+        apps_data: 应用信息列表（download_assets 之后）
+        asset_dir: 资源目录
+        max_distance: 视为重复的最大汉明距离
+        max_workers: 并发计算哈希的线程数（图片解码时释放 GIL）
+        index: 哈希索引，为 None 时使用资源目录下的 phash_index.json
+
+    Returns:
+        统计字典
+    """
+    start = time.perf_counter()
+    if index is None:
+        index = HashIndex(os.path.join(asset_dir, 'phash_index.json'))
+
+    files = {_content_key(shot['file']): shot['file']
+             for app in apps_data if app.get('status') == 'success'
+             for shot in app.get('screenshots', []) if shot.get('file')}
+    pending = [key for key in files if key not in index]
+
+    def compute(key):
+        try:
+            return key, dhash(os.path.join(asset_dir, files[key]))
+        except Exception as e:
+            logger.warning(f"无法计算感知哈希: {files[key]} - {str(e)}")
+            return key, None
+
+    unreadable = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for key, value in executor.map(compute, pending):
+            if value is None:
+                unreadable += 1
+            else:
+                index.add(key, value)
+    index.save()
+
+    # 相似组代表图片的索引（只包含本次结果中的图片），按出现顺序贪心分组
+    clusters = HashIndex()
+    cluster_apps: Dict[str, set] = {}
+    removed = 0
+    for app in apps_data:
+        if app.get('status') != 'success':
+            continue
+        kept, kept_hashes = [], []
+        for shot in app.get('screenshots', []):
+            value = index.get(_content_key(shot['file'])) if shot.get('file') else None
+            if value is None:
+                kept.append(shot)
+                continue
+            if any(hamming(value, other) <= max_distance for other in kept_hashes):
+                app.setdefault('near_duplicates', []).append(shot.get('jpeg'))
+                removed += 1
+                continue
+            kept.append(shot)
+            kept_hashes.append(value)
+            matches = clusters.query(value, max_distance)
+            cluster = matches[0][0] if matches else _content_key(shot['file'])
+            if not matches:
+                clusters.add(cluster, value)
+            shot['phash'] = f'{value:016x}'
+            shot['cluster'] = cluster
+            cluster_apps.setdefault(cluster, set()).add(str(app.get('id')))
+        app['screenshots'] = kept
+
+    for app in apps_data:
+        for shot in app.get('screenshots', []):
+            others = cluster_apps.get(shot.get('cluster'), set()) - {str(app.get('id'))}
+            if others:
+                shot['shared_with'] = sorted(others)
+
+    stats = {
+        'images': len(files),
+        'hashed': len(pending) - unreadable,
+        'cached': len(files) - len(pending),
+        'unreadable': unreadable,
+        'near_duplicates': removed,
+        'clusters': len(clusters),
+        'cross_app_clusters': sum(1 for apps in cluster_apps.values() if len(apps) > 1),
+        'index_size': len(index),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    logger.info(f"感知哈希去重完成: {stats}")
+    return stats
+
+
+def find_similar(index: HashIndex, paths: Iterable[str],
+                 max_distance: int = DEFAULT_MAX_DISTANCE) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    在整个资源库中查询与给定图片相似的图片
+
+    Args:
+        index: 哈希索引
+        paths: 待查询的图片文件路径
+        max_distance: 最大汉明距离
+
+    Returns:
+        {路径: [(sha256, 距离)]}
+    """
+    return {path: index.query(dhash(path), max_distance) for path in paths}
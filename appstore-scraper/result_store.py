@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 结果存储 - 按 (商店地区, 应用 ID) 保存每个应用的最新记录、截图和每次抓取的历史，以及每轮运行的元数据
+
+工作线程调用 add() 只把记录放入缓冲区，攒够一批后在一个事务中批量写入；报告可以直接从存储中逐条读取。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Iterator, List, Optional
+
+from mzstatic_url import asset_key
+
+logger = logging.getLogger(__name__)
+
+# INSERT ... ON CONFLICT DO UPDATE 需要 SQLite 3.24+
+MIN_SQLITE_VERSION = (3, 24, 0)
+# 失败记录合并到之前的内容时从失败记录中带入的字段
+_FAILURE_FIELDS = ('url', 'error', 'error_type', 'attempts', 'retry_errors', 'timestamp')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    apps INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS apps (
+    storefront TEXT NOT NULL,
+    app_id TEXT NOT NULL,
+    name TEXT,
+    url TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    screenshot_count INTEGER NOT NULL DEFAULT 0,
+    scraped_at REAL NOT NULL,
+    run_id INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (storefront, app_id)
+);
+CREATE INDEX IF NOT EXISTS idx_apps_app_id ON apps (app_id);
+CREATE INDEX IF NOT EXISTS idx_apps_scraped_at ON apps (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_apps_run ON apps (run_id);
+CREATE TABLE IF NOT EXISTS screenshots (
+    storefront TEXT NOT NULL,
+    app_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    asset_key TEXT NOT NULL,
+    jpeg TEXT,
+    webp TEXT,
+    PRIMARY KEY (storefront, app_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_screenshots_asset ON screenshots (asset_key);
+CREATE TABLE IF NOT EXISTS history (
+    run_id INTEGER,
+    storefront TEXT NOT NULL,
+    app_id TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    name TEXT,
+    screenshot_count INTEGER NOT NULL DEFAULT 0,
+    error_type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_app ON history (app_id, storefront, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_history_scraped_at ON history (scraped_at);
+"""
+
+
+class ResultStore:
+    def __init__(self, path: str = "appstore_report/appstore_results.db", batch_size: int = 200):
+        """
+        打开（或创建）结果数据库
+
+        Args:
+            path: SQLite 数据库路径（不会被 _clean_old_files 清理）
+            batch_size: 缓冲多少条记录后在一个事务中写入
+        """
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(f"结果库需要 SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} 及以上版本，"
+                               f"当前 Python 使用的是 {sqlite3.sqlite_version}")
+        self.path = path
+        self.batch_size = batch_size
+        self.run_id: Optional[int] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: List[Dict] = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL 允许写入时并发读取；NORMAL 在 WAL 下只在检查点时 fsync
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def start_run(self, params: Optional[Dict] = None) -> int:
+        """
+        记录一轮新的运行，之后写入的记录关联到该运行
+
+        Args:
+            params: 运行参数（并发数、引擎等），以 JSON 保存
+
+        Returns:
+            运行 ID
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute('INSERT INTO runs (started_at, params) VALUES (?, ?)',
+                                        (time.time(), json.dumps(params or {}, ensure_ascii=False)))
+            self.run_id = cursor.lastrowid
+        return self.run_id
+
+    def finish_run(self):
+        """写入剩余记录，并更新本轮运行的结束时间和应用数"""
+        self.flush()
+        if self.run_id is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, "
+                "apps = (SELECT COUNT(*) FROM history WHERE run_id = ?), "
+                "success = (SELECT COUNT(*) FROM history WHERE run_id = ? AND status = 'success') "
+                "WHERE run_id = ?", (time.time(), self.run_id, self.run_id, self.run_id))
+
+    def add(self, record: Dict):
+        """
+        加入一条抓取结果（线程安全），缓冲区满时批量写入
+
+        Args:
+            record: scrape_app 或 scrape_storefronts 返回的结果字典
+        """
+        with self._lock:
+            self._pending.append(record)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+            self._write(batch)
+
+    def flush(self):
+        """写入缓冲区中的全部记录"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if batch:
+                self._write(batch)
+
+    def update(self, records: List[Dict]):
+        """
+        更新已写入记录的内容（如下载资源后加入的 file 字段），不增加抓取历史
+
+        Args:
+            records: 结果字典列表
+        """
+        self.flush()
+        with self._lock:
+            self._write(records, record_history=False)
+
+    def _write(self, batch: List[Dict], record_history: bool = True):
+        """在一个事务中写入一批记录（调用方持有锁）"""
+        now = time.time()
+        apps, history, shots, keys = [], [], [], []
+        # 本批中已写入的成功记录（同一批中先成功后失败时，数据库中还查不到）
+        batch_success: Dict[tuple, Dict] = {}
+        for record in batch:
+            storefront, app_id = record.get('storefront', 'us'), str(record.get('id'))
+            screenshots = record.get('screenshots', [])
+            if record_history:
+                history.append((self.run_id, storefront, app_id, now, record.get('status', 'error'),
+                                record.get('name'), len(screenshots), record.get('error_type')))
+            if record.get('status') == 'success':
+                batch_success[(storefront, app_id)] = record
+            else:
+                if not record_history:
+                    # 下载资源等后处理只更新成功记录的内容
+                    continue
+                previous = batch_success.get((storefront, app_id)) or self._previous_content(storefront, app_id)
+                if previous:
+                    # 临时失败不丢弃之前抓到的截图：状态和所属运行更新为本次，内容保留上一次的
+                    failure = {field: record[field] for field in _FAILURE_FIELDS if record.get(field) is not None}
+                    record = dict(previous, status='error', **failure)
+                    apps.append((storefront, app_id, record.get('name'), record.get('url'), 'error',
+                                 record.get('error'), len(record.get('screenshots', [])), now, self.run_id,
+                                 json.dumps(record, ensure_ascii=False, separators=(',', ':'))))
+                    continue
+            apps.append((storefront, app_id, record.get('name'), record.get('url'), record.get('status', 'error'),
+                         record.get('error'), len(screenshots), now, self.run_id,
+                         json.dumps(record, ensure_ascii=False, separators=(',', ':'))))
+            keys.append((storefront, app_id))
+            shots.extend((storefront, app_id, position,
+                          shot.get('asset_key') or asset_key(shot.get('jpeg', '')), shot.get('jpeg'), shot.get('webp'))
+                         for position, shot in enumerate(screenshots))
+
+        with self._conn:
+            if not record_history:
+                # 只更新内容，保留抓取时间和所属运行
+                self._conn.executemany(
+                    'UPDATE apps SET data = ?, screenshot_count = ? WHERE storefront = ? AND app_id = ?',
+                    [(row[9], row[6], row[0], row[1]) for row in apps])
+                apps = []
+            self._conn.executemany(
+                'INSERT INTO apps (storefront, app_id, name, url, status, error, screenshot_count, '
+                'scraped_at, run_id, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (storefront, app_id) DO UPDATE SET name = excluded.name, url = excluded.url, '
+                'status = excluded.status, error = excluded.error, screenshot_count = excluded.screenshot_count, '
+                'scraped_at = excluded.scraped_at, run_id = excluded.run_id, data = excluded.data', apps)
+            self._conn.executemany('DELETE FROM screenshots WHERE storefront = ? AND app_id = ?', keys)
+            self._conn.executemany('INSERT INTO screenshots VALUES (?, ?, ?, ?, ?, ?)', shots)
+            self._conn.executemany('INSERT INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?)', history)
+
+    def _previous_content(self, storefront: str, app_id: str) -> Optional[Dict]:
+        """数据库中该应用最近一次抓到截图的记录（之后失败过的记录仍保留截图）"""
+        row = self._conn.execute('SELECT data FROM apps WHERE storefront = ? AND app_id = ? AND screenshot_count > 0',
+                                 (storefront, app_id)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """执行只读查询（先写入缓冲区，保证读到最新结果）"""
+        self.flush()
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_app(self, app_id: str, storefront: str = 'us') -> Optional[Dict]:
+        """
+        读取应用的最新记录
+
+        Args:
+            app_id: 应用 ID
+            storefront: 商店地区代码
+
+        Returns:
+            结果字典，不存在时返回 None
+        """
+        rows = self._query('SELECT data FROM apps WHERE storefront = ? AND app_id = ?', (storefront, str(app_id)))
+        return json.loads(rows[0]['data']) if rows else None
+
+    def iter_apps(self, run_id: Optional[int] = None, storefront: Optional[str] = None,
+                  status: Optional[str] = None, since: Optional[float] = None,
+                  batch: int = 500) -> Iterator[Dict]:
+        """
+        按抓取时间顺序逐条读取应用记录（分批查询，可直接传给 generate_html_report 等报告方法）
+
+        Args:
+            run_id: 只读取该轮运行最后更新的应用（包括本轮失败的应用）
+            storefront: 只读取该地区
+            status: 只读取该状态（success / error）
+            since: 只读取该时间戳之后抓取的应用
+
+        Yields:
+            结果字典
+        """
+        conditions, params = [], []
+        for column, op, value in (('run_id', '=', run_id), ('storefront', '=', storefront),
+                                  ('status', '=', status), ('scraped_at', '>=', since)):
+            if value is not None:
+                conditions.append(f'{column} {op} ?')
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        offset = 0
+        while True:
+            rows = self._query(f'SELECT data FROM apps {where} ORDER BY scraped_at, storefront, app_id '
+                               f'LIMIT ? OFFSET ?', tuple(params) + (batch, offset))
+            for row in rows:
+                yield json.loads(row['data'])
+            if len(rows) < batch:
+                return
+            offset += batch
+
+    def history(self, app_id: str, storefront: Optional[str] = None) -> List[Dict]:
+        """
+        读取应用每次被抓取的记录
+
+        Args:
+            app_id: 应用 ID
+            storefront: 只读取该地区，为 None 时读取所有地区
+
+        Returns:
+            [{'run_id', 'storefront', 'scraped_at', 'status', 'name', 'screenshot_count', 'error_type'}]，按时间排列
+        """
+        sql = 'SELECT run_id, storefront, scraped_at, status, name, screenshot_count, error_type FROM history ' \
+              'WHERE app_id = ?'
+        params: tuple = (str(app_id),)
+        if storefront:
+            sql += ' AND storefront = ?'
+            params += (storefront,)
+        return [dict(row) for row in self._query(sql + ' ORDER BY scraped_at', params)]
+
+    def apps_with_screenshot(self, url_or_key: str) -> List[Dict]:
+        """
+        查询当前使用某张截图的应用
+
+        Args:
+            url_or_key: 截图 URL（任意尺寸/格式）或 asset_key
+
+        Returns:
+            [{'storefront', 'app_id', 'position'}]
+        """
+        rows = self._query('SELECT storefront, app_id, position FROM screenshots WHERE asset_key = ? '
+                           'ORDER BY storefront, app_id', (asset_key(url_or_key),))
+        return [dict(row) for row in rows]
+
+    def runs(self, limit: int = 20) -> List[Dict]:
+        """
+        最近的运行记录
+
+        Args:
+            limit: 最多返回条数
+
+        Returns:
+            [{'run_id', 'started_at', 'finished_at', 'apps', 'success', 'params'}]，最新的在前
+        """
+        rows = self._query('SELECT * FROM runs ORDER BY run_id DESC LIMIT ?', (limit,))
+        return [dict(row, params=json.loads(row['params'] or '{}')) for row in rows]
+
+    def count(self, status: Optional[str] = None) -> int:
+        """应用记录数"""
+        if status:
+            return self._query('SELECT COUNT(*) FROM apps WHERE status = ?', (status,))[0][0]
+        return self._query('SELECT COUNT(*) FROM apps')[0][0]
+
+    def close(self):
+        """写入剩余记录并关闭数据库"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
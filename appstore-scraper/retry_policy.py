@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重试策略 - 错误分类、带抖动的指数退避，以及失败率过高时暂停抓取的熔断器
+"""
+
+import asyncio
+import random
+import socket
+import threading
+import time
+import logging
+import urllib.error
+from collections import deque
+from typing import Dict
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# 错误类别
+TIMEOUT = 'timeout'
+DRIVER_CRASH = 'driver_crash'
+NOT_FOUND = 'not_found'
+BLOCKED = 'blocked'
+NETWORK = 'network'
+OTHER = 'other'
+
+# 浏览器会话已失效的典型错误信息
+_CRASH_MARKERS = ('invalid session id', 'chrome not reachable', 'disconnected', 'session deleted',
+                  'no such window', 'target window already closed', 'tab crashed', 'unable to receive message')
+
+
+class HttpStatusError(RuntimeError):
+    def __init__(self, status: int, url: str):
+        """
+        页面请求返回了错误状态码
+
+        Args:
+            status: HTTP 状态码
+            url: 请求的链接
+        """
+        super().__init__(f"HTTP {status}: {url}")
+        self.status = status
+        self.url = url
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    把异常归类为 timeout / driver_crash / not_found / blocked / network / other
+
+    Args:
+        error: 抓取过程中抛出的异常
+
+    Returns:
+        错误类别
+    """
+    status = getattr(error, 'status', None) or getattr(error, 'code', None)
+    if isinstance(error, (HttpStatusError, urllib.error.HTTPError)) and isinstance(status, int):
+        if status in (404, 410):
+            return NOT_FOUND
+        if status in (403, 429, 503):
+            return BLOCKED
+        return NETWORK
+    if isinstance(error, (TimeoutException, TimeoutError, socket.timeout)):
+        return TIMEOUT
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        if 'timeout' in message or 'timed out' in message:
+            return TIMEOUT
+        if any(marker in message for marker in _CRASH_MARKERS):
+            return DRIVER_CRASH
+        return OTHER
+    if isinstance(error, urllib.error.URLError):
+        return TIMEOUT if isinstance(error.reason, socket.timeout) else NETWORK
+    if isinstance(error, (ConnectionError, OSError)):
+        return NETWORK
+    return OTHER
+
+
+class RetryPolicy:
+    # 重试后可能成功的错误类别（not_found 和 other 重试也不会改变结果）
+    RETRYABLE = frozenset({TIMEOUT, DRIVER_CRASH, BLOCKED, NETWORK})
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 blocked_multiplier: float = 4.0):
+        """
+        初始化重试策略
+
+        Args:
+            max_attempts: 单个应用最多尝试次数（含第一次）
+            base_delay: 第一次重试的退避上限秒数，之后每次翻倍
+            max_delay: 单次退避的最大秒数
+            blocked_multiplier: 被限流（403/429/503）时退避时间的放大倍数
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.blocked_multiplier = blocked_multiplier
+
+    def should_retry(self, category: str, attempt: int) -> bool:
+        """
+        判断第 attempt 次失败后是否继续重试
+
+        Args:
+            category: 错误类别
+            attempt: 已尝试次数（从 1 开始）
+
+        Returns:
+            是否重试
+        """
+        return category in self.RETRYABLE and attempt < self.max_attempts
+
+    def delay(self, category: str, attempt: int) -> float:
+        """
+        计算退避时间（full jitter：在 0 到指数上限之间均匀取值，避免各线程同时重试）
+
+        Args:
+            category: 错误类别
+            attempt: 已尝试次数（从 1 开始）
+
+        Returns:
+            退避秒数
+        """
+        cap = self.base_delay * (2 ** (attempt - 1))
+        if category == BLOCKED:
+            cap *= self.blocked_multiplier
+        return random.uniform(0, min(self.max_delay, cap))
+
+
+class CircuitBreaker:
+    def __init__(self, window: int = 50, failure_threshold: float = 0.5, min_calls: int = 10,
+                 cooldown: float = 30.0):
+        """
+        初始化熔断器
+
+        Args:
+            window: 统计失败率的最近请求数
+            failure_threshold: 失败率达到该值时熔断
+            min_calls: 窗口内至少有这么多请求才判断失败率
+            cooldown: 熔断后暂停的秒数
+        """
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'trips': 0, 'paused_seconds': 0.0}
+
+    def _remaining(self) -> float:
+        """距离暂停结束的秒数"""
+        with self._lock:
+            return self._open_until - time.monotonic()
+
+    def _add_paused(self, seconds: float):
+        """累加暂停时间"""
+        with self._lock:
+            self._stats['paused_seconds'] += seconds
+
+    def before_call(self):
+        """熔断期间阻塞调用线程，直到暂停结束"""
+        remaining = self._remaining()
+        if remaining > 0:
+            time.sleep(remaining)
+            self._add_paused(remaining)
+
+    async def before_call_async(self):
+        """before_call 的协程版本，熔断期间只挂起当前协程，不阻塞事件循环"""
+        remaining = self._remaining()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+            self._add_paused(remaining)
+
+    def record(self, success: bool):
+        """
+        记录一次请求结果，失败率过高时熔断
+
+        Args:
+            success: 请求是否成功
+        """
+        with self._lock:
+            self._outcomes.append(success)
+            if len(self._outcomes) < self.min_calls or time.monotonic() < self._open_until:
+                return
+            failure_rate = self._outcomes.count(False) / len(self._outcomes)
+            if failure_rate >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.cooldown
+                self._stats['trips'] += 1
+                # 暂停结束后重新统计，避免旧的失败记录立即再次触发熔断
+                self._outcomes.clear()
+                logger.warning(f"失败率 {failure_rate:.0%} 过高，暂停抓取 {self.cooldown:.1f}s")
+
+    def get_stats(self) -> Dict:
+        """
+        获取熔断统计
+
+        Returns:
+            包含熔断次数和累计暂停秒数的字典
+        """
+        with self._lock:
+            return {'trips': self._stats['trips'], 'paused_seconds': round(self._stats['paused_seconds'], 2)}
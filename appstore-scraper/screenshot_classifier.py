@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图 URL 分类器 - 预编译过滤规则，单次匹配判断 URL 是否为应用截图
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class ScreenshotClassifier:
+    # 截图必须满足：不含图标/占位图/小尺寸等标记 + 图片扩展名 + 截图关键词
+    _REJECT_RE = re.compile(r'AppIcon|Placeholder|1x1\.gif|64x64|128x128|32x32|video-control|supports-')
+    _IMAGE_EXT_RE = re.compile(r'\.(?:png|jpe?g|webp)', re.IGNORECASE)
+    _KEYWORD_RE = re.compile(r'source|screenshot|purple|app', re.IGNORECASE)
+    # 脚本内容中的 mzstatic 图片 URL
+    _SCRIPT_URL_RE = re.compile(r'https://[\w.-]+mzstatic\.com/[\w/-]+\.(?:png|jpg|jpeg|webp)')
+    # srcset 形如 "url 300w, url 600w"
+    _SRCSET_RE = re.compile(r'\s\d+(?:\.\d+)?[wx],')
+
+    def __init__(self, cache_size: int = 100000):
+        """
+        初始化分类器
+
+        Args:
+            cache_size: 判定结果缓存的最大条目数（同一 URL 在页面脚本和不同应用间大量重复出现）
+        """
+        self.cache_size = cache_size
+        self._decisions: Dict[str, bool] = {}
+
+    def _decide(self, url: str) -> bool:
+        """对单个 URL 执行一次完整判定并写入缓存"""
+        decision = (self._REJECT_RE.search(url) is None
+                    and self._IMAGE_EXT_RE.search(url) is not None
+                    and self._KEYWORD_RE.search(url) is not None)
+        if len(self._decisions) >= self.cache_size:
+            self._decisions.clear()
+        self._decisions[url] = decision
+        return decision
+
+    def accepts(self, url: str) -> bool:
+        """
+        判断 URL 是否像应用截图
+
+        Args:
+            url: 图片 URL
+
+        Returns:
+            是截图返回 True
+        """
+        decision = self._decisions.get(url)
+        if decision is None:
+            decision = self._decide(url)
+        return decision
+
+    def is_icon(self, url: str) -> bool:
+        """判断 URL 是否为 mzstatic 应用图标"""
+        return 'mzstatic.com' in url and 'AppIcon' in url
+
+    def media_url(self, value: str) -> Optional[str]:
+        """
+        规范化媒体元素的 src/srcset 值
+
+        Args:
+            value: img src、source srcset 或 video poster
+
+        Returns:
+            mzstatic 图片 URL（srcset 取第一个候选），非 mzstatic 返回 None
+        """
+        if not value or 'mzstatic.com' not in value:
+            return None
+        if ' ' in value and self._SRCSET_RE.search(value + ','):
+            first_url = value.split(',', 1)[0].split(' ', 1)[0].strip()
+            if self._IMAGE_EXT_RE.search(first_url):
+                return first_url
+        return value
+
+    def find_in_script(self, script_content: str) -> List[str]:
+        """从脚本内容中找出所有 mzstatic 图片 URL"""
+        # 内嵌 JSON 中的 URL 通常被转义为 https:\/\/...
+        if '\\' in script_content:
+            script_content = script_content.replace('\\/', '/').replace('\\u002F', '/')
+        return self._SCRIPT_URL_RE.findall(script_content)
+
+    def classify_batch(self, urls: Iterable[Optional[str]], seen: Optional[Set[str]] = None) -> List[str]:
+        """
+        批量筛选截图 URL，保持原有顺序并去重
+
+        Args:
+            urls: 候选 URL（可包含 None）
+            seen: 已收录的 URL 集合，会被原地更新；为 None 时只在本批内去重
+
+        Returns:
+            通过筛选且未出现过的 URL 列表
+        """
+        if seen is None:
+            seen = set()
+        decisions = self._decisions
+        decide = self._decide
+        accepted = []
+        for url in urls:
+            if not url or url in seen:
+                continue
+            decision = decisions.get(url)
+            if decision is None:
+                decision = decide(url)
+            if decision:
+                seen.add(url)
+                accepted.append(url)
+        return accepted
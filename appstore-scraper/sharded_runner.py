@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片抓取 - 按应用 ID 哈希把 URL 列表拆分到多个进程或多台机器，最后合并去重并生成报告
+
+使用方法:
+    # 单机：所有分片在本机进程池中执行，然后合并
+    python sharded_runner.py run urls.txt --out shard_output --processes 4
+
+    # 多机：每台机器执行一部分分片（共享或事后汇总 shard_output 目录），最后在任一台机器上合并
+    python sharded_runner.py run urls.txt --out shard_output --host-index 0 --host-count 3
+    python sharded_runner.py merge --out shard_output
+"""
+
+import argparse
+import glob
+import hashlib
+import heapq
+import json
+import logging
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from appstore_scraper_selenium import AppStoreScraperSelenium
+from journal import ScrapeJournal
+from url_ingest import canonicalize, read_urls
+
+logger = logging.getLogger(__name__)
+
+LATENCY_FILE = 'app_latency.json'
+
+
+def bucket_of(app_id: str, bucket_count: int) -> int:
+    """
+    计算应用所属的分桶（跨进程、跨机器稳定）
+
+    Args:
+        app_id: 应用 ID
+        bucket_count: 分桶总数
+
+    Returns:
+        分桶编号
+    """
+    digest = hashlib.md5(str(app_id).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % bucket_count
+
+
+def app_key(url: str, record: Optional[Dict] = None) -> str:
+    """
+    耗时记录和合并去重使用的应用键（与 plan 查询耗时使用的键一致）
+
+    Args:
+        url: App Store 链接
+        record: 抓取结果，链接无法识别时使用其中的 storefront / id
+
+    Returns:
+        "<商店地区>_<应用 ID>"
+    """
+    key = canonicalize(url or '')
+    if key:
+        return f"{key[0]}_{key[1]}"
+    record = record or {}
+    return f"{record.get('storefront', 'us')}_{record.get('id')}"
+
+
+def assign_buckets(costs: Dict[int, float], host_count: int) -> Dict[int, int]:
+    """
+    按预计耗时把分桶分配给各台机器（最长处理时间优先：耗时最多的分桶先分配给当前负载最小的机器）
+
+    只依赖分桶耗时，各台机器使用相同的 URL 列表和 app_latency.json 时得到相同的分配结果
+
+    Args:
+        costs: {分桶编号: 预计耗时}
+        host_count: 机器总数
+
+    Returns:
+        {分桶编号: 机器编号}
+    """
+    loads = [(0.0, host) for host in range(host_count)]
+    assignment = {}
+    for bucket, cost in sorted(costs.items(), key=lambda item: (-item[1], item[0])):
+        load, host = heapq.heappop(loads)
+        assignment[bucket] = host
+        heapq.heappush(loads, (load + cost, host))
+    return assignment
+
+
+def _run_bucket(out_dir: str, bucket: int, urls: List[str], threads: int, resume: bool) -> Tuple[int, int, float]:
+    """
+    在子进程中抓取一个分桶，结果写入该分桶自己的进度日志
+
+    Returns:
+        (分桶编号, 应用数, 耗时秒数)
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    start = time.perf_counter()
+    # 各分桶进程共享输出目录，不清理其他进程的文件
+    scraper = AppStoreScraperSelenium(output_dir=os.path.join(out_dir, 'reports'), clean_output=False)
+    results = scraper.scrape_multiple_apps(urls, max_workers=threads, resume=resume,
+                                           journal_file=os.path.join(out_dir, f'shard_{bucket:04d}.jsonl'))
+    return bucket, len(results), time.perf_counter() - start
+
+
+class ShardedRunner:
+    def __init__(self, out_dir: str, processes: Optional[int] = None, threads_per_process: int = 2,
+                 bucket_count: int = 64):
+        """
+        初始化分片抓取器
+
+        Args:
+            out_dir: 输出目录（分片结果、延迟记录和最终报告）
+            processes: 进程数，默认 CPU 核数
+            threads_per_process: 每个进程内的抓取线程数（也是该进程的 Chrome 数上限）
+            bucket_count: 分桶总数，与进程数无关以便断点续抓；分桶越多负载越均衡
+        """
+        self.out_dir = out_dir
+        self.processes = processes or os.cpu_count() or 1
+        self.threads_per_process = threads_per_process
+        self.bucket_count = bucket_count
+        os.makedirs(out_dir, exist_ok=True)
+        # 只用于解析 URL；报告目录在合并后生成报告时才清理（见 report_scraper）
+        self.scraper = AppStoreScraperSelenium(output_dir=os.path.join(out_dir, 'reports'), clean_output=False)
+
+    def report_scraper(self) -> AppStoreScraperSelenium:
+        """创建生成报告用的抓取器（清理上一次合并生成的报告）"""
+        return AppStoreScraperSelenium(output_dir=os.path.join(self.out_dir, 'reports'))
+
+    def _load_latency(self) -> Dict[str, float]:
+        """读取历史运行中记录的每个应用耗时"""
+        path = os.path.join(self.out_dir, LATENCY_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def plan(self, urls: List[str], host_index: int = 0, host_count: int = 1) -> List[Tuple[int, List[str], float]]:
+        """
+        拆分 URL 并估算每个分桶的耗时，按耗时把分桶分配给各台机器（见 assign_buckets）
+
+        Args:
+            urls: App Store 链接列表
+            host_index: 当前机器编号（从 0 开始）
+            host_count: 参与抓取的机器总数
+
+        Returns:
+            [(分桶编号, URL 列表, 预计耗时)]，按预计耗时从大到小排列
+        """
+        scraper = self.scraper
+        latency = self._load_latency()
+        default_cost = statistics.median(latency.values()) if latency else 1.0
+
+        buckets: Dict[int, List[str]] = {}
+        costs: Dict[int, float] = {}
+        for url in urls:
+            app_id = scraper.extract_app_id(url) or url
+            bucket = bucket_of(app_id, self.bucket_count)
+            buckets.setdefault(bucket, []).append(url)
+            costs[bucket] = costs.get(bucket, 0.0) + latency.get(app_key(url), default_cost)
+
+        hosts = assign_buckets(costs, host_count)
+        # 最长处理时间优先：耗时最多的分桶先提交，进程池空闲时再领取小分桶
+        return sorted(((b, buckets[b], costs[b]) for b in buckets if hosts[b] == host_index),
+                      key=lambda item: item[2], reverse=True)
+
+    def run(self, urls: List[str], host_index: int = 0, host_count: int = 1, resume: bool = False):
+        """
+        在本机进程池中执行分配给当前机器的所有分桶
+
+        Args:
+            urls: App Store 链接列表（所有机器使用同一份列表）
+            host_index: 当前机器编号
+            host_count: 参与抓取的机器总数
+            resume: 跳过各分桶日志中已成功抓取的应用
+        """
+        plan = self.plan(urls, host_index, host_count)
+        logger.info(f"本机执行 {len(plan)} 个分桶，共 {sum(len(b[1]) for b in plan)} 个应用，进程数: {self.processes}")
+
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = [executor.submit(_run_bucket, self.out_dir, bucket, bucket_urls,
+                                       self.threads_per_process, resume)
+                       for bucket, bucket_urls, _ in plan]
+            for future in as_completed(futures):
+                try:
+                    bucket, count, elapsed = future.result()
+                    logger.info(f"分桶 {bucket} 完成: {count} 个应用，耗时 {elapsed:.1f}s")
+                except Exception as e:
+                    logger.error(f"分桶执行失败: {str(e)}")
+
+    def merge(self) -> List[Dict]:
+        """
+        合并所有分桶结果：同一应用保留成功的最新记录，并更新耗时记录（失败的应用同样按应用键记录耗时）
+
+        Returns:
+            去重后的应用信息列表
+        """
+        merged: Dict[str, Dict] = {}
+        # 早期版本按 url: 前缀记录失败应用的耗时，plan 不会读取，合并时清除
+        latency = {key: value for key, value in self._load_latency().items() if not key.startswith('url:')}
+
+        for path in sorted(glob.glob(os.path.join(self.out_dir, 'shard_*.jsonl'))):
+            for record in ScrapeJournal(path).load():
+                key = app_key(record.get('url'), record)
+                if 'elapsed' in record:
+                    latency[key] = record['elapsed']
+                # 成功记录存在时丢弃同一应用的失败记录
+                previous = merged.get(key)
+                if previous is None or previous.get('status') != 'success' or record.get('status') == 'success':
+                    merged[key] = record
+
+        results = list(merged.values())
+
+        with open(os.path.join(self.out_dir, LATENCY_FILE), 'w', encoding='utf-8') as f:
+            json.dump(latency, f)
+        logger.info(f"合并完成: {len(results)} 个应用")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分片抓取 App Store 应用")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="执行分片抓取")
+    run_parser.add_argument('urls_file', help="URL 列表文件，每行一个（.csv 按 CSV 读取，- 为标准输入）")
+    run_parser.add_argument('--out', default='shard_output', help="输出目录")
+    run_parser.add_argument('--processes', type=int, default=None, help="进程数，默认 CPU 核数")
+    run_parser.add_argument('--threads', type=int, default=2, help="每个进程的抓取线程数")
+    run_parser.add_argument('--host-index', type=int, default=0, help="当前机器编号")
+    run_parser.add_argument('--host-count', type=int, default=1, help="机器总数")
+    run_parser.add_argument('--resume', action='store_true', help="跳过已成功抓取的应用")
+    run_parser.add_argument('--no-merge', action='store_true', help="只执行分片，不合并生成报告")
+
+    merge_parser = sub.add_parser('merge', help="合并分片结果并生成报告")
+    merge_parser.add_argument('--out', default='shard_output', help="输出目录")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'run':
+        # 规范化并去重，同一应用的不同写法只分配到一个分桶
+        urls = read_urls([args.urls_file])
+        runner = ShardedRunner(args.out, processes=args.processes, threads_per_process=args.threads)
+        runner.run(urls, host_index=args.host_index, host_count=args.host_count, resume=args.resume)
+        if args.no_merge or args.host_count > 1:
+            return
+    else:
+        runner = ShardedRunner(args.out)
+
+    results = runner.merge()
+    scraper = runner.report_scraper()
+    scraper.generate_json_report(results)
+    scraper.generate_html_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+App Store 静态页面解析 - 无需浏览器，直接解析服务端渲染的 HTML
+"""
+
+import gzip
+import logging
+import urllib.request
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36')
+
+
+class PageSnapshotParser(HTMLParser):
+    """
+    把 HTML 解析为页面快照：媒体 URL、脚本内容、meta 标签、h1 和 title
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.media: List[str] = []
+        self.scripts: List[str] = []
+        self.meta: Dict[str, str] = {}
+        self._h1_parts: List[str] = []
+        self._title_parts: List[str] = []
+        self._in_h1 = 0
+        self._in_title = False
+        self._in_script = False
+        self._script_parts: List[str] = []
+        self.h1: Optional[str] = None
+        self.title: Optional[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'img':
+            if attrs.get('src'):
+                self.media.append(attrs['src'])
+            if attrs.get('srcset'):
+                self.media.append(attrs['srcset'])
+        elif tag == 'source':
+            url = attrs.get('srcset') or attrs.get('src')
+            if url:
+                self.media.append(url)
+        elif tag == 'video':
+            url = attrs.get('poster') or attrs.get('src')
+            if url:
+                self.media.append(url)
+        elif tag == 'meta':
+            key = attrs.get('property') or attrs.get('name')
+            if key and attrs.get('content') is not None and key not in self.meta:
+                self.meta[key] = attrs['content']
+        elif tag == 'script':
+            self._in_script = True
+            self._script_parts = []
+        elif tag == 'h1' and self.h1 is None:
+            self._in_h1 += 1
+        elif tag == 'title':
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._in_script:
+            self._in_script = False
+            content = ''.join(self._script_parts)
+            if content.strip():
+                self.scripts.append(content)
+        elif tag == 'h1' and self._in_h1:
+            self._in_h1 -= 1
+            if not self._in_h1:
+                self.h1 = ' '.join(''.join(self._h1_parts).split()) or None
+        elif tag == 'title' and self._in_title:
+            self._in_title = False
+            self.title = ''.join(self._title_parts).strip() or None
+
+    def handle_data(self, data):
+        if self._in_script:
+            self._script_parts.append(data)
+        elif self._in_h1:
+            self._h1_parts.append(data)
+        elif self._in_title:
+            self._title_parts.append(data)
+
+    def snapshot(self) -> Dict:
+        """返回与浏览器路径一致的页面快照字典"""
+        return {
+            'media': self.media,
+            'scripts': self.scripts,
+            'meta': self.meta,
+            'iframe_media': [],
+            'h1': self.h1,
+            'title': self.title,
+        }
+
+
+def parse_html(html: str) -> Dict:
+    """
+    解析 App Store 页面 HTML
+
+    Args:
+        html: 页面 HTML 文本（可以是离线保存的文件内容）
+
+    Returns:
+        页面快照字典，包含 media / scripts / meta / iframe_media / h1 / title
+    """
+    parser = PageSnapshotParser()
+    parser.feed(html)
+    parser.close()
+    return parser.snapshot()
+
+
+def fetch_page(url: str, timeout: float = 15, user_agent: str = DEFAULT_USER_AGENT) -> str:
+    """
+    通过一次 HTTP 请求获取页面 HTML
+
+    Args:
+        url: App Store 链接
+        timeout: 请求超时秒数
+        user_agent: 请求使用的 User-Agent
+
+    Returns:
+        页面 HTML 文本
+    """
+    request = urllib.request.Request(url, headers={
+        'User-Agent': user_agent,
+        'Accept': 'text/html,application/xhtml+xml',
+        'Accept-Encoding': 'gzip',
+        'Accept-Language': 'en-US,en;q=0.9',
+    })
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read()
+        if response.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        charset = response.headers.get_content_charset() or 'utf-8'
+    return body.decode(charset, errors='replace')
+
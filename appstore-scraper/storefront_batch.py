@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多地区批量抓取 - 应用 ID × 商店地区，每个应用合并为一条记录，相同截图在各地区之间只保存一次
+"""
+
+import time
+from typing import Dict, Optional
+
+from mzstatic_url import asset_key
+
+
+def storefront_url(app_id: str, storefront: str) -> str:
+    """
+    构建指定商店地区的应用链接
+
+    Args:
+        app_id: 应用 ID
+        storefront: 地区代码（如 us、cn、jp）
+
+    Returns:
+        App Store 链接
+    """
+    return f"https://apps.apple.com/{storefront}/app/id{app_id}"
+
+
+def merge_storefront_results(app_id: str, per_locale: Dict[str, Optional[Dict]],
+                             primary: Optional[str] = None) -> Dict:
+    """
+    把同一应用在各地区的抓取结果合并为一条记录
+
+    顶层的 name / url / icon 取自主地区（默认第一个成功的地区），screenshots 为所有地区截图的并集
+    （按 asset_key 去重，HTML/JSON 报告可直接使用），locales 中每个地区只记录截图的 asset_key 列表。
+
+    Args:
+        app_id: 应用 ID
+        per_locale: {地区: scrape_app 的结果}
+        primary: 主地区代码
+
+    Returns:
+        合并后的应用记录
+    """
+    successes = {sf: r for sf, r in per_locale.items() if r and r.get('status') == 'success'}
+    if primary not in successes:
+        primary = next(iter(successes), None)
+
+    assets: Dict[str, Dict] = {}
+    locales = {}
+    for storefront, result in per_locale.items():
+        if not result:
+            locales[storefront] = {'status': 'error', 'error': '无法抓取'}
+            continue
+        if result.get('status') != 'success':
+            locales[storefront] = {'status': 'error', 'url': result.get('url'),
+                                   'error': result.get('error'), 'error_type': result.get('error_type')}
+            continue
+        keys = []
+        for shot in result.get('screenshots', []):
+            key = shot.get('asset_key') or asset_key(shot.get('jpeg', ''))
+            assets.setdefault(key, shot)
+            keys.append(key)
+        locales[storefront] = {'status': 'success', 'name': result.get('name'), 'url': result.get('url'),
+                               'engine': result.get('engine'), 'screenshots': keys}
+
+    record = {
+        'id': str(app_id),
+        'locales': locales,
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    if primary is None:
+        first = next((r for r in per_locale.values() if r), {})
+        record.update(name=f"App {app_id}", storefront=next(iter(per_locale), 'us'),
+                      url=first.get('url', storefront_url(app_id, 'us')),
+                      status='error', error=f"所有地区均抓取失败: {', '.join(per_locale)}")
+        return record
+
+    main = successes[primary]
+    shared = set.intersection(*(set(locales[sf]['screenshots']) for sf in successes))
+    record.update(
+        name=main.get('name'),
+        url=main.get('url'),
+        storefront=primary,
+        icon=main.get('icon'),
+        screenshots=list(assets.values()),
+        status='success',
+        # 所有成功地区共有的截图数，等于截图总数时说明各地区素材完全相同
+        shared_screenshots=len(shared),
+    )
+    return record
+
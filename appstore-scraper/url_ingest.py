@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量 URL 导入 - 从文本文件、CSV 或标准输入逐行读取，规范化为 (商店地区, 应用 ID)，去重后按需产生规范 URL
+
+读取是惰性的：调用方每取一个 URL 才读下一行，百万行的输入不需要全部载入内存。
+去重默认使用集合（精确）；输入极大时可以使用布隆过滤器（固定内存，极少数不同应用会被误判为重复而跳过）。
+"""
+
+import csv
+import gzip
+import hashlib
+import math
+import re
+import sys
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from storefront_batch import storefront_url
+
+logger = logging.getLogger(__name__)
+
+# apps.apple.com / itunes.apple.com 之后的路径（不含查询参数），如 /cn/app/name/id123、/jp/iphone/app/id123
+_URL_RE = re.compile(r'(?:apps|itunes)\.apple\.com(/[^?#]*)?', re.IGNORECASE)
+# 路径中的 id123 段
+_ID_SEGMENT_RE = re.compile(r'^id(\d+)$', re.IGNORECASE)
+_STOREFRONT_SEGMENT_RE = re.compile(r'^[a-z]{2}$', re.IGNORECASE)
+# 其他路径中的 /id123
+_PATH_ID_RE = re.compile(r'/id(\d+)(?:[/?#]|$)')
+# 非应用页面（开发者、专题、合集、榜单等），其中的 id 不是应用 ID
+_NON_APP_RE = re.compile(r'/(?:developer|artist|story|collection|room|charts|bundle|app-bundle|category|genre)(?:/|$)',
+                         re.IGNORECASE)
+# 纯数字 ID 或 id123
+_BARE_ID_RE = re.compile(r'^(?:id)?(\d{5,})$', re.IGNORECASE)
+
+_URL_COLUMNS = ('url', 'link', 'app_url')
+_ID_COLUMNS = ('app_id', 'id', 'appid')
+_STOREFRONT_COLUMNS = ('storefront', 'country', 'region')
+
+
+def canonicalize(text: str, default_storefront: str = 'us') -> Optional[Tuple[str, str]]:
+    """
+    把 URL 或应用 ID 规范化为去重键
+
+    Args:
+        text: App Store 链接、id123 或纯数字 ID
+        default_storefront: URL 中不含地区或只给出 ID 时使用的地区
+
+    Returns:
+        (商店地区, 应用 ID)，无法识别或为开发者等非应用页面时返回 None
+    """
+    text = text.strip()
+    match = _BARE_ID_RE.match(text)
+    if match:
+        return default_storefront, match.group(1)
+    if is_non_app_page(text):
+        return None
+    match = _URL_RE.search(text)
+    if match:
+        segments = [segment for segment in (match.group(1) or '').split('/') if segment]
+        storefront = default_storefront
+        if segments and _STOREFRONT_SEGMENT_RE.match(segments[0]):
+            storefront = segments.pop(0).lower()
+        for segment in reversed(segments):
+            id_match = _ID_SEGMENT_RE.match(segment)
+            if id_match:
+                return storefront, id_match.group(1)
+        return None
+    match = _PATH_ID_RE.search(text)
+    if match:
+        return default_storefront, match.group(1)
+    return None
+
+
+def is_non_app_page(text: str) -> bool:
+    """
+    链接是否为开发者、专题、合集等非应用页面（路径中的 id 不是应用 ID）
+
+    Args:
+        text: 链接
+
+    Returns:
+        是否为非应用页面
+    """
+    return _NON_APP_RE.search(text.split('?', 1)[0].split('#', 1)[0]) is not None
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        初始化布隆过滤器
+
+        Args:
+            capacity: 预计的不同元素数
+            error_rate: 期望的误判率（新元素被判为已存在的概率）
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        """双重哈希生成 hash_count 个位置"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> bool:
+        """
+        加入元素
+
+        Returns:
+            元素之前可能已存在时返回 True
+        """
+        present = True
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                present = False
+                self._bits[byte] |= 1 << bit
+        return present
+
+
+class UrlIngest:
+    def __init__(self, sources: Iterable[str], default_storefront: str = 'us', dedupe: str = 'set',
+                 expected: int = 1_000_000, error_rate: float = 0.001, skip: Optional[Iterable[Tuple[str, str]]] = None):
+        """
+        初始化 URL 导入
+
+        Args:
+            sources: 输入来源：文件路径（.csv 按 CSV 解析，.gz 自动解压）或 '-' 表示标准输入
+            default_storefront: URL 中不含地区或只给出 ID 时使用的地区
+            dedupe: 'set' 精确去重；'bloom' 使用布隆过滤器（固定内存）
+            expected: 布隆过滤器预计的不同应用数
+            error_rate: 布隆过滤器误判率
+            skip: 需要跳过的 (商店地区, 应用 ID)，如进度日志中已完成的应用
+        """
+        if dedupe not in ('set', 'bloom'):
+            raise ValueError(f"不支持的去重方式: {dedupe}")
+        self.sources = list(sources)
+        self.default_storefront = default_storefront
+        self.dedupe = dedupe
+        self.expected = expected
+        self.error_rate = error_rate
+        self.skip = set(skip or ())
+        self._stats = {'lines': 0, 'invalid': 0, 'duplicates': 0, 'skipped': 0, 'urls': 0}
+
+    def _open(self, source: str):
+        """打开文本来源"""
+        if source == '-':
+            return sys.stdin
+        if source.endswith('.gz'):
+            return gzip.open(source, 'rt', encoding='utf-8', newline='')
+        return open(source, 'r', encoding='utf-8', newline='')
+
+    def _iter_csv(self, f) -> Iterator[str]:
+        """CSV：有表头时按 url / app_id + storefront 列读取，否则读取第一列"""
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [name.strip().lower() for name in header]
+
+        def find(names):
+            return next((columns.index(name) for name in names if name in columns), None)
+
+        url_col, id_col, storefront_col = find(_URL_COLUMNS), find(_ID_COLUMNS), find(_STOREFRONT_COLUMNS)
+        if url_col is None and id_col is None:
+            # 没有可识别的表头，第一行也是数据
+            url_col = 0
+            if header:
+                yield header[0]
+        for row in reader:
+            if url_col is not None:
+                if url_col < len(row):
+                    yield row[url_col]
+            elif id_col < len(row):
+                storefront = row[storefront_col].strip().lower() if storefront_col is not None \
+                    and storefront_col < len(row) and row[storefront_col].strip() else self.default_storefront
+                yield storefront_url(row[id_col].strip(), storefront)
+
+    def _iter_lines(self) -> Iterator[str]:
+        """逐行读取所有来源"""
+        for source in self.sources:
+            f = self._open(source)
+            try:
+                if source.endswith(('.csv', '.csv.gz')):
+                    yield from self._iter_csv(f)
+                else:
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith('#'):
+                            yield line
+            finally:
+                if f is not sys.stdin:
+                    f.close()
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        逐个产生去重后的规范 URL
+
+        Yields:
+            https://apps.apple.com/<地区>/app/id<应用 ID>
+        """
+        seen = BloomFilter(self.expected, self.error_rate) if self.dedupe == 'bloom' else set()
+        for line in self._iter_lines():
+            self._stats['lines'] += 1
+            key = canonicalize(line, self.default_storefront)
+            if key is None:
+                self._stats['invalid'] += 1
+                logger.warning(f"无法识别的 URL: {line[:200]}")
+                continue
+            if key in self.skip:
+                self._stats['skipped'] += 1
+                continue
+            if self.dedupe == 'bloom':
+                duplicate = seen.add(f'{key[0]}/{key[1]}')
+            else:
+                duplicate = key in seen
+                seen.add(key)
+            if duplicate:
+                self._stats['duplicates'] += 1
+                continue
+            self._stats['urls'] += 1
+            yield storefront_url(key[1], key[0])
+        logger.info(f"URL 导入完成: {self._stats}")
+
+    def keys(self) -> Iterator[Tuple[str, str]]:
+        """
+        逐个产生去重后的 (商店地区, 应用 ID)
+
+        Yields:
+            (商店地区, 应用 ID)
+        """
+        for url in self:
+            yield canonicalize(url)
+
+    def get_stats(self) -> Dict:
+        """
+        获取导入统计
+
+        Returns:
+            包含读取行数、无法识别数、重复数、跳过数和产生的 URL 数的字典
+        """
+        return dict(self._stats)
+
+
+def read_urls(sources: List[str], **kwargs) -> List[str]:
+    """
+    读取并去重全部 URL（需要完整列表时使用，如分片规划）
+
+    Args:
+        sources: 输入来源
+        **kwargs: 传给 UrlIngest 的参数
+
+    Returns:
+        规范 URL 列表
+    """
+    return list(UrlIngest(sources, **kwargs))